@@ -1,2 +1,2 @@
-__all__ = ["routes", "models", "utils"]
+__all__ = ["routes", "models", "utils", "testing"]
 
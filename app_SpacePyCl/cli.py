@@ -0,0 +1,47 @@
+"""Línea de comandos del cliente de SPACE."""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import List, Optional
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.utils.bulk_import import ImportReport, PricingImportOptions
+
+
+async def _import(args: argparse.Namespace) -> ImportReport:
+    async with SpaceClient(args.url, args.api_key, timeout=args.timeout) as client:
+        options = PricingImportOptions(max_concurrency=args.concurrency, manifest_path=args.manifest)
+        return await client.service_context.import_pricings(args.sources, options)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="space-import-pricings",
+        description="Importa en SPACE los ficheros de pricing de directorios o patrones glob.")
+    parser.add_argument("sources", nargs="+", help="directorios, patrones glob o ficheros .yml/.yaml")
+    parser.add_argument("--url", default=os.getenv("SPACE_URL"), help="url de SPACE (por defecto $SPACE_URL)")
+    parser.add_argument("--api-key", default=os.getenv("API_KEY"), help="api key (por defecto $API_KEY)")
+    parser.add_argument("--concurrency", type=int, default=8, help="ficheros subidos en paralelo")
+    parser.add_argument("--manifest", help="fichero JSON para saltar los ficheros que no han cambiado")
+    parser.add_argument("--timeout", type=int, default=30000, help="timeout por petición en ms")
+    parser.add_argument("--json", action="store_true", help="muestra el informe completo en JSON")
+    args = parser.parse_args(argv)
+    if not args.url or not args.api_key:
+        parser.error("se requieren --url y --api-key (o SPACE_URL y API_KEY)")
+
+    report = asyncio.run(_import(args))
+    if args.json:
+        json.dump(report.to_dict(), sys.stdout, indent=2)
+        print()
+    else:
+        for result in report.results:
+            line = f"{result.status:8} {result.elapsed * 1000:8.1f} ms  {result.path}"
+            print(f"{line}  ({result.error})" if result.error else line)
+        summary = ", ".join(f"{count} {status}" for status, count in report.to_dict()["summary"].items())
+        print(f"{summary} in {report.elapsed:.2f}s")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
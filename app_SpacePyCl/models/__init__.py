@@ -1,4 +1,5 @@
 from .contracts import *
 from .feature_eval_result import *
 from .service_context_enums import *
-from .service_context import *
\ No newline at end of file
+from .service_context import *
+from .compact import *
\ No newline at end of file
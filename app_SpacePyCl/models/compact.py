@@ -0,0 +1,412 @@
+from __future__ import annotations
+import sys
+from enum import Enum
+from typing import (Any, Callable, Dict, Generic, Hashable, Iterable, Iterator, List, Mapping, NamedTuple,
+                    Optional, Tuple, Type, TypeVar, Union)
+from pydantic import BaseModel
+from .service_context import AddOn, Plan, Pricing, PricingFeature, PricingReference, Service, UsageLimit
+from .service_context_enums import *
+
+V = TypeVar("V")
+T = TypeVar("T")
+E = TypeVar("E", bound=Enum)
+
+
+class EnumCodes(Generic[E]):
+    """Códigos enteros de los miembros de un Enum, en orden de declaración."""
+    __slots__ = ("members", "codes")
+
+    def __init__(self, enum: Type[E]):
+        self.members: Tuple[E, ...] = tuple(enum)
+        self.codes: Dict[E, int] = {member: code for code, member in enumerate(self.members)}
+
+    def encode(self, member: Optional[E]) -> Optional[int]:
+        return None if member is None else self.codes[member]
+
+    def decode(self, code: Optional[int]) -> Optional[E]:
+        return None if code is None else self.members[code]
+
+
+_FEATURE_VALUE_TYPES = EnumCodes(PricingFeatureValueType)
+_FEATURE_TYPES = EnumCodes(PricingFeatureType)
+_LIMIT_VALUE_TYPES = EnumCodes(UsageLimitValueType)
+_LIMIT_TYPES = EnumCodes(UsageLimitType)
+
+
+class FrozenMap(Mapping[str, V]):
+    """
+    Mapping de solo lectura respaldado por dos tuplas (claves y valores). La tabla de posiciones
+    se comparte entre todos los mapas con las mismas claves.
+    """
+    __slots__ = ("_keys", "_values", "_slots")
+
+    def __init__(self, keys: Tuple[str, ...], values: Tuple[V, ...], slots: Mapping[str, int]):
+        self._keys = keys
+        self._values = values
+        self._slots = slots
+
+    def __getitem__(self, key: str) -> V:
+        return self._values[self._slots[key]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._slots
+
+    def get(self, key: str, default: Any = None) -> Any:
+        slot = self._slots.get(key)
+        return default if slot is None else self._values[slot]
+
+    def keys(self):
+        return self._keys
+
+    def values(self):
+        return self._values
+
+    def items(self):
+        return tuple(zip(self._keys, self._values))
+
+    def __repr__(self) -> str:
+        return f"FrozenMap({dict(self.items())!r})"
+
+
+class InternPool:
+    """
+    Comparte entre pricings los nombres, las tablas de posiciones y los elementos (features,
+    límites, planes y add-ons) idénticos. Un catálogo usa un único pool para todas sus versiones.
+    """
+    __slots__ = ("_names", "_slots", "_shared")
+
+    def __init__(self):
+        self._names: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        self._slots: Dict[Tuple[str, ...], Dict[str, int]] = {}
+        # (clase, nombre) -> variantes distintas ya vistas
+        self._shared: Dict[Hashable, List[Any]] = {}
+
+    def names(self, values: Optional[Iterable[str]]) -> Optional[Tuple[str, ...]]:
+        if values is None:
+            return None
+        names = tuple(sys.intern(value) for value in values)
+        return self._names.setdefault(names, names)
+
+    def map(self, mapping: Optional[Mapping[str, Any]],
+            convert: Callable[[str, Any], Any] = lambda name, value: _intern(value),
+            shared: bool = True) -> Optional[FrozenMap]:
+        """
+        FrozenMap con los valores de `mapping` pasados por `convert`. Con `shared=False` las claves
+        no se guardan en el pool (p.ej. las versiones de un servicio, que no se repiten).
+        """
+        if mapping is None:
+            return None
+        if shared:
+            keys = self.names(mapping)
+            slots = self._slots.get(keys)
+            if slots is None:
+                slots = self._slots[keys] = {name: slot for slot, name in enumerate(keys)}
+        else:
+            keys = tuple(sys.intern(name) for name in mapping)
+            slots = {name: slot for slot, name in enumerate(keys)}
+        return FrozenMap(keys, tuple(convert(name, value) for name, value in zip(keys, mapping.values())), slots)
+
+    def share(self, name: Optional[str], item: T) -> T:
+        """Devuelve un elemento ya visto idéntico a `item` (mismos tipos y valores), o `item`."""
+        variants = self._shared.setdefault((type(item), name), [])
+        for variant in variants:
+            if _same(variant, item):
+                return variant
+        variants.append(item)
+        return item
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+def _same(left: Any, right: Any) -> bool:
+    # Igualdad estricta: True y 1, o 1 y 1.0, no son intercambiables en un pricing
+    if left is right:
+        return True
+    if type(left) is not type(right):
+        return False
+    if isinstance(left, FrozenMap):
+        return left._keys == right._keys and all(map(_same, left._values, right._values))
+    if isinstance(left, tuple):
+        return len(left) == len(right) and all(map(_same, left, right))
+    if isinstance(left, _Compact):
+        return all(_same(getattr(left, slot), getattr(right, slot)) for slot in left.__slots__)
+    return left == right
+
+
+def _plain(value: Any) -> Any:
+    """Convierte un valor compacto en los tipos que aceptan los modelos de Pydantic."""
+    if isinstance(value, _Compact):
+        return value.to_model()
+    if isinstance(value, FrozenMap):
+        return {name: _plain(item) for name, item in value.items()}
+    if isinstance(value, tuple) and hasattr(value, "_asdict"):
+        return value._asdict()
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+
+class _Compact:
+    """Base de las representaciones compactas: atributos en slots y conversión al modelo."""
+    __slots__ = ()
+    _model: Type[BaseModel]
+    _fields: Tuple[str, ...]
+
+    def to_model(self) -> BaseModel:
+        return self._model(**{field: _plain(getattr(self, field)) for field in self._fields})
+
+    def __repr__(self) -> str:
+        name = getattr(self, "name", None) or getattr(self, "version", None)
+        return f"{type(self).__name__}({name!r})"
+
+
+class CompactPeriod(NamedTuple):
+    value: int
+    unit: PeriodUnit
+
+
+class CompactConstraints(NamedTuple):
+    minQuantity: Optional[int]
+    maxQuantity: Optional[int]
+    quantityStep: Optional[int]
+
+
+class CompactFeature(_Compact):
+    """PricingFeature de solo lectura."""
+    __slots__ = ("name", "description", "_value_type", "defaultValue", "value", "_type",
+                 "expression", "serverExpression", "_extra")
+    _model = PricingFeature
+    _fields = ("name", "description", "valueType", "defaultValue", "value", "type", "expression",
+               "serverExpression", "integrationType", "pricingUrls", "automationType", "paymentType",
+               "docUrl", "renderMode", "tag")
+    # Campos poco habituales: solo ocupan memoria en las features que los tienen
+    _EXTRA = ("integrationType", "pricingUrls", "automationType", "paymentType", "docUrl", "renderMode", "tag")
+
+    @property
+    def valueType(self) -> PricingFeatureValueType:
+        return _FEATURE_VALUE_TYPES.decode(self._value_type)
+
+    @property
+    def type(self) -> Optional[PricingFeatureType]:
+        return _FEATURE_TYPES.decode(self._type)
+
+    def __getattr__(self, name: str) -> Any:
+        if name in CompactFeature._EXTRA:
+            return None if self._extra is None else self._extra.get(name)
+        raise AttributeError(name)
+
+    @classmethod
+    def from_model(cls, feature: PricingFeature, pool: InternPool) -> CompactFeature:
+        compact = cls.__new__(cls)
+        compact.name = sys.intern(feature.name)
+        compact.description = _intern(feature.description)
+        compact._value_type = _FEATURE_VALUE_TYPES.encode(feature.valueType)
+        compact.defaultValue = _intern(feature.defaultValue)
+        compact.value = _intern(feature.value)
+        compact._type = _FEATURE_TYPES.encode(feature.type)
+        compact.expression = _intern(feature.expression)
+        compact.serverExpression = _intern(feature.serverExpression)
+        extra = {name: getattr(feature, name) for name in cls._EXTRA if getattr(feature, name) is not None}
+        if "pricingUrls" in extra:
+            extra["pricingUrls"] = pool.names(extra["pricingUrls"])
+        compact._extra = pool.map(extra) if extra else None
+        return pool.share(compact.name, compact)
+
+
+class CompactUsageLimit(_Compact):
+    """UsageLimit de solo lectura."""
+    __slots__ = ("name", "description", "_value_type", "defaultValue", "value", "_type", "trackable",
+                 "period", "linkedFeatures")
+    _model = UsageLimit
+    _fields = ("name", "description", "valueType", "defaultValue", "value", "type", "trackable", "period",
+               "linkedFeatures")
+
+    @property
+    def valueType(self) -> UsageLimitValueType:
+        return _LIMIT_VALUE_TYPES.decode(self._value_type)
+
+    @property
+    def type(self) -> UsageLimitType:
+        return _LIMIT_TYPES.decode(self._type)
+
+    @classmethod
+    def from_model(cls, limit: UsageLimit, pool: InternPool) -> CompactUsageLimit:
+        compact = cls.__new__(cls)
+        compact.name = sys.intern(limit.name)
+        compact.description = _intern(limit.description)
+        compact._value_type = _LIMIT_VALUE_TYPES.encode(limit.valueType)
+        compact.defaultValue = limit.defaultValue
+        compact.value = limit.value
+        compact._type = _LIMIT_TYPES.encode(limit.type)
+        compact.trackable = limit.trackable
+        compact.period = CompactPeriod(limit.period.value, limit.period.unit) if limit.period is not None else None
+        compact.linkedFeatures = pool.names(limit.linkedFeatures)
+        return pool.share(compact.name, compact)
+
+
+class CompactPlan(_Compact):
+    """Plan de solo lectura."""
+    __slots__ = ("name", "description", "price", "private", "features", "usageLimits")
+    _model = Plan
+    _fields = __slots__
+
+    @classmethod
+    def from_model(cls, plan: Plan, pool: InternPool, key: str) -> CompactPlan:
+        compact = cls.__new__(cls)
+        compact.name = _intern(plan.name)
+        compact.description = _intern(plan.description)
+        compact.price = _intern(plan.price)
+        compact.private = plan.private
+        compact.features = pool.map(plan.features)
+        compact.usageLimits = pool.map(plan.usageLimits)
+        return pool.share(key, compact)
+
+
+class CompactAddOn(_Compact):
+    """AddOn de solo lectura."""
+    __slots__ = ("name", "description", "private", "price", "availableFor", "dependsOn", "excludes",
+                 "features", "usageLimits", "usageLimitsExtensions", "subscriptionConstraints")
+    _model = AddOn
+    _fields = __slots__
+
+    @classmethod
+    def from_model(cls, addon: AddOn, pool: InternPool) -> CompactAddOn:
+        compact = cls.__new__(cls)
+        compact.name = sys.intern(addon.name)
+        compact.description = _intern(addon.description)
+        compact.private = addon.private
+        compact.price = _intern(addon.price)
+        compact.availableFor = pool.names(addon.availableFor)
+        compact.dependsOn = pool.names(addon.dependsOn)
+        compact.excludes = pool.names(addon.excludes)
+        compact.features = pool.map(addon.features)
+        compact.usageLimits = pool.map(addon.usageLimits)
+        compact.usageLimitsExtensions = pool.map(addon.usageLimitsExtensions)
+        constraints = addon.subscriptionConstraints
+        compact.subscriptionConstraints = CompactConstraints(
+            constraints.minQuantity, constraints.maxQuantity, constraints.quantityStep) if constraints else None
+        return pool.share(compact.name, compact)
+
+
+class CompactPricing(_Compact):
+    """
+    Pricing de solo lectura con un consumo de memoria reducido.
+
+    Expone los mismos atributos que `Pricing` (los dicts pasan a ser FrozenMap y las listas,
+    tuplas), así que sirve donde solo se lee un pricing, p.ej. para construir un PricingIndex.
+    """
+    __slots__ = ("id", "version", "currency", "createdAt", "features", "usageLimits", "plans", "addons")
+    _model = Pricing
+    _fields = __slots__
+
+    @classmethod
+    def from_model(cls, pricing: Pricing, pool: Optional[InternPool] = None) -> CompactPricing:
+        pool = pool or InternPool()
+        compact = cls.__new__(cls)
+        compact.id = pricing.id
+        compact.version = sys.intern(pricing.version)
+        compact.currency = sys.intern(pricing.currency)
+        compact.createdAt = pricing.createdAt
+        compact.features = pool.map(pricing.features, lambda name, feature: CompactFeature.from_model(feature, pool))
+        compact.usageLimits = pool.map(pricing.usageLimits,
+                                       lambda name, limit: CompactUsageLimit.from_model(limit, pool))
+        compact.plans = pool.map(pricing.plans, lambda name, plan: CompactPlan.from_model(plan, pool, name))
+        compact.addons = pool.map(pricing.addons, lambda name, addon: CompactAddOn.from_model(addon, pool))
+        return compact
+
+
+class CompactPricingReference(_Compact):
+    """PricingReference de solo lectura."""
+    __slots__ = ("id", "url")
+    _model = PricingReference
+    _fields = __slots__
+
+    def __init__(self, id: Optional[str], url: Optional[str]):
+        self.id = id
+        self.url = url
+
+
+class CompactService(_Compact):
+    """Service de solo lectura cuyos pricings son CompactPricing o CompactPricingReference."""
+    __slots__ = ("name", "disabled", "activePricings", "archivedPricing")
+    _model = Service
+    _fields = __slots__
+
+    @classmethod
+    def from_model(cls, service: Service, pool: Optional[InternPool] = None) -> CompactService:
+        pool = pool or InternPool()
+
+        def convert(version: str, pricing: Union[Pricing, PricingReference]):
+            if isinstance(pricing, Pricing):
+                return CompactPricing.from_model(pricing, pool)
+            return CompactPricingReference(pricing.id, pricing.url)
+        compact = cls.__new__(cls)
+        compact.name = sys.intern(service.name)
+        compact.disabled = service.disabled
+        compact.activePricings = pool.map(service.activePricings, convert, shared=False)
+        compact.archivedPricing = pool.map(service.archivedPricing, convert, shared=False)
+        return compact
+
+    def pricing(self, version: str) -> Optional[Union[CompactPricing, CompactPricingReference]]:
+        """Pricing activo o archivado de una versión, o None si el servicio no la tiene."""
+        return self.activePricings.get(version) or self.archivedPricing.get(version)
+
+
+class CompactCatalog:
+    """
+    Catálogo de servicios y pricings en forma compacta para mantener en memoria en cada worker.
+
+    Todas las versiones comparten un InternPool, así que las features, límites, planes y add-ons
+    que no cambian entre versiones se guardan una sola vez. Los servicios se buscan sin
+    distinguir mayúsculas.
+    """
+
+    def __init__(self):
+        self.pool = InternPool()
+        self._services: Dict[str, CompactService] = {}
+
+    def __len__(self) -> int:
+        return len(self._services)
+
+    def __iter__(self) -> Iterator[CompactService]:
+        return iter(self._services.values())
+
+    def add(self, service: Service) -> CompactService:
+        """Añade (o sustituye) un servicio con los pricings que traiga."""
+        compact = CompactService.from_model(service, self.pool)
+        self._services[service.name.lower()] = compact
+        return compact
+
+    def add_pricing(self, service_name: str, pricing: Pricing, archived: bool = False) -> CompactPricing:
+        """Añade un pricing a un servicio del catálogo, creándolo si no existe."""
+        current = self._services.get(service_name.lower())
+        active = dict(current.activePricings.items()) if current is not None else {}
+        archive = dict(current.archivedPricing.items()) if current is not None else {}
+        compact = CompactPricing.from_model(pricing, self.pool)
+        (archive if archived else active)[pricing.version] = compact
+        (active if archived else archive).pop(pricing.version, None)
+        service = CompactService.__new__(CompactService)
+        service.name = current.name if current is not None else sys.intern(service_name)
+        service.disabled = current.disabled if current is not None else None
+        service.activePricings = self.pool.map(active, lambda version, item: item, shared=False)
+        service.archivedPricing = self.pool.map(archive, lambda version, item: item, shared=False)
+        self._services[service_name.lower()] = service
+        return compact
+
+    def get(self, service_name: str) -> Optional[CompactService]:
+        return self._services.get(service_name.lower())
+
+    def pricing(self, service_name: str, version: str) -> Optional[Union[CompactPricing, CompactPricingReference]]:
+        service = self.get(service_name)
+        return service.pricing(version) if service is not None else None
+
+    def remove(self, service_name: str) -> Optional[CompactService]:
+        return self._services.pop(service_name.lower(), None)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Union
 from datetime import datetime
 
 class FallbackSubscription(BaseModel):
@@ -35,8 +35,8 @@ class Subscription(BaseModel):
     subscriptionAddOns: Dict[str, Dict[str, int]]
 
 class UsageLevel(BaseModel):
-    resetTimeStamp: Optional[datetime]
-    consumed: int
+    resetTimeStamp: Optional[datetime] = None
+    consumed: Union[int, float]
 
 class ContractHistoryEntry(BaseModel):
     startDate: datetime
@@ -58,13 +58,13 @@ class BillingPeriod(BaseModel):
 class Contract(BaseModel):
     userContact: UserContact
     billingPeriod: BillingPeriod
-    usageLevels: Dict[str, Dict[str, UsageLevel]]
+    usageLevels: Dict[str, Dict[str, UsageLevel]] = {}
     
     contractedServices: Dict[str, str]
     subscriptionPlans: Dict[str, str]
-    subscriptionAddOns: Dict[str, Dict[str, int]]
+    subscriptionAddOns: Dict[str, Dict[str, int]] = {}
     
-    history: List[ContractHistoryEntry]
+    history: List[ContractHistoryEntry] = []
 
 class UsageLevelUpdate(BaseModel):
     usageLevels: Dict[str, Dict[str, UsageLevel]]
\ No newline at end of file
@@ -1,16 +1,20 @@
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field
 from typing import Dict, Union, Optional
 from .service_context_enums import *
 
+# Valores que SPACE puede devolver para features y límites de uso
+FeatureValue = Union[bool, int, float, str]
+UsageLimitValue = Union[bool, int, float]
+
 
 class PricingFeature(BaseModel):
     name: str
     description: Optional[str] = None
     valueType: PricingFeatureValueType
-    defaultValue: Union[str, bool]
-    value: Optional[Union[str, bool]] = None
-    type: PricingFeatureType
+    defaultValue: FeatureValue
+    value: Optional[FeatureValue] = None
+    type: Optional[PricingFeatureType] = None
     integrationType: Optional[PricingFeatureIntegrationType] = None
     pricingUrls:Optional[list[str]] = None
     automationType: Optional[PricingFeatureAutomationType] = None
@@ -18,7 +22,7 @@ class PricingFeature(BaseModel):
     docUrl: Optional[str] = None
     expression: Optional[str] = None
     serverExpression: Optional[str] = None
-    renderMode: PricingFeatureRenderMode
+    renderMode: Optional[PricingFeatureRenderMode] = None
     tag: Optional[str] = None
     
 # UsageLimit model and Auxiliars------------------------------
@@ -30,8 +34,8 @@ class UsageLimit(BaseModel):
     name: str
     description: Optional[str] = None
     valueType: UsageLimitValueType
-    defaultValue: Union[int, bool]
-    value: Optional[Union[int, bool]] = None
+    defaultValue: UsageLimitValue
+    value: Optional[UsageLimitValue] = None
     type: UsageLimitType
     trackable: Optional[bool] = None
     period: Optional[Period] = None
@@ -41,10 +45,10 @@ class UsageLimit(BaseModel):
 class Plan(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
-    price: Union[str, int]
+    price: Union[int, float, str]
     private: Optional[bool] = None
-    features: Dict[str, Union[str, bool]]
-    usageLimits: Optional[Dict[str, Union[int, bool]]] = None
+    features: Optional[Dict[str, FeatureValue]] = None
+    usageLimits: Optional[Dict[str, UsageLimitValue]] = None
  
 # AddOn model and auxiliars------------------------------------
 class SubscriptionConstraint(BaseModel):
@@ -56,13 +60,13 @@ class AddOn(BaseModel):
     name: str
     description: Optional[str] = None
     private: Optional[bool] = None
-    price: Union[str, int]
+    price: Union[int, float, str]
     availableFor: Optional[list[str]] = None
     dependsOn: Optional[list[str]] = None
     excludes: Optional[list[str]] = None
-    features: Optional[Dict[str, Union[str, bool]]] = None
-    usageLimits: Optional[Dict[str, Union[int, bool]]] = None    
-    usageLimitsExtensions: Optional[Dict[str, Union[int, str]]] = None
+    features: Optional[Dict[str, FeatureValue]] = None
+    usageLimits: Optional[Dict[str, UsageLimitValue]] = None    
+    usageLimitsExtensions: Optional[Dict[str, Union[int, float, str]]] = None
     subscriptionConstraints: Optional[SubscriptionConstraint] = None
 
 # Most general models------------------------------
@@ -72,11 +76,19 @@ class Pricing(BaseModel):
     currency: str
     createdAt: datetime
     features: Dict[str, PricingFeature]
-    usageLimits: Optional[Dict[str, UsageLimit]]
-    plans: Optional[Dict[str, Plan]]
-    addons: Optional[Dict[str, AddOn]]
+    usageLimits: Optional[Dict[str, UsageLimit]] = None
+    plans: Optional[Dict[str, Plan]] = None
+    # SPACE serializa los add-ons como "addOns"
+    addons: Optional[Dict[str, AddOn]] = Field(default=None, validation_alias=AliasChoices("addOns", "addons"))
+
+# Referencia a un pricing tal y como aparece dentro de un servicio
+class PricingReference(BaseModel):
+    id: Optional[str] = None
+    url: Optional[str] = None
 
 class Service(BaseModel):
     name: str
-    activePricings: Dict[str, Pricing]
-    archivedPricing: Dict[str, Pricing]
+    disabled: Optional[bool] = None
+    activePricings: Dict[str, Union[Pricing, PricingReference]] = {}
+    archivedPricing: Dict[str, Union[Pricing, PricingReference]] = Field(
+        default_factory=dict, validation_alias=AliasChoices("archivedPricings", "archivedPricing"))
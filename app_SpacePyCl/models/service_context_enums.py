@@ -5,7 +5,9 @@ from enum import Enum
 class PricingFeatureValueType(str, Enum):
     BOOLEAN = "BOOLEAN"
     INTEGER = "INTEGER"
+    NUMERIC = "NUMERIC"
     STRING = "STRING"
+    TEXT = "TEXT"
     
 class PricingFeatureType(str, Enum):
         INFORMATION = "INFORMATION"
@@ -46,6 +48,7 @@ class PricingFeatureRenderMode(str, Enum):
     
 class UsageLimitValueType(str, Enum):
     INTEGER = "INTEGER"
+    NUMERIC = "NUMERIC"
     BOOLEAN = "BOOLEAN"    
 
 class UsageLimitType(str, Enum):
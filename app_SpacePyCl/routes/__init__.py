@@ -1,4 +1,5 @@
 from .config import *
 from .contract_module import *
 from .feature_eval_module import *
-from .service_context_module import *
\ No newline at end of file
+from .service_context_module import *
+from .sync_client import *
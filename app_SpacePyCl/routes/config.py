@@ -1,17 +1,54 @@
-from typing import Optional
+from typing import Any, Awaitable, Callable, Hashable, Optional, TypeVar, Union
 from .contract_module import ContractModule
 from .feature_eval_module import FeatureEvalModule
 from .service_context_module import ServiceContextModule
+from app_SpacePyCl.utils.connection_options import PoolOptions
+from app_SpacePyCl.utils.pool import ConnectionPool, get_shared_pool
+from app_SpacePyCl.utils.pricing_token import LocalEvaluationOptions
+from app_SpacePyCl.utils.cache import DocumentCacheOptions, EvaluationCacheOptions
+from app_SpacePyCl.utils.single_flight import SingleFlight
+from app_SpacePyCl.utils.codec import JsonCodec, get_codec
+from app_SpacePyCl.utils.http import SpaceResponse
+from app_SpacePyCl.utils.retry import HedgePolicy, RetryBudget, RetryPolicy, parse_retry_after
+from app_SpacePyCl.utils.circuit_breaker import (CircuitBreaker, CircuitBreakerOptions, CircuitBreakerRegistry,
+                                                 EvaluationFallback)
+from app_SpacePyCl.utils.events import EventListenerOptions, SpaceEventListener
+from app_SpacePyCl.utils.errors import (SpaceConnectionError, SpaceError, SpaceHTTPError, SpaceTimeoutError,
+                                        http_error)
+from app_SpacePyCl.utils.log import error_log, logger
+from app_SpacePyCl.utils.metrics import Instrumentation, pool_trace_config
 import aiohttp
 import asyncio
+import time
 
+T = TypeVar("T")
+
+
+def _log_request_error(endpoint: str, error: SpaceError) -> None:
+    # Los 4xx suelen ser esperables (p.ej. un 404 al comprobar si algo existe): solo en debug
+    if isinstance(error, SpaceHTTPError) and error.status < 500 and error.status != 429:
+        logger.debug("Fallo en la petición %s a SPACE: %s", endpoint, error)
+    else:
+        error_log.warning("Fallo en la petición %s a SPACE: %s", endpoint, error, key=endpoint)
 
 class SpaceClient:
     
-    def __init__(self, url: str, api_key: str, timeout: int = 5000, api_prefix: str = "api/v1"):
+    def __init__(self, url: str, api_key: str, timeout: int = 5000, api_prefix: str = "api/v1",
+                 pool: Optional[Union[PoolOptions, ConnectionPool]] = None,
+                 local_evaluation: Optional[LocalEvaluationOptions] = None,
+                 evaluation_cache: Optional[EvaluationCacheOptions] = None,
+                 coalesce_requests: bool = True,
+                 document_cache: Optional[DocumentCacheOptions] = None,
+                 codec: Optional[Union[str, JsonCodec]] = None,
+                 retry_policy: Optional[RetryPolicy] = RetryPolicy(),
+                 hedge_policy: Optional[HedgePolicy] = None,
+                 circuit_breaker: Optional[CircuitBreakerOptions] = None,
+                 evaluation_fallback: Optional[EvaluationFallback] = None,
+                 instrumentation: Optional[Instrumentation] = None):
         if not url or not api_key:
             raise ValueError("Se requieren url y api_key")
 
+        self.url = url.rstrip('/')
         self.api_prefix = api_prefix
         if api_prefix:
             self.http_url = f"{url.rstrip('/')}/{api_prefix.strip('/')}"
@@ -20,23 +57,285 @@ class SpaceClient:
 
         self.api_key = api_key
         self.timeout_ms = timeout
+        # Codec JSON de peticiones y respuestas (orjson si está instalado, si no la librería estándar)
+        self.codec = codec if isinstance(codec, JsonCodec) else get_codec(codec)
+        # Reintentos de operaciones idempotentes y peticiones de cobertura para lecturas
+        if retry_policy is not None:
+            retry_policy.validate()
+        if hedge_policy is not None:
+            hedge_policy.validate()
+        self.retry_policy = retry_policy
+        self.hedge_policy = hedge_policy
+        policy = retry_policy or RetryPolicy()
+        self._retry_budget = RetryBudget(policy.budget_ratio, policy.budget_reserve)
+        # Circuit breaker por endpoint: con SPACE caído se falla rápido en lugar de esperar al timeout
+        self.circuit_breakers: Optional[CircuitBreakerRegistry] = (
+            CircuitBreakerRegistry(circuit_breaker) if circuit_breaker is not None else None)
+        # Lecturas idénticas concurrentes comparten una única petición a SPACE
+        self._single_flight: Optional[SingleFlight] = SingleFlight() if coalesce_requests else None
+        # Componentes con close() asíncrono (p.ej. UsageReporter) que se cierran con el cliente
+        self._background: list = []
+        self.events: Optional[SpaceEventListener] = None
+        # Métricas y trazas: sin instrumentación el coste es una comprobación por llamada
+        self.instrumentation = instrumentation
+
+        # Pool de conexiones: propio por defecto, o compartido entre clientes del proceso
+        if isinstance(pool, ConnectionPool):
+            self.pool = pool
+        else:
+            pool_options = pool or PoolOptions()
+            self.pool = get_shared_pool(pool_options) if pool_options.shared else ConnectionPool(pool_options)
         
         self.contracts = ContractModule(self)
         self.featureEvaluators = FeatureEvalModule(self)
         self.service_context = ServiceContextModule(self)
+        if local_evaluation is not None:
+            self.featureEvaluators.enable_local_evaluation(local_evaluation)
+        if evaluation_cache is not None:
+            self.featureEvaluators.enable_cache(evaluation_cache)
+        if evaluation_fallback is not None:
+            self.featureEvaluators.set_fallback(evaluation_fallback)
+        if document_cache is not None:
+            self.service_context.enable_cache(document_cache)
         
         self._session: Optional[aiohttp.ClientSession] = None
+        self._session_traced = False
+        self._connector: Optional[aiohttp.TCPConnector] = None
 
         
     async def _get_session(self) -> aiohttp.ClientSession:
         if self._session is None or self._session.closed:
-            timeout = aiohttp.ClientTimeout(total=self.timeout_ms/1000)
-            self._session = aiohttp.ClientSession(
-                headers={'x-api-key': self.api_key},
-                timeout=timeout
-            )
+            if self._connector is not None:
+                await self.pool.release(self._connector)
+            self._connector = self.pool.acquire()
+            self._session = self._new_session()
+        elif self._session_traced != (self._instrumentation is not None):
+            # La instrumentación cambió tras crear la sesión: se rehace sobre el mismo conector
+            session, self._session = self._session, self._new_session()
+            await session.close()
         return self._session
 
+    def _new_session(self) -> aiohttp.ClientSession:
+        # Las trazas de espera del pool solo se instalan con instrumentación: sin ella no cuestan nada
+        self._session_traced = self._instrumentation is not None
+        timeout = aiohttp.ClientTimeout(total=self.timeout_ms/1000)
+        return aiohttp.ClientSession(
+            headers={'x-api-key': self.api_key},
+            timeout=timeout,
+            connector=self._connector,
+            connector_owner=False,
+            trace_configs=[pool_trace_config(lambda: self._instrumentation)] if self._session_traced else None
+        )
+
+    @property
+    def instrumentation(self) -> Optional[Instrumentation]:
+        return self._instrumentation
+
+    @instrumentation.setter
+    def instrumentation(self, instrumentation: Optional[Instrumentation]) -> None:
+        self._instrumentation = instrumentation
+        if self.circuit_breakers is not None:
+            self.circuit_breakers.set_listener(instrumentation.breaker_event if instrumentation is not None else None)
+
+    def _cache_event(self, cache: str, outcome: str) -> None:
+        if self._instrumentation is not None:
+            self._instrumentation.cache_event(cache, outcome)
+
+    async def _request(self, method: str, url: str, body: Any = None, params: Optional[dict] = None,
+                       headers: Optional[dict] = None, data: Any = None,
+                       timeout: Optional[aiohttp.ClientTimeout] = None,
+                       idempotent: bool = False, hedge: bool = False,
+                       endpoint: Optional[str] = None) -> SpaceResponse:
+        """
+        Envía una petición a SPACE y devuelve la respuesta leída por completo.
+
+        `body` se codifica con el codec del cliente; `data` se envía tal cual (p.ej. FormData).
+        Las respuestas con estado >= 400 lanzan un SpaceHTTPError (subclase de
+        aiohttp.ClientResponseError) según el estado; los fallos de conexión, SpaceConnectionError,
+        y los timeouts, SpaceTimeoutError.
+        Las operaciones `idempotent` se reintentan según `retry_policy`, y las marcadas con
+        `hedge` usan peticiones de cobertura si hay `hedge_policy`. `endpoint` identifica la
+        ruta (p.ej. "GET /contracts/{userId}") para el circuit breaker y las métricas.
+        """
+        instrumentation = self._instrumentation
+        if instrumentation is None:
+            try:
+                return await self._request_with_retries(
+                    method, url, body, params, headers, data, timeout, idempotent, hedge, endpoint)
+            except SpaceError as e:
+                _log_request_error(endpoint or method, e)
+                raise
+
+        name = endpoint or method
+        context = instrumentation.request_started(name, method)
+        started = time.perf_counter()
+        status: Optional[int] = None
+        error: Optional[BaseException] = None
+        try:
+            response = await self._request_with_retries(
+                method, url, body, params, headers, data, timeout, idempotent, hedge, endpoint)
+            status = response.status
+            return response
+        except BaseException as e:
+            error = e
+            status = getattr(e, "status", None)
+            if isinstance(e, SpaceError):
+                _log_request_error(name, e)
+            raise
+        finally:
+            instrumentation.request_finished(name, method, status, error, time.perf_counter() - started, context)
+
+    async def _request_with_retries(self, method: str, url: str, body: Any, params: Optional[dict],
+                                    headers: Optional[dict], data: Any, timeout: Optional[aiohttp.ClientTimeout],
+                                    idempotent: bool, hedge: bool, endpoint: Optional[str]) -> SpaceResponse:
+        if body is not None:
+            data = self.codec.dumps(body)
+            headers = {**(headers or {}), "Content-Type": self.codec.content_type}
+        request_kwargs = {"params": params, "headers": headers, "data": data}
+        if timeout is not None:
+            request_kwargs["timeout"] = timeout
+
+        policy = self.retry_policy if idempotent else None
+        hedged = hedge and idempotent and self.hedge_policy is not None
+        breaker = None
+        if self.circuit_breakers is not None:
+            breaker = self.circuit_breakers.get(endpoint or method)
+        if policy is not None:
+            self._retry_budget.record_request()
+        attempt = 1
+        while True:
+            try:
+                return await self._attempt(method, url, request_kwargs, hedged, breaker, endpoint)
+            except aiohttp.ClientResponseError as e:
+                if policy is None or e.status not in policy.retry_statuses:
+                    raise
+                delay = self._retry_delay(policy, attempt, e.headers)
+                if delay is None:
+                    raise
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if policy is None or not policy.retry_on_connection_errors:
+                    raise
+                delay = self._retry_delay(policy, attempt)
+                if delay is None:
+                    raise
+            if self._instrumentation is not None:
+                self._instrumentation.retry(endpoint or method, attempt)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, policy: RetryPolicy, attempt: int, headers: Any = None) -> Optional[float]:
+        """Espera hasta el siguiente intento, o None si no se debe reintentar."""
+        if attempt >= policy.max_attempts:
+            return None
+        retry_after = parse_retry_after(headers.get("Retry-After")) if headers else None
+        if retry_after is not None and retry_after > policy.max_retry_after:
+            return None
+        if not self._retry_budget.try_spend():
+            return None
+        return retry_after if retry_after is not None else policy.backoff(attempt)
+
+    async def _attempt(self, method: str, url: str, request_kwargs: dict, hedged: bool,
+                       breaker: Optional[CircuitBreaker], endpoint: Optional[str] = None) -> SpaceResponse:
+        """Un intento de la petición, registrando su resultado en el circuit breaker."""
+        if breaker is None:
+            if hedged:
+                return await self._send_hedged(method, url, request_kwargs, endpoint)
+            return await self._send(method, url, request_kwargs, endpoint)
+
+        breaker.before_request()
+        try:
+            if hedged:
+                response = await self._send_hedged(method, url, request_kwargs, endpoint)
+            else:
+                response = await self._send(method, url, request_kwargs, endpoint)
+        except aiohttp.ClientResponseError as e:
+            # Los errores del cliente (4xx) no indican que SPACE esté degradado
+            if e.status >= 500 or e.status == 429:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            # Conexión, timeout o respuesta truncada (ClientPayloadError)
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelación u otro error sin veredicto sobre SPACE: se libera el hueco de prueba
+            breaker.release()
+            raise
+        breaker.record_success()
+        return response
+
+    async def _send(self, method: str, url: str, request_kwargs: dict,
+                    endpoint: Optional[str] = None) -> SpaceResponse:
+        session = await self._get_session()
+        try:
+            async with session.request(method, url, **request_kwargs) as response:
+                payload = await response.read()
+        except aiohttp.ClientConnectionError as e:
+            raise SpaceConnectionError(f"{endpoint or method}: {e}") from e
+        except asyncio.TimeoutError as e:
+            raise SpaceTimeoutError(f"{endpoint or method}: timeout") from e
+        if response.status >= 400:
+            error = http_error(response, payload)
+            error.endpoint = endpoint
+            raise error
+        return SpaceResponse(response.status, response.headers, payload)
+
+    async def _send_hedged(self, method: str, url: str, request_kwargs: dict,
+                           endpoint: Optional[str] = None) -> SpaceResponse:
+        """Lanza peticiones de cobertura escalonadas y devuelve la primera respuesta correcta."""
+        hedge_policy = self.hedge_policy
+        tasks = [asyncio.ensure_future(self._send(method, url, request_kwargs, endpoint))]
+        launched = 1
+        last_error: Optional[BaseException] = None
+        try:
+            while tasks:
+                can_hedge = launched <= hedge_policy.max_hedges
+                done, _ = await asyncio.wait(
+                    tasks, timeout=hedge_policy.delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.remove(task)
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                if not done and can_hedge:
+                    tasks.append(asyncio.ensure_future(self._send(method, url, request_kwargs, endpoint)))
+                    launched += 1
+            raise last_error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _coalesce(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Ejecuta `fn` compartiendo el resultado con las llamadas concurrentes de igual clave."""
+        if self._single_flight is None:
+            return await fn()
+        return await self._single_flight.do(key, fn)
+
+    def _on_contract_changed(self, user_id: str, usage_only: bool = False) -> None:
+        """Invalida el estado local asociado a un usuario cuyo contrato ha cambiado."""
+        self.featureEvaluators.invalidate_user(user_id, keep_quota=usage_only)
+
+    async def warm_up(self, connections: Optional[int] = None) -> int:
+        """Abre por adelantado conexiones keep-alive contra SPACE. Devuelve cuántas respondieron."""
+        count = self.pool.options.warmup_connections if connections is None else connections
+        if count <= 0:
+            return 0
+        session = await self._get_session()
+
+        async def _open_connection() -> bool:
+            try:
+                async with session.get(f"{self.http_url}/healthcheck") as response:
+                    await response.read()
+                    return response.status < 500
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return False
+
+        results = await asyncio.gather(*(_open_connection() for _ in range(count)))
+        return sum(results)
+
     async def is_connected_to_space(self) -> bool:
         try:
             timeout = aiohttp.ClientTimeout(total=5)
@@ -50,23 +349,44 @@ class SpaceClient:
                 return response.status == 200 and bool(data.get("message"))
                     
         except asyncio.TimeoutError:
-            print("Timeout: SPACE no responde después de 5 segundos")
+            error_log.warning("Timeout: SPACE no responde después de 5 segundos")
             return False
         except aiohttp.ClientConnectorError:
-            print("Error: No se puede conectar al servidor SPACE")
+            error_log.warning("Error: No se puede conectar al servidor SPACE")
             return False
         except Exception as e:
-            print(f"Error de conexión: {e}")
+            error_log.warning("Error de conexión: %s", e)
             return False
 
+    def start_event_listener(self, options: Optional[EventListenerOptions] = None) -> SpaceEventListener:
+        """Se suscribe al canal de eventos de SPACE para invalidar las cachés en cuanto algo cambia."""
+        if self.events is None:
+            self.events = SpaceEventListener(self, options)
+            self.events.start()
+            self._register_background(self.events)
+        return self.events
+
+    def _register_background(self, component) -> None:
+        """Registra un componente con close() asíncrono que debe cerrarse antes que la sesión."""
+        self._background.append(component)
+
     async def close(self) -> None:
+        # Primero los componentes en segundo plano: pueden necesitar la sesión para vaciarse
+        while self._background:
+            await self._background.pop().close()
+        self.events = None
         if self._session and not self._session.closed:
             await self._session.close()
             self._session = None
+        if self._connector is not None:
+            await self.pool.release(self._connector)
+            self._connector = None
 
     # Soporte para 'async with'
     async def __aenter__(self):
+        if self.pool.options.warmup_connections:
+            await self.warm_up()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.close()
\ No newline at end of file
+        await self.close()
@@ -1,58 +1,103 @@
 from __future__ import annotations
-import aiohttp
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional, Tuple
 if TYPE_CHECKING:
     from .config import SpaceClient
-from app_SpacePyCl.models.contracts import ContractToCreate, Subscription, UsageLevelUpdate, UsageLevel
+from app_SpacePyCl.models.contracts import Contract, ContractToCreate, Subscription
+from app_SpacePyCl.utils.bulk import BulkOptions, BulkReport, ItemSource, run_bulk
+from app_SpacePyCl.utils.pagination import paginate, query_params
+from app_SpacePyCl.utils.parser import parse_model, parse_models
+from app_SpacePyCl.utils.usage_reporter import UsageReporter, UsageReporterOptions
  
+def _contract_user_id(contract) -> Optional[str]:
+    user_contact = contract.get("userContact") if isinstance(contract, dict) else getattr(contract, "userContact", None)
+    if isinstance(user_contact, dict):
+        return user_contact.get("userId")
+    return getattr(user_contact, "userId", None)
+
 class ContractModule:
     def __init__(self, space_client: "SpaceClient"):
         self.space_client = space_client
+
+    def create_usage_reporter(self, options: Optional[UsageReporterOptions] = None) -> UsageReporter:
+        """Crea y arranca un UsageReporter; se vacía y detiene al cerrar el SpaceClient."""
+        reporter = UsageReporter(self, options)
+        reporter.start()
+        self.space_client._register_background(reporter)
+        return reporter
         
-    async def get_user_id_contract(self, user_id: str):
-        session = await self.space_client._get_session()
-        try:
-            async with session.get(
-            f"{self.space_client.http_url}/contracts/{user_id}",
-            ) as response:
-                response.raise_for_status()
-                return await response.json()
-        except aiohttp.ClientResponseError as e:
-            print(f"Error fetching contracts: {e}")
-            raise
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            raise
-        
-    async def add_contract(self, contract_to_create: ContractToCreate):
-        session = await self.space_client._get_session()
-        try:
-            async with session.post(f"{self.space_client.http_url}/contracts", json=contract_to_create,
-            ) as response:
-                response.raise_for_status()
-                return await response.json()
-        except aiohttp.ClientResponseError as e:
-            print(f"Error adding contract: {e}")
-            raise
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            raise
-        
-    async def update_contract_subscription(self, user_id: str, newSubscription: Subscription):
-        session = await self.space_client._get_session()
-        try:
-            async with session.put(f"{self.space_client.http_url}/contracts/{user_id}", json=newSubscription,
-            ) as response:
-                response.raise_for_status()
-                return await response.json()
-        except aiohttp.ClientResponseError as e:
-            print(f"Error updating contract subscription: {e}")
-            raise
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            raise
-        
-    async def update_usage_levels(self, user_id: str, usageLevels: dict[str, dict[str, int]]):
+    async def get_user_id_contract(self, user_id: str) -> Contract:
+        return await self.space_client._coalesce(
+            ("GET", "contracts", user_id), lambda: self._get_user_id_contract(user_id))
+
+    async def _get_user_id_contract(self, user_id: str) -> Contract:
+        response = await self.space_client._request(
+            "GET", f"{self.space_client.http_url}/contracts/{user_id}", idempotent=True, hedge=True,
+            endpoint="GET /contracts/{userId}")
+        return parse_model(Contract, response.body)
+
+    def iter_contracts(self, page_size: int = 100, prefetch: bool = True, max_items: Optional[int] = None,
+                       **filters: Any) -> AsyncIterator[Contract]:
+        """
+        Recorre los contratos de SPACE página a página, de forma perezosa.
+
+        `filters` se envían como parámetros de GET /contracts (p.ej. username, email, sort, order).
+        Con `prefetch` la página siguiente se pide mientras se consume la actual.
+        """
+        url = f"{self.space_client.http_url}/contracts"
+
+        async def fetch_page(offset: int, limit: int) -> list[Contract]:
+            params = {**query_params(filters), "limit": str(limit), "offset": str(offset)}
+            response = await self.space_client._request(
+                "GET", url, params=params, idempotent=True, endpoint="GET /contracts")
+            return parse_models(Contract, response.body)
+        return paginate(fetch_page, page_size, prefetch, max_items)
+
+    async def add_contract(self, contract_to_create: ContractToCreate) -> Contract:
+        response = await self.space_client._request(
+            "POST", f"{self.space_client.http_url}/contracts", body=contract_to_create,
+            endpoint="POST /contracts")
+        user_id = _contract_user_id(contract_to_create)
+        if user_id:
+            self.space_client._on_contract_changed(user_id)
+        return parse_model(Contract, response.body)
+
+    async def add_contracts(self, contracts: ItemSource[ContractToCreate],
+                            options: Optional[BulkOptions] = None) -> BulkReport:
+        """
+        Crea muchos contratos con concurrencia limitada; acepta un iterable o un stream asíncrono.
+
+        Cada elemento del informe se identifica por el userId del contrato. Con
+        `options.checkpoint_path` se puede reanudar una carga interrumpida.
+        """
+        def key(contract) -> str:
+            user_id = _contract_user_id(contract)
+            if not user_id:
+                raise ValueError("el contrato no tiene userContact.userId")
+            return user_id
+        return await run_bulk(contracts, key, self.add_contract, options)
+
+    async def update_contract_subscriptions(self, updates: ItemSource[Tuple[str, Subscription]],
+                                            options: Optional[BulkOptions] = None) -> BulkReport:
+        """
+        Cambia la suscripción de muchos usuarios, p.ej. para migrarlos tras archivar un pricing.
+
+        `updates` produce pares (user_id, nueva suscripción); se procesan como en add_contracts().
+        """
+        return await run_bulk(updates, lambda update: update[0],
+                              lambda update: self.update_contract_subscription(*update), options)
+
+    async def update_contract_subscription(self, user_id: str, newSubscription: Subscription) -> Contract:
+        response = await self.space_client._request(
+            "PUT", f"{self.space_client.http_url}/contracts/{user_id}", body=newSubscription, idempotent=True,
+            endpoint="PUT /contracts/{userId}")
+        self.space_client._on_contract_changed(user_id)
+        return parse_model(Contract, response.body)
+
+    async def update_usage_levels(self, user_id: str, usageLevels: dict[str, dict[str, int]]) -> Contract:
+        return await self._update_usage_levels(user_id, usageLevels)
+
+    async def _update_usage_levels(self, user_id: str, usageLevels: dict[str, dict[str, int]],
+                                   usage_only: bool = False) -> Contract:
         # El backend espera valores numéricos directos, no objetos UsageLevel
         transformed_levels = {}
         
@@ -67,34 +112,22 @@ class ContractModule:
             
             transformed_levels[service_name.lower()] = transformed_metrics
             
-        session = await self.space_client._get_session()
         url = f"{self.space_client.http_url}/contracts/{user_id}/usageLevels"
         
-        try:
-            async with session.put(url, json=transformed_levels) as response:
-                response.raise_for_status()
-                return await response.json()
-        except aiohttp.ClientResponseError as e:
-            print(f"Error updating usage levels: {e}")
-            raise
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            raise
-        
-    async def update_user_contact(self, user_id: str, contact_data: dict):
+        response = await self.space_client._request(
+            "PUT", url, body=transformed_levels, endpoint="PUT /contracts/{userId}/usageLevels")
+        # Con usage_only (envíos del UsageReporter) el ledger de cuotas ya cuenta estos incrementos y
+        # no hace falta volver a sembrarlo; cualquier otro cambio de consumo debe verlo
+        self.space_client._on_contract_changed(user_id, usage_only=usage_only)
+        return parse_model(Contract, response.body)
+
+    async def update_user_contact(self, user_id: str, contact_data: dict) -> Contract:
         """
         Updates the user contact information of a contract in SPACE.
         """
-        session = await self.space_client._get_session()
         url = f"{self.space_client.http_url}/contracts/{user_id}/userContact"
         
-        try:
-            async with session.put(url, json=contact_data) as response:
-                response.raise_for_status()
-                return await response.json()
-        except aiohttp.ClientResponseError as e:
-            print(f"Error updating user contact in contract: {e}")
-            raise
-        except Exception as e:
-            print(f"Unexpected error updating user contact: {e}")
-            raise
\ No newline at end of file
+        response = await self.space_client._request(
+            "PUT", url, body=contact_data, idempotent=True, endpoint="PUT /contracts/{userId}/userContact")
+        self.space_client._on_contract_changed(user_id)
+        return parse_model(Contract, response.body)
\ No newline at end of file
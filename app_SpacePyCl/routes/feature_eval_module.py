@@ -1,83 +1,369 @@
 from __future__ import annotations
-import aiohttp
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from .config import SpaceClient
-from typing import Dict, Union
+import asyncio
+from typing import Dict, Iterable, Optional, Union
 from app_SpacePyCl.models.feature_eval_result import FeatureEvaluationResult
+from app_SpacePyCl.utils.cache import EvaluationCache, EvaluationCacheOptions, TTLCache
+from app_SpacePyCl.utils.circuit_breaker import CircuitOpenError, EvaluationFallback
+from app_SpacePyCl.utils.errors import SpaceError, SpaceHTTPError
+from app_SpacePyCl.utils.log import error_log, logger
+from app_SpacePyCl.utils.parser import parse_evaluation_result, parse_evaluation_results
+from app_SpacePyCl.utils.pricing_token import LocalEvaluationOptions, PricingToken
+from app_SpacePyCl.utils.quota import QuotaLedger, QuotaLedgerOptions, UserQuota
+from app_SpacePyCl.utils.usage_reporter import UsageReporter
 
 class FeatureEvalModule:
     def __init__(self, space_client: SpaceClient):
         self.space_client = space_client
+        self.local_evaluation: Optional[LocalEvaluationOptions] = None
+        self._pricing_tokens: Dict[str, PricingToken] = {}
+        self.cache: Optional[EvaluationCache] = None
+        # None: aún no se sabe si SPACE soporta la evaluación en bloque (POST /features/{user_id})
+        self._batch_supported: Optional[bool] = None
+        self.fallback: Optional[EvaluationFallback] = None
+        self._last_known: Optional[TTLCache] = None
+        self.quota: Optional[QuotaLedger] = None
+        self._usage_reporter: Optional[UsageReporter] = None
+
+    def enable_local_evaluation(self, options: LocalEvaluationOptions) -> None:
+        """
+        Activa la evaluación local de features sin consumo a partir del pricing token, cuya firma
+        se verifica con `options.secret`.
+        """
+        options.validate()
+        if not options.verify:
+            logger.warning("Evaluación local con verify=False: no se verifica la firma de los pricing tokens")
+        self.local_evaluation = options
+        self._pricing_tokens.clear()
+
+    def disable_local_evaluation(self) -> None:
+        self.local_evaluation = None
+        self._pricing_tokens.clear()
+
+    def enable_cache(self, options: Optional[EvaluationCacheOptions] = None) -> None:
+        """Activa la caché en memoria de resultados de evaluación (TTL + LRU)."""
+        self.cache = EvaluationCache(options)
+
+    def disable_cache(self) -> None:
+        self.cache = None
+
+    def set_fallback(self, fallback: Optional[EvaluationFallback]) -> None:
+        """Configura qué devuelve evaluate() cuando el circuito hacia SPACE está abierto."""
+        self.fallback = fallback
+        self._last_known = None
+        if fallback is not None and fallback.last_known:
+            self._last_known = TTLCache(fallback.max_entries, fallback.last_known_max_age)
+
+    def _fallback_result(self, user_id: str, feature_id: str,
+                         consuming: bool) -> Optional[FeatureEvaluationResult]:
+        fallback = self.fallback
+        if fallback is None:
+            return None
+        # El último resultado conocido no sirve para conceder consumo: solo lecturas
+        if self._last_known is not None and not consuming:
+            last_result = self._last_known.get((user_id, feature_id))
+            if last_result is not None:
+                return last_result
+        default_eval = fallback.defaults.get(feature_id, fallback.default_eval)
+        if default_eval is None:
+            return None
+        return FeatureEvaluationResult(eval=default_eval)
+
+    def enable_quota_ledger(self, options: Optional[QuotaLedgerOptions] = None,
+                            reporter: Optional[UsageReporter] = None) -> None:
+        """
+        Concede el consumo esperado localmente con un ledger de cuotas.
+
+        El consumo concedido se envía a SPACE en segundo plano con `reporter` (por defecto uno
+        nuevo creado con contracts.create_usage_reporter()).
+        """
+        self.quota = QuotaLedger(options)
+        self._usage_reporter = reporter or self.space_client.contracts.create_usage_reporter()
+        self._usage_reporter.add_listener(self.quota.confirm)
+
+    def disable_quota_ledger(self) -> None:
+        self.quota = None
+        self._usage_reporter = None
+
+    def invalidate_user(self, user_id: str, keep_quota: bool = False) -> None:
+        """Descarta el estado local de un usuario (p.ej. tras cambiar su contrato)."""
+        self._pricing_tokens.pop(user_id, None)
+        if self.cache is not None:
+            self.cache.invalidate_user(user_id)
+        if self.quota is not None and not keep_quota:
+            self.quota.invalidate_user(user_id)
+
+    def invalidate_all(self) -> None:
+        """Descarta el estado local de todos los usuarios (p.ej. tras cambiar un pricing)."""
+        self._pricing_tokens.clear()
+        if self.cache is not None:
+            self.cache.clear()
+        if self.quota is not None:
+            self.quota.invalidate_all()
+
+    async def _get_quota(self, ledger: QuotaLedger, user_id: str) -> Optional[UserQuota]:
+        quota = ledger.get(user_id)
+        if quota is not None:
+            return quota
+        return await self.space_client._coalesce(("quota", user_id), lambda: self._seed_quota(ledger, user_id))
+
+    async def _seed_quota(self, ledger: QuotaLedger, user_id: str) -> Optional[UserQuota]:
+        """Siembra la cuota del usuario con su contrato y los pricings que tiene contratados."""
+        try:
+            contract = await self.space_client.contracts.get_user_id_contract(user_id)
+            services = list(contract.contractedServices.items())
+            indexes = await asyncio.gather(*(
+                self.space_client.service_context.get_pricing_index(service_name, pricing_version)
+                for service_name, pricing_version in services))
+        except SpaceError as e:
+            error_log.warning("No se pudo cargar la cuota del usuario %s: %s", user_id, e)
+            return None
+        return ledger.seed(contract, {service_name: index for (service_name, _), index in zip(services, indexes)})
+
+    async def _consume_locally(self, user_id: str, feature_id: str,
+                               expected_consumption: Dict[str, Union[int, float]]) -> Optional[FeatureEvaluationResult]:
+        """Concede el consumo con el ledger; devuelve None si debe decidirlo SPACE."""
+        ledger, reporter = self.quota, self._usage_reporter
+        if await self._get_quota(ledger, user_id) is None:
+            return None
+        result = ledger.try_consume(user_id, feature_id, expected_consumption)
+        if result is not None:
+            for (service_name, limit_name), amount in ledger.last_grant(user_id, feature_id).items():
+                reporter.record(user_id, service_name, limit_name, amount)
+        return result
+
+    async def _get_pricing_token(self, user_id: str) -> Optional[PricingToken]:
+        options = self.local_evaluation
+        token = self._pricing_tokens.get(user_id)
+        if token is not None and token.is_fresh(options.refresh_margin):
+            return token
+
+        try:
+            raw_token = await self.space_client._coalesce(
+                ("POST", "pricing-token", user_id), lambda: self.generate_user_pricing_token(user_id))
+            if not raw_token:
+                return None
+            token = PricingToken.from_token(raw_token, options)
+        except SpaceError as e:
+            # Sin token válido la evaluación la resuelve SPACE
+            error_log.warning("No se pudo obtener el pricing token del usuario %s: %s", user_id, e)
+            self._pricing_tokens.pop(user_id, None)
+            return None
+        self._pricing_tokens[user_id] = token
+        return token
+
+    async def _evaluate_locally(self, user_id: str, feature_id: str) -> Optional[FeatureEvaluationResult]:
+        """Evalúa con el pricing token; devuelve None si la respuesta requiere al servidor."""
+        token = await self._get_pricing_token(user_id)
+        if token is None:
+            return None
+        evaluation = token.feature(feature_id)
+        # Las features con límites de uso dependen del consumo actual: las resuelve SPACE
+        if evaluation is None or evaluation.get("used") or evaluation.get("limit"):
+            return None
+        return FeatureEvaluationResult(**evaluation)
 
     async def evaluate(self, 
                        user_id: str, 
                        feature_id: str, 
                        expected_consumption: Dict[str, Union[int, float]] = {}, 
-                       options: Dict[str, bool] = {}):
-        """Evalúa una característica para un usuario específico."""
-        session = await self.space_client._get_session()
+                       options: Dict[str, bool] = {}) -> FeatureEvaluationResult:
+        """
+        Evalúa una característica para un usuario específico.
+
+        Los fallos se propagan como SpaceError (SpaceNotFoundError, SpaceServerError, ...).
+        """
+        # Las evaluaciones con consumo esperado modifican el uso: nunca se sirven desde caché
+        use_cache = self.cache is not None and not expected_consumption
+        if use_cache:
+            cached_result = self.cache.get(user_id, feature_id, bool(options.get('server')))
+            self.space_client._cache_event("evaluation", "miss" if cached_result is None else "hit")
+            if cached_result is not None:
+                return cached_result
+        elif self.cache is not None:
+            self.cache.invalidate_user(user_id)
+
+        if self.local_evaluation is not None and not expected_consumption and not options.get('server'):
+            local_result = await self._evaluate_locally(user_id, feature_id)
+            if local_result is not None:
+                return local_result
+
+        if expected_consumption and self.quota is not None:
+            granted = await self._consume_locally(user_id, feature_id, expected_consumption)
+            if granted is not None:
+                return granted
+
+        server = bool(options.get('server'))
         try:
-            query_params = []
-            if options.get('server'):
-                query_params.append("server=true")
-            
-            query_string = f"?{'&'.join(query_params)}" if query_params else ""
-            
-            url = f"{self.space_client.http_url}/features/{user_id}/{feature_id}{query_string}"
-            response = await session.post(url, json=expected_consumption)
-            response.raise_for_status()
-
-            result = await response.json()
-            feature_evaluation_result = FeatureEvaluationResult(**result)
-
-            return feature_evaluation_result
-
-        except aiohttp.ClientResponseError as e:
-            print(f"Error evaluating feature: {e}")
+            if expected_consumption:
+                consumed_result = await self._evaluate_remote(user_id, feature_id, expected_consumption, options)
+                if self.quota is not None and consumed_result.error is None:
+                    self.quota.observe(user_id, consumed_result)
+                return consumed_result
+            feature_evaluation_result = await self.space_client._coalesce(
+                ("POST", "features", user_id, feature_id, server),
+                lambda: self._evaluate_remote(user_id, feature_id, expected_consumption, options))
+        except CircuitOpenError:
+            fallback_result = self._fallback_result(user_id, feature_id, bool(expected_consumption))
+            if fallback_result is None:
+                raise
+            return fallback_result
+
+        if feature_evaluation_result.error is None:
+            if use_cache:
+                self.cache.set(user_id, feature_id, feature_evaluation_result, server)
+            if self._last_known is not None:
+                self._last_known.set((user_id, feature_id), feature_evaluation_result)
+        return feature_evaluation_result
+
+    async def _evaluate_remote(self,
+                               user_id: str,
+                               feature_id: str,
+                               expected_consumption: Dict[str, Union[int, float]],
+                               options: Dict[str, bool]) -> FeatureEvaluationResult:
+        query_params = []
+        if options.get('server'):
+            query_params.append("server=true")
+
+        query_string = f"?{'&'.join(query_params)}" if query_params else ""
+
+        url = f"{self.space_client.http_url}/features/{user_id}/{feature_id}{query_string}"
+        # Sin consumo esperado la evaluación no modifica el estado: se puede reintentar
+        read_only = not expected_consumption
+        response = await self.space_client._request(
+            "POST", url, body=expected_consumption,
+            idempotent=read_only, hedge=read_only and not options.get('server'),
+            endpoint="POST /features/{userId}/{featureId}")
+
+        return parse_evaluation_result(response.body)
+
+    async def _evaluate_batch(self,
+                              user_id: str,
+                              feature_ids: list[str],
+                              options: Dict[str, bool]) -> Optional[Dict[str, FeatureEvaluationResult]]:
+        """Evalúa varias features en una sola petición; devuelve None si SPACE no la soporta."""
+        params = {"details": "true"}
+        if options.get('server'):
+            params["server"] = "true"
+        url = f"{self.space_client.http_url}/features/{user_id}"
+        try:
+            response = await self.space_client._request(
+                "POST", url, params=params, idempotent=True, endpoint="POST /features/{userId}")
+        except SpaceHTTPError as e:
+            if e.status not in (404, 405, 501):
+                raise
+            if e.status != 404:
+                self._batch_supported = False
             return None
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            raise
+        result = parse_evaluation_results(response.body)
+
+        self._batch_supported = True
+        evaluations = {feature_id: result[feature_id] for feature_id in feature_ids if feature_id in result}
+        for feature_id, evaluation in evaluations.items():
+            if evaluation.error is not None:
+                continue
+            if self.cache is not None:
+                self.cache.set(user_id, feature_id, evaluation, bool(options.get('server')))
+            if self._last_known is not None:
+                self._last_known.set((user_id, feature_id), evaluation)
+        return evaluations
+
+    async def evaluate_many(self,
+                            user_id: str,
+                            feature_ids: Iterable[str],
+                            expected_consumption: Optional[Dict[str, Dict[str, Union[int, float]]]] = None,
+                            options: Dict[str, bool] = {},
+                            max_concurrency: int = 10) -> Dict[str, Optional[FeatureEvaluationResult]]:
+        """
+        Evalúa varias características de un usuario a la vez.
+
+        `expected_consumption` asocia a cada feature su consumo esperado; esas features se evalúan
+        una a una. El resto se resuelve en una única petición si SPACE la soporta, o con llamadas
+        concurrentes (como máximo `max_concurrency` a la vez) en caso contrario. Una feature
+        cuya evaluación falla con un error HTTP queda a None; el resto de errores se propagan.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency debe ser mayor que 0")
+        feature_ids = list(dict.fromkeys(feature_ids))
+        expected_consumption = expected_consumption or {}
+        results: Dict[str, Optional[FeatureEvaluationResult]] = {}
+
+        pending = [f for f in feature_ids if not expected_consumption.get(f)]
+        if self.cache is not None:
+            server = bool(options.get('server'))
+            for feature_id in pending:
+                cached_result = self.cache.get(user_id, feature_id, server)
+                self.space_client._cache_event("evaluation", "miss" if cached_result is None else "hit")
+                if cached_result is not None:
+                    results[feature_id] = cached_result
+            pending = [f for f in pending if f not in results]
+
+        if self.local_evaluation is not None and not options.get('server'):
+            for feature_id in pending:
+                local_result = await self._evaluate_locally(user_id, feature_id)
+                if local_result is not None:
+                    results[feature_id] = local_result
+            pending = [f for f in pending if f not in results]
+
+        if len(pending) > 1 and self._batch_supported is not False:
+            try:
+                batch_results = await self._evaluate_batch(user_id, pending, options)
+            except CircuitOpenError:
+                # Cada evaluación individual aplicará el fallback configurado
+                batch_results = None
+            except SpaceError:
+                # Se reintenta feature a feature; los fallos ya se han registrado en _request
+                batch_results = None
+            if batch_results:
+                results.update(batch_results)
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _evaluate_one(feature_id: str) -> None:
+            async with semaphore:
+                try:
+                    results[feature_id] = await self.evaluate(
+                        user_id, feature_id, expected_consumption.get(feature_id) or {}, options)
+                except SpaceHTTPError:
+                    results[feature_id] = None
+
+        remaining = [f for f in feature_ids if f not in results]
+        await asyncio.gather(*(_evaluate_one(f) for f in remaining))
+        return {feature_id: results.get(feature_id) for feature_id in feature_ids}
 
     async def revert_evaluation(self, 
                                 user_id: str, 
                                 feature_id: str, 
-                                revert_to_latest: bool = False):
-        """Revierte la evaluación optimista de una característica."""
-        session = await self.space_client._get_session()
-        try:
-            params = {
-                "revert": "true", 
-                "latest": str(revert_to_latest).lower()
-            }
-            
-            url = f"{self.space_client.http_url}/features/{user_id}/{feature_id}"
-            response = await session.post(url, params=params)
-            response.raise_for_status()
-            return True
-
-        except aiohttp.ClientResponseError as e:
-            print(f"Error reverting evaluation for feature {feature_id}: {e}")
-            return False
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            raise
+                                revert_to_latest: bool = False) -> bool:
+        """Revierte la evaluación optimista de una característica; lanza SpaceError si SPACE falla."""
+        if self.quota is not None:
+            # Lo concedido por el ledger local se revierte sin ir a SPACE
+            reverted = self.quota.revert(user_id, feature_id)
+            if reverted is not None:
+                for (service_name, limit_name), amount in reverted.items():
+                    self._usage_reporter.record(user_id, service_name, limit_name, -amount)
+                if self.cache is not None:
+                    self.cache.invalidate_user(user_id)
+                return True
+        params = {
+            "revert": "true",
+            "latest": str(revert_to_latest).lower()
+        }
+
+        url = f"{self.space_client.http_url}/features/{user_id}/{feature_id}"
+        await self.space_client._request(
+            "POST", url, params=params, endpoint="POST /features/{userId}/{featureId}?revert")
+        if self.cache is not None:
+            self.cache.invalidate_user(user_id)
+        return True
 
     async def generate_user_pricing_token(self, 
-                                          user_id: str):
+                                          user_id: str) -> str:
         """Genera un token de precios para un usuario."""
-        session = await self.space_client._get_session()
-        try:
-            url = f"{self.space_client.http_url}/features/{user_id}/pricing-token"
-            response = await session.post(url)
-            response.raise_for_status()
-            result = await response.json()
-            return result.get("pricingToken", "")
-
-        except aiohttp.ClientResponseError as e:
-            print(f"Error generating pricing token: {e}")
-            return None
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            raise
\ No newline at end of file
+        url = f"{self.space_client.http_url}/features/{user_id}/pricing-token"
+        response = await self.space_client._request(
+            "POST", url, idempotent=True, endpoint="POST /features/{userId}/pricing-token")
+        result = self.space_client.codec.loads(response.body)
+        return result.get("pricingToken", "")
\ No newline at end of file
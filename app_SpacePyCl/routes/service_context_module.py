@@ -5,104 +5,141 @@ if TYPE_CHECKING:
     from .config import SpaceClient
 from datetime import datetime
 import os
-from typing import Optional
+from typing import Any, AsyncIterator, Hashable, Iterable, Optional, TypeVar, Union
 from app_SpacePyCl.models.contracts import FallbackSubscription
 from app_SpacePyCl.models.service_context import *
+from app_SpacePyCl.utils.bulk_import import ImportReport, PricingImporter, PricingImportOptions
+from app_SpacePyCl.utils.cache import DocumentCache, DocumentCacheOptions
+from app_SpacePyCl.utils.pagination import paginate, query_params
+from app_SpacePyCl.utils.parser import parse_model, parse_models
+from app_SpacePyCl.utils.pricing_index import PricingIndex, PricingIndexCache
+from app_SpacePyCl.utils.upload import UploadSource, open_upload
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
 
 class ServiceContextModule:
     def __init__(self, space_client: SpaceClient):
         self.space_client = space_client
+        self.cache: Optional[DocumentCache] = None
+        self.pricing_indexes = PricingIndexCache()
+
+    def enable_cache(self, options: Optional[DocumentCacheOptions] = None) -> None:
+        """Activa la caché de servicios y pricings con revalidación por ETag/Last-Modified."""
+        self.cache = DocumentCache(options)
+
+    def disable_cache(self) -> None:
+        self.cache = None
+
+    def invalidate_service(self, service_name: str) -> None:
+        """Descarta de la caché el servicio, sus pricings y sus índices compilados."""
+        self.pricing_indexes.invalidate_service(service_name)
+        if self.cache is not None:
+            self.cache.invalidate_service(service_name)
+
+    def invalidate_all(self) -> None:
+        self.pricing_indexes.clear()
+        if self.cache is not None:
+            self.cache.clear()
+
+    async def _get_document(self, key: Hashable, url: str, model: type[M], endpoint: str) -> M:
+        """GET de un documento, sirviéndolo desde caché o revalidándolo si es posible."""
+        entry = self.cache.get(key) if self.cache is not None else None
+        if entry is not None and self.cache.is_fresh(entry):
+            self.space_client._cache_event("document", "hit")
+            return entry.data
+
+        headers = entry.conditional_headers() if entry is not None else None
+        response = await self.space_client._request(
+            "GET", url, headers=headers, idempotent=True, endpoint=endpoint)
+        if response.status == 304 and entry is not None:
+            self.cache.refresh(key, entry)
+            self.space_client._cache_event("document", "revalidated")
+            return entry.data
+        data = parse_model(model, response.body)
+        if self.cache is not None:
+            self.space_client._cache_event("document", "miss")
+            self.cache.store(key, data, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return data
         
+    def iter_services(self, page_size: int = 100, prefetch: bool = True, max_items: Optional[int] = None,
+                      **filters: Any) -> AsyncIterator[Service]:
+        """
+        Recorre los servicios de SPACE página a página, de forma perezosa.
+
+        `filters` se envían como parámetros de GET /services (p.ej. name, disabled, order).
+        """
+        url = f"{self.space_client.http_url}/services"
+
+        async def fetch_page(offset: int, limit: int) -> list[Service]:
+            params = {**query_params(filters), "limit": str(limit), "offset": str(offset)}
+            response = await self.space_client._request(
+                "GET", url, params=params, idempotent=True, endpoint="GET /services")
+            return parse_models(Service, response.body)
+        return paginate(fetch_page, page_size, prefetch, max_items)
+
     async def get_service(self,service_name: str)->Service:
-        session = await self.space_client._get_session()
-        try:
-            response = await session.get(f"{self.space_client.http_url}/services/{service_name}")
-            response.raise_for_status()
-            service_data = await response.json()
-            #print(f"SERVICIO: {service_data}")
-            return service_data
-        
-            
-        except aiohttp.ClientResponseError as e:
-            print(f"Error fetching service {service_name}: {e}")
-            raise
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            raise
+        return await self.space_client._coalesce(
+            ("GET", "services", service_name), lambda: self._get_service(service_name))
+
+    async def _get_service(self,service_name: str)->Service:
+        return await self._get_document(
+            ("service", service_name), f"{self.space_client.http_url}/services/{service_name}", Service,
+            "GET /services/{serviceName}")
 
     async def get_pricing(self,service_name: str, pricing_version:str)-> Pricing:
-        session = await self.space_client._get_session()
-        try:
-            response = await session.get(f"{self.space_client.http_url}/services/{service_name}/pricings/{pricing_version}")
-            response.raise_for_status()
-            pricing_data = await response.json()
-            return pricing_data
-        except aiohttp.ClientResponseError as e:
-            print(f"Error fetching pricing for service {service_name}: {e}")
-            raise
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            raise
-
-    async def _post_with_file_path(self, endpoint: str, file_path: str)-> Service:        
-        try:
-            form = aiohttp.FormData()
-            with open(file_path, 'rb') as f:
-                form.add_field(
-                    'pricing', 
-                    f.read(),
-                    filename=os.path.basename(file_path),
-                    content_type='application/yaml'
-                )
-            
-                session = await self.space_client._get_session()
-                
-                response = await session.post(f"{self.space_client.http_url}{endpoint}", data=form)
-                response.raise_for_status()
-                data = await response.json()
-                return data
-            
-        except aiohttp.ClientResponseError as e:
-            print(f"Error posting file to {endpoint}: {e}")
-            return e
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            raise
+        return await self.space_client._coalesce(
+            ("GET", "pricings", service_name, pricing_version),
+            lambda: self._get_pricing(service_name, pricing_version))
+
+    async def _get_pricing(self,service_name: str, pricing_version:str)-> Pricing:
+        return await self._get_document(
+            ("pricing", service_name, pricing_version),
+            f"{self.space_client.http_url}/services/{service_name}/pricings/{pricing_version}", Pricing,
+            "GET /services/{serviceName}/pricings/{pricingVersion}")
+
+    async def get_pricing_index(self, service_name: str, pricing_version: str) -> PricingIndex:
+        """Índice compilado del pricing; se construye una vez por versión y se reutiliza."""
+        index = self.pricing_indexes.get(service_name, pricing_version)
+        if index is not None:
+            self.space_client._cache_event("pricing_index", "hit")
+            return index
+        self.space_client._cache_event("pricing_index", "miss")
+        pricing = await self.get_pricing(service_name, pricing_version)
+        return self.pricing_indexes.build(service_name, pricing)
+
+    async def _upload(self, path: str, source: UploadSource, endpoint: str, filename: Optional[str] = None,
+                      timeout: Optional[aiohttp.ClientTimeout] = None) -> Service:
+        """Sube un fichero de pricing en streaming, sin bloquear el event loop."""
+        content, filename = await open_upload(source, filename)
+        form = aiohttp.FormData()
+        form.add_field('pricing', content, filename=filename, content_type='application/yaml')
+        response = await self.space_client._request(
+            "POST", f"{self.space_client.http_url}{path}", data=form, timeout=timeout, endpoint=endpoint)
+        return parse_model(Service, response.body)
+
+    async def _post_with_file_path(self, endpoint: str, file_path: str)-> Service:
+        return await self._upload(endpoint, file_path, "POST /services/{serviceName}/pricings")
     
-    async def _post_with_file(self, endpoint: str, file: bytes) -> dict:
-        async with aiohttp.ClientSession() as session:
-            form = aiohttp.FormData()
-            form.add_field('file', file, filename='service.yml', content_type='application/x-yaml')
-            
-            # Construye la URL completa usando la base_url del SpaceClient
-            url = f"{self.space_client.base_url}{endpoint}"
-            
-            # También añade el header de API key si es necesario
-            headers = {"Authorization": f"Bearer {self.space_client.api_key}"}
-            
-            response = await session.post(url, data=form, headers=headers)
-            response.raise_for_status()
-            return await response.json()
+    async def _post_with_file(self, endpoint: str, file: UploadSource, filename: Optional[str] = None) -> Service:
+        return await self._upload(endpoint, file, "POST /services/{serviceName}/pricings", filename)
 
     async def _post_with_url(self, endpoint: str, url: str)-> Service:
         payload = {"pricing": url}
-        
-        session = await self.space_client._get_session()
-        try:
-            response = await session.post(endpoint, json=payload)
-            response.raise_for_status()
-            data = await response.json()
-            return data
-        except aiohttp.ClientResponseError as e:
-            print(f"Error posting URL to {endpoint}: {e}")
-            return e
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            raise
+        response = await self.space_client._request(
+            "POST", f"{self.space_client.http_url}{endpoint}", body=payload,
+            endpoint="POST /services/{serviceName}/pricings")
+        return parse_model(Service, response.body)
 
  
-    async def add_pricing(self, service_name:str, url:Optional[str]=None, service_file:Optional[bytes]= None):
-        
+    async def add_pricing(self, service_name:str, url:Optional[str]=None, service_file:Optional[UploadSource]= None,
+                          filename: Optional[str] = None) -> Service:
+        """
+        Añade un pricing a un servicio desde una url remota, una ruta local o `service_file`.
+
+        `service_file` puede ser bytes, un fichero abierto en binario (síncrono o asíncrono) o un
+        iterable asíncrono de bytes; se sube en streaming.
+        """
         if( not url and not service_file):
             raise ValueError("Se requiere url o service_file")
         if(url and service_file):
@@ -111,78 +148,52 @@ class ServiceContextModule:
             remote_url = url.startswith(('http://', 'https://'))
             endpoint = f"/services/{service_name}/pricings"
             if(remote_url):
-                return await self._post_with_url(endpoint,url)
+                service = await self._post_with_url(endpoint,url)
             else:
                 resolved_path = os.path.abspath(url) 
-                return await self._post_with_file_path(endpoint,resolved_path)
-        if(service_file):
-            return await self._post_with_file(f"/services/{service_name}/pricings",service_file)
+                service = await self._post_with_file_path(endpoint,resolved_path)
+        else:
+            service = await self._post_with_file(f"/services/{service_name}/pricings",service_file, filename)
+        # Un pricing nuevo cambia el servicio: se descarta lo cacheado una vez subido, para que
+        # una lectura concurrente durante la subida no deje en caché el servicio anterior
+        self.invalidate_service(service_name)
+        return service
         
 
+    async def import_pricings(self, sources: Union[str, Iterable[str]],
+                              options: Optional[PricingImportOptions] = None) -> ImportReport:
+        """
+        Importa muchos ficheros de pricing (directorios, patrones glob o rutas) en paralelo.
+
+        Crea el servicio si no existe y añade el resto de versiones como pricings. Con
+        `options.manifest_path` se saltan los ficheros cuyo contenido no ha cambiado.
+        """
+        return await PricingImporter(self, options).run(sources)
+
     async def change_pricing_availability(self, service_name: str, pricing_version: str, availability: availability_type, fallback_subscription: Optional[FallbackSubscription]=None)-> Service:
         if(availability not in [availability_type.ACTIVE, availability_type.ARCHIVED]):
             raise ValueError("Invalid availability type")
         if(availability == availability_type.ARCHIVED and not fallback_subscription):
             raise ValueError("Fallback subscription is required when archiving a pricing version")
-        session = await self.space_client._get_session()
-        try:
-            availability_good = availability.lower()
-            url = f"{self.space_client.http_url}/services/{service_name}/pricings/{pricing_version}?availability={availability_good}"
-            print("fallback_subscription:", fallback_subscription)
-            if fallback_subscription:
-                response = await session.put(url, json=fallback_subscription)
-                print(f"respuesta: {response}")
-            else:
-                response = await session.put(url)
-            response.raise_for_status()
-            service_data = await response.json()
-            return service_data
-        except aiohttp.ClientResponseError as e:
-            print(f"Error changing availability for service {service_name}, pricing version {pricing_version}: {e}")
-            raise
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            raise
-    
-    async def add_service(self, file_path: str):
-        try:
-            if not os.path.exists(file_path):
-                raise FileNotFoundError(f"Archivo no encontrado: {file_path}")
-            
-            with open(file_path, 'rb') as f:
-                data = aiohttp.FormData()
-                data.add_field(
-                    'pricing', 
-                    f.read(),
-                    filename=os.path.basename(file_path),
-                    content_type='application/yaml'
-                )                
-                
-                session = await self.space_client._get_session()
-                timeout = aiohttp.ClientTimeout(total=30) 
-                
-                async with session.post(
-                    f"{self.space_client.http_url}/services",
-                    data=data,
-                    timeout=timeout
-                ) as response:
-                    
-                    response.raise_for_status()
-                    service_data = await response.json()
-                    #print(f"Servicio creado exitosamente: {service_data}")
-                    return service_data
-                    
-        except aiohttp.ClientResponseError as e:
-            print(f"Error del servidor al añadir servicio {file_path}: {e.status} - {e.message}")
-            raise
-        except aiohttp.ClientConnectionError as e:
-            print(f"Error de conexión al añadir servicio {file_path}: {e}")
-            raise
-        except FileNotFoundError as e:
-            print(f"Archivo no encontrado: {e}")
-            raise
-        except Exception as e:
-            print(f"Error inesperado al añadir servicio {file_path}: {e}")
-            raise
-        
-        
+        availability_good = availability.lower()
+        url = f"{self.space_client.http_url}/services/{service_name}/pricings/{pricing_version}?availability={availability_good}"
+        if fallback_subscription:
+            response = await self.space_client._request(
+                "PUT", url, body=fallback_subscription, idempotent=True,
+                endpoint="PUT /services/{serviceName}/pricings/{pricingVersion}")
+        else:
+            response = await self.space_client._request(
+                "PUT", url, idempotent=True, endpoint="PUT /services/{serviceName}/pricings/{pricingVersion}")
+        service_data = parse_model(Service, response.body)
+        self.invalidate_service(service_name)
+        return service_data
+
+    async def add_service(self, file_path: UploadSource, filename: Optional[str] = None) -> Service:
+        """
+        Crea un servicio a partir de su pricing.
+
+        `file_path` es una ruta local o, como en add_pricing, bytes, un fichero abierto o un iterable
+        asíncrono de bytes. El fichero se lee por trozos en el executor y se sube en streaming.
+        """
+        timeout = aiohttp.ClientTimeout(total=30) 
+        return await self._upload("/services", file_path, "POST /services", filename, timeout)
\ No newline at end of file
@@ -0,0 +1,196 @@
+from __future__ import annotations
+import asyncio
+import atexit
+import functools
+import os
+import threading
+import weakref
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+from .config import SpaceClient
+
+
+class _LoopThread:
+    """Event loop del proceso, ejecutándose en un hilo daemon propio."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name="space-client-loop", daemon=True)
+        self.thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+
+_loop_thread: Optional[_LoopThread] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop_thread() -> _LoopThread:
+    global _loop_thread
+    if _loop_thread is None:
+        with _loop_lock:
+            if _loop_thread is None:
+                _loop_thread = _LoopThread()
+    return _loop_thread
+
+
+# Los hooks buscan _loop_lock al llamarse: el hijo lo sustituye y los forks siguientes deben usar
+# el nuevo, no el que quedó adquirido en el hijo.
+def _before_fork() -> None:
+    _loop_lock.acquire()
+
+
+def _after_fork_in_parent() -> None:
+    _loop_lock.release()
+
+
+def _after_fork_in_child() -> None:
+    # El hilo del loop no sobrevive al fork: el hijo crea el suyo cuando lo necesite
+    global _loop_thread, _loop_lock
+    _loop_thread = None
+    _loop_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_before_fork, after_in_parent=_after_fork_in_parent,
+                        after_in_child=_after_fork_in_child)
+
+
+class SyncModule:
+    """
+    Versión síncrona de un módulo del SpaceClient: cada método se ejecuta en el loop del proceso.
+    Los que devuelven un iterador asíncrono (iter_contracts, iter_services) devuelven aquí un
+    generador síncrono que pide cada elemento al loop.
+    """
+
+    def __init__(self, owner: SyncSpaceClient, name: str):
+        self._owner = owner
+        self._name = name
+
+    def __getattr__(self, attribute: str) -> Any:
+        value = getattr(getattr(self._owner._client_for_inspection(), self._name), attribute)
+        if not callable(value):
+            return value
+
+        @functools.wraps(value)
+        def call(*args, **kwargs):
+            result = self._owner._call(
+                lambda client: getattr(getattr(client, self._name), attribute)(*args, **kwargs))
+            if hasattr(result, "__anext__"):
+                return self._owner._iterate(result)
+            return result
+        return call
+
+    def __dir__(self):
+        return dir(getattr(self._owner._client_for_inspection(), self._name))
+
+
+class SyncSpaceClient:
+    """
+    Cliente síncrono de SPACE para frameworks síncronos (Django, Flask...).
+
+    Todos los SyncSpaceClient del proceso comparten un event loop que corre en un hilo en segundo
+    plano; cada uno mantiene su SpaceClient (y su sesión HTTP) vivo entre llamadas. Es seguro
+    usarlo desde varios hilos. Tras un fork (p.ej. gunicorn con preload) el proceso hijo crea su
+    propio loop y su propia sesión en la primera llamada.
+
+    Acepta los mismos argumentos que SpaceClient y expone `contracts`, `featureEvaluators` y
+    `service_context` con los mismos métodos, pero bloqueantes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._args = args
+        self._kwargs = kwargs
+        self._client: Optional[SpaceClient] = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._get_client(_get_loop_thread())
+        self.contracts = SyncModule(self, "contracts")
+        self.featureEvaluators = SyncModule(self, "featureEvaluators")
+        self.service_context = SyncModule(self, "service_context")
+        _live_clients.add(self)
+
+    def _call(self, fn: Callable[[SpaceClient], Any]) -> Any:
+        """Ejecuta fn(client) en el loop del proceso y espera su resultado."""
+        loop_thread = _get_loop_thread()
+        if threading.current_thread() is loop_thread.thread:
+            raise RuntimeError("SyncSpaceClient no puede usarse desde el propio loop; usa SpaceClient")
+        client = self._get_client(loop_thread)
+
+        async def run():
+            result = fn(client)
+            if asyncio.iscoroutine(result):
+                result = await result
+            return result
+        return asyncio.run_coroutine_threadsafe(run(), loop_thread.loop).result()
+
+    def _iterate(self, iterator: AsyncIterator[Any]) -> Iterator[Any]:
+        """Recorre un iterador asíncrono desde este hilo, avanzándolo en el loop del proceso."""
+        loop = _get_loop_thread().loop
+
+        async def step():
+            return await iterator.__anext__()
+        try:
+            while True:
+                try:
+                    yield asyncio.run_coroutine_threadsafe(step(), loop).result()
+                except StopAsyncIteration:
+                    return
+        finally:
+            # Si se deja de iterar antes de tiempo, se cierra (p.ej. cancelando el prefetch)
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None and self._pid == os.getpid():
+                asyncio.run_coroutine_threadsafe(aclose(), loop).result()
+
+    def _get_client(self, loop_thread: _LoopThread) -> SpaceClient:
+        with self._lock:
+            if self._pid != os.getpid():
+                # La sesión heredada pertenece al loop del padre y su conector ya se soltó tras el
+                # fork (ver ConnectionPool): se abandona sin cerrarla
+                self._client = None
+                self._pid = os.getpid()
+            if self._client is None:
+                async def create():
+                    return SpaceClient(*self._args, **self._kwargs)
+                self._client = asyncio.run_coroutine_threadsafe(create(), loop_thread.loop).result()
+            return self._client
+
+    def _client_for_inspection(self) -> SpaceClient:
+        return self._get_client(_get_loop_thread())
+
+    def is_connected_to_space(self) -> bool:
+        return self._call(lambda client: client.is_connected_to_space())
+
+    def warm_up(self, connections: Optional[int] = None) -> int:
+        return self._call(lambda client: client.warm_up(connections))
+
+    def start_event_listener(self, options=None):
+        return self._call(lambda client: client.start_event_listener(options))
+
+    def close(self) -> None:
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None and self._pid == os.getpid():
+            asyncio.run_coroutine_threadsafe(client.close(), _get_loop_thread().loop).result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_live_clients: "weakref.WeakSet[SyncSpaceClient]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_live_clients() -> None:
+    """Cierra los clientes abiertos al salir, para vaciar p.ej. los UsageReporter pendientes."""
+    if _loop_thread is None:
+        return
+    for client in list(_live_clients):
+        try:
+            client.close()
+        except Exception:
+            pass
@@ -0,0 +1,2 @@
+from .state import *
+from .server import *
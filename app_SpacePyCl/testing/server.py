@@ -0,0 +1,484 @@
+from __future__ import annotations
+import asyncio
+import json
+import random
+import secrets
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+import aiohttp
+from aiohttp import web
+from app_SpacePyCl.testing.state import StandInError, StandInState
+
+
+@dataclass(frozen=True)
+class StandInOptions:
+    """
+    Configuración del stand-in de SPACE.
+
+    - latency / latency_jitter: cada respuesta se retrasa `latency` ± `latency_jitter` segundos.
+    - error_rate: probabilidad de responder `error_status` sin atender la petición.
+    - api_key: si se indica, las peticiones sin esa x-api-key reciben un 401.
+    - token_secret / token_ttl: secreto HS256 y vida en segundos de los pricing tokens.
+    - seed: semilla de latencias y errores aleatorios, para que las ejecuciones sean reproducibles.
+    - events_path / events_namespace: ruta de Engine.IO y namespace de socket.io del canal de
+      eventos de pricing.
+    - ping_interval / ping_timeout: heartbeat de Engine.IO que se anuncia y se envía a los clientes.
+    """
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    api_key: Optional[str] = None
+    api_prefix: str = "api/v1"
+    token_secret: str = "space-stand-in"
+    token_ttl: float = 60.0
+    seed: Optional[int] = None
+    events_path: str = "socket.io"
+    events_namespace: str = "/events/pricings"
+    ping_interval: float = 25.0
+    ping_timeout: float = 20.0
+
+    def validate(self) -> None:
+        if self.latency < 0 or self.latency_jitter < 0 or self.latency_jitter > self.latency:
+            raise ValueError("latency y latency_jitter no pueden ser negativos y el jitter no puede superar la latencia")
+        if not 0 <= self.error_rate <= 1:
+            raise ValueError("error_rate debe estar en [0, 1]")
+        if not 400 <= self.error_status < 600:
+            raise ValueError("error_status debe ser un estado de error HTTP")
+        if self.token_ttl <= 0:
+            raise ValueError("token_ttl debe ser mayor que 0")
+        if self.ping_interval <= 0 or self.ping_timeout <= 0:
+            raise ValueError("ping_interval y ping_timeout deben ser mayores que 0")
+        if not self.events_namespace.startswith("/"):
+            raise ValueError("events_namespace debe empezar por '/'")
+
+
+class EndpointStats:
+    """Contadores de un endpoint del stand-in."""
+    __slots__ = ("requests", "errors", "injected_errors", "busy_time")
+
+    def __init__(self):
+        self.requests = 0
+        # Respuestas con estado >= 400, incluidas las inyectadas
+        self.errors = 0
+        self.injected_errors = 0
+        # Suma de los tiempos de respuesta, latencia simulada incluida
+        self.busy_time = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "injected_errors": self.injected_errors,
+            "mean_ms": self.busy_time / self.requests * 1000 if self.requests else 0.0,
+        }
+
+
+@dataclass
+class StandInStats:
+    """Throughput del stand-in desde que arrancó o desde el último reset_stats()."""
+    elapsed: float
+    max_in_flight: int
+    endpoints: Dict[str, EndpointStats] = field(default_factory=dict)
+
+    @property
+    def requests(self) -> int:
+        return sum(stats.requests for stats in self.endpoints.values())
+
+    @property
+    def errors(self) -> int:
+        return sum(stats.errors for stats in self.endpoints.values())
+
+    @property
+    def throughput(self) -> float:
+        """Peticiones por segundo."""
+        return self.requests / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "elapsed": self.elapsed,
+            "requests": self.requests,
+            "errors": self.errors,
+            "throughput": self.throughput,
+            "max_in_flight": self.max_in_flight,
+            "endpoints": {name: stats.to_dict() for name, stats in sorted(self.endpoints.items())},
+        }
+
+
+class SpaceStandIn:
+    """
+    Servidor aiohttp en proceso que imita a SPACE, para tests y benchmarks sin un SPACE real.
+
+    Implementa los endpoints que usa el cliente (servicios, pricings, contratos, usageLevels,
+    features, pricing-token y healthcheck) sobre un StandInState en memoria, y el canal de eventos
+    de pricing con socket.io (Engine.IO v4 sobre WebSocket): al crear, archivar o reactivar un
+    pricing se emite el evento correspondiente, y emit() permite enviar cualquiera. Permite simular
+    latencia, inyectar errores y medir el throughput por endpoint. Los endpoints se nombran como
+    en el cliente, p.ej. "POST /features/{userId}/{featureId}".
+
+        async with SpaceStandIn(StandInOptions(latency=0.005)) as stand_in:
+            client = SpaceClient(stand_in.url, "api-key")
+    """
+
+    def __init__(self, options: Optional[StandInOptions] = None, host: str = "127.0.0.1", port: int = 0):
+        self.options = options or StandInOptions()
+        self.host = host
+        self.port = port
+        self.state = StandInState()
+        self.url: Optional[str] = None
+        self.app = self._build_app()
+        self._runner: Optional[web.AppRunner] = None
+        # [endpoint o None para cualquiera, estado, veces restantes]
+        self._failures: List[List[Any]] = []
+        self._encoded: Dict[str, bytes] = {}
+        # WebSockets unidos al namespace de eventos
+        self._event_sockets: Set[web.WebSocketResponse] = set()
+        self.event_connections = 0
+        self.pongs = 0
+        self.reset_stats()
+
+    @property
+    def options(self) -> StandInOptions:
+        return self._options
+
+    @options.setter
+    def options(self, options: StandInOptions) -> None:
+        """Las opciones pueden cambiarse con el servidor en marcha (p.ej. para subir la latencia)."""
+        options.validate()
+        self._options = options
+        self._random = random.Random(options.seed)
+
+    async def start(self) -> str:
+        """Arranca el servidor y devuelve su url, que se pasa tal cual a SpaceClient."""
+        if self._runner is None:
+            runner = web.AppRunner(self.app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, self.host, self.port)
+            await site.start()
+            self._runner = runner
+            host, port = runner.addresses[0][:2]
+            self.url = f"http://{host}:{port}"
+            self.reset_stats()
+        return self.url
+
+    async def close(self) -> None:
+        runner, self._runner = self._runner, None
+        if runner is not None:
+            await self.disconnect_event_clients()
+            await runner.cleanup()
+
+    async def __aenter__(self) -> "SpaceStandIn":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def inject_errors(self, times: int = 1, status: int = 503, endpoint: Optional[str] = None) -> None:
+        """Las próximas `times` peticiones a `endpoint` (a cualquiera si es None) responden `status`."""
+        self._failures.append([endpoint, status, times])
+
+    async def emit(self, code: str, **details: Any) -> None:
+        """Emite un evento {"code", "details"} a los clientes del canal de eventos."""
+        await self._broadcast(json.dumps(["message", {"code": code, "details": details}]))
+
+    async def disconnect_event_clients(self) -> None:
+        """Cierra las conexiones del canal de eventos (p.ej. para probar la reconexión)."""
+        for websocket in list(self._event_sockets):
+            await websocket.close()
+        self._event_sockets.clear()
+
+    async def _broadcast(self, data: str) -> None:
+        packet = f"42{self._options.events_namespace},{data}"
+        for websocket in list(self._event_sockets):
+            if not websocket.closed:
+                await websocket.send_str(packet)
+
+    def reset_stats(self) -> None:
+        self._started = time.perf_counter()
+        self._endpoints: Dict[str, EndpointStats] = {}
+        self._in_flight = 0
+        self._max_in_flight = 0
+
+    def stats(self) -> StandInStats:
+        return StandInStats(time.perf_counter() - self._started, self._max_in_flight, dict(self._endpoints))
+
+    # ------------------------------------------------------------------ aplicación
+
+    def _build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        prefix = "/" + self.options.api_prefix.strip("/")
+        self._prefix = prefix
+        routes = [
+            ("GET", "/healthcheck", self._healthcheck),
+            ("GET", "/services", self._list_services),
+            ("POST", "/services", self._add_service),
+            ("DELETE", "/services", self._delete_services),
+            ("GET", "/services/{serviceName}", self._get_service),
+            ("POST", "/services/{serviceName}/pricings", self._add_pricing),
+            ("GET", "/services/{serviceName}/pricings/{pricingVersion}", self._get_pricing),
+            ("PUT", "/services/{serviceName}/pricings/{pricingVersion}", self._change_availability),
+            ("GET", "/contracts", self._list_contracts),
+            ("POST", "/contracts", self._add_contract),
+            ("DELETE", "/contracts", self._delete_contracts),
+            ("GET", "/contracts/{userId}", self._get_contract),
+            ("PUT", "/contracts/{userId}", self._update_subscription),
+            ("PUT", "/contracts/{userId}/usageLevels", self._update_usage_levels),
+            ("PUT", "/contracts/{userId}/userContact", self._update_user_contact),
+            ("POST", "/features/{userId}", self._evaluate_all),
+            ("POST", "/features/{userId}/pricing-token", self._pricing_token),
+            ("POST", "/features/{userId}/{featureId}", self._evaluate),
+        ]
+        for method, path, handler in routes:
+            app.router.add_route(method, prefix + path, handler)
+        # Engine.IO no va bajo el prefijo de la API
+        self._events_path = "/" + self.options.events_path.strip("/") + "/"
+        app.router.add_route("GET", self._events_path, self._events)
+        return app
+
+    def _endpoint(self, request: web.Request) -> str:
+        resource = request.match_info.route.resource
+        if resource is None:
+            return f"{request.method} <unmatched>"
+        return f"{request.method} {resource.canonical[len(self._prefix):]}"
+
+    def _injected_status(self, endpoint: str) -> Optional[int]:
+        for failure in self._failures:
+            if failure[0] is None or failure[0] == endpoint:
+                failure[2] -= 1
+                if failure[2] <= 0:
+                    self._failures.remove(failure)
+                return failure[1]
+        if self._options.error_rate and self._random.random() < self._options.error_rate:
+            return self._options.error_status
+        return None
+
+    @web.middleware
+    async def _middleware(self, request: web.Request,
+                          handler: Callable[[web.Request], Awaitable[web.StreamResponse]]) -> web.StreamResponse:
+        if request.path == self._events_path:
+            # El canal de eventos es de larga duración: no cuenta en las estadísticas de la API
+            if self._options.api_key is not None and request.headers.get("x-api-key") != self._options.api_key:
+                return _error(401, "Invalid API key")
+            try:
+                return await handler(request)
+            except StandInError as e:
+                return _error(e.status, e.message)
+        started = time.perf_counter()
+        endpoint = self._endpoint(request)
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = self._endpoints[endpoint] = EndpointStats()
+        stats.requests += 1
+        self._in_flight += 1
+        self._max_in_flight = max(self._max_in_flight, self._in_flight)
+        status = 500
+        try:
+            options = self._options
+            if options.latency:
+                await asyncio.sleep(self._random.uniform(
+                    options.latency - options.latency_jitter, options.latency + options.latency_jitter))
+            injected = self._injected_status(endpoint)
+            if injected is not None:
+                stats.injected_errors += 1
+                status = injected
+                return _error(injected, "Injected error")
+            if (options.api_key is not None and request.headers.get("x-api-key") != options.api_key
+                    and not endpoint.endswith("/healthcheck")):
+                status = 401
+                return _error(401, "Invalid API key")
+            try:
+                response = await handler(request)
+            except StandInError as e:
+                response = _error(e.status, e.message)
+            status = response.status
+            return response
+        finally:
+            self._in_flight -= 1
+            if status >= 400:
+                stats.errors += 1
+            stats.busy_time += time.perf_counter() - started
+
+    # ------------------------------------------------------------------ canal de eventos
+
+    async def _events(self, request: web.Request) -> web.StreamResponse:
+        """Servidor mínimo de socket.io: handshake, heartbeat y unión al namespace de eventos."""
+        if request.query.get("EIO") != "4" or request.query.get("transport") != "websocket":
+            raise StandInError(400, "Only Engine.IO v4 over websocket is supported")
+        options = self._options
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        self.event_connections += 1
+        await websocket.send_str("0" + json.dumps({
+            "sid": secrets.token_hex(10), "upgrades": [], "maxPayload": 1_000_000,
+            "pingInterval": int(options.ping_interval * 1000), "pingTimeout": int(options.ping_timeout * 1000)}))
+        pinger = asyncio.ensure_future(self._ping(websocket, options.ping_interval))
+        try:
+            async for message in websocket:
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                packet = message.data
+                if packet == "3":
+                    self.pongs += 1
+                elif packet == "1":
+                    break
+                elif packet.startswith("40"):
+                    namespace = packet[2:].partition(",")[0] or "/"
+                    if namespace == options.events_namespace:
+                        self._event_sockets.add(websocket)
+                        await websocket.send_str(f'40{namespace},{json.dumps({"sid": secrets.token_hex(10)})}')
+                    else:
+                        await websocket.send_str(f'44{namespace},{json.dumps({"message": "Invalid namespace"})}')
+                elif packet.startswith("41"):
+                    self._event_sockets.discard(websocket)
+        finally:
+            pinger.cancel()
+            self._event_sockets.discard(websocket)
+        return websocket
+
+    async def _ping(self, websocket: web.WebSocketResponse, interval: float) -> None:
+        while not websocket.closed:
+            await asyncio.sleep(interval)
+            try:
+                await websocket.send_str("2")
+            except ConnectionError:
+                return
+
+    # ------------------------------------------------------------------ handlers
+
+    async def _healthcheck(self, request: web.Request) -> web.Response:
+        return web.json_response({"message": "Service is up and running!"})
+
+    async def _list_services(self, request: web.Request) -> web.Response:
+        return web.json_response(self.state.list_services(request.query))
+
+    async def _add_service(self, request: web.Request) -> web.Response:
+        record = self.state.add_service(await _read_pricing(request))
+        await self.emit("PRICING_CREATED", serviceName=record["name"], pricingVersion=next(iter(record["active"])))
+        return web.json_response(self.state.service_json(record), status=201)
+
+    async def _delete_services(self, request: web.Request) -> web.Response:
+        self.state.delete_services()
+        self._encoded.clear()
+        return web.Response(status=204)
+
+    async def _get_service(self, request: web.Request) -> web.Response:
+        record = self.state.get_service(request.match_info["serviceName"])
+        etag = f'"{record["name"].lower()}-{record["revision"]}"'
+        return _conditional(request, etag, lambda: json.dumps(self.state.service_json(record)).encode())
+
+    async def _add_pricing(self, request: web.Request) -> web.Response:
+        service_name = request.match_info["serviceName"]
+        record = self.state.add_pricing(service_name, await _read_pricing(request))
+        await self.emit("PRICING_CREATED", serviceName=record["name"], pricingVersion=list(record["active"])[-1])
+        return web.json_response(self.state.service_json(record), status=201)
+
+    async def _get_pricing(self, request: web.Request) -> web.Response:
+        pricing = self.state.get_pricing(request.match_info["serviceName"], request.match_info["pricingVersion"])
+
+        def encode() -> bytes:
+            # Un pricing no cambia una vez creado: se serializa una sola vez
+            encoded = self._encoded.get(pricing["id"])
+            if encoded is None:
+                encoded = self._encoded[pricing["id"]] = json.dumps(pricing).encode()
+            return encoded
+        return _conditional(request, f'"{pricing["id"]}"', encode)
+
+    async def _change_availability(self, request: web.Request) -> web.Response:
+        availability = request.query.get("availability", "").lower()
+        fallback = await _read_json(request) if request.can_read_body else None
+        service_name, version = request.match_info["serviceName"], request.match_info["pricingVersion"]
+        revision = self.state.get_service(service_name)["revision"]
+        record = self.state.change_availability(service_name, version, availability, fallback)
+        if record["revision"] != revision:
+            code = "PRICING_ACTIVED" if availability == "active" else "PRICING_ARCHIVED"
+            await self.emit(code, serviceName=record["name"], pricingVersion=version)
+        return web.json_response(self.state.service_json(record))
+
+    async def _list_contracts(self, request: web.Request) -> web.Response:
+        return web.json_response(self.state.list_contracts(request.query))
+
+    async def _add_contract(self, request: web.Request) -> web.Response:
+        contract = self.state.add_contract(await _read_json(request))
+        return web.json_response(self.state.contract_json(contract), status=201)
+
+    async def _delete_contracts(self, request: web.Request) -> web.Response:
+        self.state.delete_contracts()
+        return web.Response(status=204)
+
+    async def _get_contract(self, request: web.Request) -> web.Response:
+        contract = self.state.get_contract(request.match_info["userId"])
+        return web.json_response(self.state.contract_json(contract))
+
+    async def _update_subscription(self, request: web.Request) -> web.Response:
+        contract = self.state.update_subscription(request.match_info["userId"], await _read_json(request))
+        return web.json_response(self.state.contract_json(contract))
+
+    async def _update_usage_levels(self, request: web.Request) -> web.Response:
+        contract = self.state.update_usage_levels(request.match_info["userId"], await _read_json(request))
+        return web.json_response(self.state.contract_json(contract))
+
+    async def _update_user_contact(self, request: web.Request) -> web.Response:
+        contract = self.state.update_user_contact(request.match_info["userId"], await _read_json(request))
+        return web.json_response(self.state.contract_json(contract))
+
+    async def _evaluate_all(self, request: web.Request) -> web.Response:
+        results = self.state.evaluate_all(request.match_info["userId"])
+        if request.query.get("details", "").lower() != "true":
+            return web.json_response({feature_id: result["eval"] for feature_id, result in results.items()})
+        return web.json_response(results)
+
+    async def _pricing_token(self, request: web.Request) -> web.Response:
+        token = self.state.pricing_token(
+            request.match_info["userId"], self._options.token_secret, self._options.token_ttl)
+        return web.json_response({"pricingToken": token})
+
+    async def _evaluate(self, request: web.Request) -> web.Response:
+        user_id, feature_id = request.match_info["userId"], request.match_info["featureId"]
+        if request.query.get("revert", "").lower() == "true":
+            self.state.revert(user_id, feature_id, request.query.get("latest", "").lower() == "true")
+            return web.Response(status=204)
+        expected_consumption = await _read_json(request) if request.can_read_body else {}
+        return web.json_response(self.state.evaluate(user_id, feature_id, expected_consumption or {}))
+
+
+def _error(status: int, message: str) -> web.Response:
+    return web.json_response({"error": message}, status=status)
+
+
+def _conditional(request: web.Request, etag: str, encode: Callable[[], bytes]) -> web.Response:
+    """Responde 304 si el cliente ya tiene la versión `etag`; si no, el documento con su ETag."""
+    if request.headers.get("If-None-Match") == etag:
+        return web.Response(status=304, headers={"ETag": etag})
+    return web.Response(body=encode(), content_type="application/json", headers={"ETag": etag})
+
+
+async def _read_json(request: web.Request) -> Any:
+    raw = await request.read()
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        raise StandInError(400, f"Invalid JSON body: {e}") from e
+
+
+async def _read_pricing(request: web.Request) -> bytes:
+    """Lee el campo `pricing`: un fichero multipart o, en JSON, la url desde la que descargarlo."""
+    if request.content_type != "multipart/form-data":
+        url = (await _read_json(request)).get("pricing")
+        if not url:
+            raise StandInError(400, "A pricing file or url is required")
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    return await response.read()
+        except aiohttp.ClientError as e:
+            raise StandInError(400, f"Could not download the pricing from {url}: {e}") from e
+    reader = await request.multipart()
+    async for part in reader:
+        if part.name == "pricing":
+            return bytes(await part.read())
+    raise StandInError(400, "A pricing file is required")
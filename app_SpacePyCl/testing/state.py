@@ -0,0 +1,557 @@
+from __future__ import annotations
+import base64
+import calendar
+import copy
+import hashlib
+import hmac
+import json
+import secrets
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+Amount = Union[int, float]
+
+DEFAULT_PAGE_SIZE = 20
+
+# Unidades de periodo de duración fija; MONTH y YEAR siguen el calendario
+_FIXED_UNITS = {
+    "SEC": timedelta(seconds=1),
+    "MIN": timedelta(minutes=1),
+    "HOUR": timedelta(hours=1),
+    "DAY": timedelta(days=1),
+}
+
+
+class StandInError(Exception):
+    """Error que el stand-in devuelve como respuesta HTTP con estado `status`."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def load_pricing_document(raw: bytes) -> Dict[str, Any]:
+    """Lee un fichero de pricing en YAML o JSON. PyYAML solo es necesario para YAML."""
+    try:
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise StandInError(400, f"The pricing is not UTF-8 text: {e}") from e
+    if text.lstrip().startswith("{"):
+        try:
+            document = json.loads(text)
+        except ValueError as e:
+            raise StandInError(400, f"Invalid pricing JSON: {e}") from e
+    else:
+        try:
+            import yaml
+        except ImportError as e:
+            raise StandInError(415, "PyYAML is required to upload YAML pricings "
+                                    "(pip install app_SpacePyCl[testing])") from e
+        try:
+            document = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise StandInError(400, f"Invalid pricing YAML: {e}") from e
+    if not isinstance(document, dict):
+        raise StandInError(400, "The pricing must be an object")
+    for key in ("saasName", "version", "features"):
+        if not document.get(key):
+            raise StandInError(400, f"Missing required field {key}")
+    return document
+
+
+def normalize_pricing(document: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Convierte un fichero de pricing al JSON con el que responde SPACE.
+
+    Añade `name` a cada elemento y aplana los `{value: ...}` de planes y add-ons.
+    """
+    def named(items: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+        return {name: {**(spec or {}), "name": name} for name, spec in (items or {}).items()}
+
+    def values(items: Optional[Mapping[str, Any]]) -> Optional[Dict[str, Any]]:
+        if items is None:
+            return None
+        return {name: spec.get("value") if isinstance(spec, dict) else spec for name, spec in items.items()}
+
+    plans = named(document.get("plans"))
+    addons = named(document.get("addOns") or document.get("addons"))
+    for item in (*plans.values(), *addons.values()):
+        for key in ("features", "usageLimits", "usageLimitsExtensions"):
+            if key in item:
+                item[key] = values(item[key])
+    created_at = document.get("createdAt") or date.today()
+    return {
+        "id": secrets.token_hex(12),
+        "version": str(document["version"]),
+        "currency": document.get("currency") or "USD",
+        "createdAt": created_at.isoformat() if isinstance(created_at, (date, datetime)) else str(created_at),
+        "features": named(document["features"]),
+        "usageLimits": named(document.get("usageLimits")),
+        "plans": plans,
+        "addOns": addons,
+    }
+
+
+def _find(items: Optional[Mapping[str, Any]], name: str) -> Optional[str]:
+    """Clave de `items` que coincide con `name` sin distinguir mayúsculas."""
+    if not items:
+        return None
+    if name in items:
+        return name
+    lowered = name.lower()
+    for key in items:
+        if key.lower() == lowered:
+            return key
+    return None
+
+
+def _lookup(items: Mapping[str, Any], name: str) -> Any:
+    key = _find(items, name)
+    return items[key] if key is not None else None
+
+
+def _add_period(moment: datetime, period: Mapping[str, Any], times: int = 1) -> datetime:
+    """Suma `times` periodos ({"value", "unit"} del pricing) como hace SPACE al renovar un límite."""
+    unit, amount = period["unit"], period["value"] * times
+    if unit in _FIXED_UNITS:
+        return moment + _FIXED_UNITS[unit] * amount
+    if unit not in ("MONTH", "YEAR"):
+        raise StandInError(400, f"Unknown period unit {unit}")
+    month_index = moment.month - 1 + amount * (12 if unit == "YEAR" else 1)
+    year, month = moment.year + month_index // 12, month_index % 12 + 1
+    return moment.replace(year=year, month=month, day=min(moment.day, calendar.monthrange(year, month)[1]))
+
+
+def _iso(moment: datetime) -> str:
+    return moment.isoformat().replace("+00:00", "Z")
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+class ResolvedSubscription:
+    """Valores efectivos de las features y límites de un plan con sus add-ons."""
+    __slots__ = ("pricing", "features", "limits", "linked")
+
+    def __init__(self, pricing: Dict[str, Any], plan_name: Optional[str], addons: Mapping[str, int]):
+        self.pricing = pricing
+        plan = pricing["plans"].get(_find(pricing["plans"], plan_name or "") or "") or {}
+        self.features: Dict[str, Any] = {}
+        for name, spec in pricing["features"].items():
+            value = spec.get("value")
+            self.features[name] = spec.get("defaultValue") if value is None else value
+        self.features.update(plan.get("features") or {})
+        self.limits: Dict[str, Any] = {}
+        # feature -> límites de uso enlazados
+        self.linked: Dict[str, List[str]] = {}
+        for name, spec in pricing["usageLimits"].items():
+            value = spec.get("value")
+            self.limits[name] = spec.get("defaultValue") if value is None else value
+            for feature_name in spec.get("linkedFeatures") or ():
+                self.linked.setdefault(feature_name, []).append(name)
+        self.limits.update(plan.get("usageLimits") or {})
+        for addon_name, quantity in addons.items():
+            addon = pricing["addOns"].get(_find(pricing["addOns"], addon_name) or "")
+            if addon is None:
+                continue
+            for name, value in (addon.get("features") or {}).items():
+                current = self.features.get(name)
+                self.features[name] = (current or value) if isinstance(value, bool) else value
+            self.limits.update(addon.get("usageLimits") or {})
+            for name, extension in (addon.get("usageLimitsExtensions") or {}).items():
+                if isinstance(extension, (int, float)) and isinstance(self.limits.get(name), (int, float)):
+                    self.limits[name] += extension * quantity
+
+
+class StandInState:
+    """
+    Estado en memoria del stand-in de SPACE: servicios, pricings y contratos.
+
+    Las evaluaciones siguen la semántica habitual de los pricings de SPACE: una feature está
+    activa si su valor para el plan y add-ons contratados lo está y el consumo de cada límite
+    enlazado, sumando el consumo esperado, no supera su valor. No se interpretan `expression`
+    ni `serverExpression`.
+    """
+
+    def __init__(self, clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc)):
+        self._clock = clock
+        # nombre del servicio en minúsculas -> registro del servicio
+        self.services: Dict[str, Dict[str, Any]] = {}
+        self.contracts: Dict[str, Dict[str, Any]] = {}
+        # (usuario, feature) -> consumos concedidos, para revertirlos
+        self._consumptions: Dict[Tuple[str, str], List[Dict[Tuple[str, str], Amount]]] = {}
+        self._resolved: Dict[Tuple[Any, ...], ResolvedSubscription] = {}
+
+    # ------------------------------------------------------------------ servicios y pricings
+
+    def _service(self, service_name: str) -> Dict[str, Any]:
+        record = self.services.get(service_name.lower())
+        if record is None:
+            raise StandInError(404, f"Service {service_name} not found")
+        return record
+
+    def service_json(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "name": record["name"],
+            "disabled": record["disabled"],
+            "activePricings": {version: {"id": p["id"]} for version, p in record["active"].items()},
+            "archivedPricings": {version: {"id": p["id"]} for version, p in record["archived"].items()},
+        }
+
+    def get_service(self, service_name: str) -> Dict[str, Any]:
+        return self._service(service_name)
+
+    def list_services(self, query: Mapping[str, str]) -> List[Dict[str, Any]]:
+        records = list(self.services.values())
+        if "name" in query:
+            records = [r for r in records if query["name"].lower() in r["name"].lower()]
+        if "disabled" in query:
+            disabled = query["disabled"].lower() == "true"
+            records = [r for r in records if r["disabled"] == disabled]
+        return [self.service_json(r) for r in _page(records, query)]
+
+    def add_service(self, raw: bytes) -> Dict[str, Any]:
+        document = load_pricing_document(raw)
+        name = str(document["saasName"])
+        if name.lower() in self.services:
+            raise StandInError(409, f"Service {name} already exists")
+        pricing = normalize_pricing(document)
+        record = {"name": name, "disabled": False, "revision": 0,
+                  "active": {pricing["version"]: pricing}, "archived": {}}
+        self.services[name.lower()] = record
+        return record
+
+    def add_pricing(self, service_name: str, raw: bytes) -> Dict[str, Any]:
+        record = self._service(service_name)
+        document = load_pricing_document(raw)
+        if str(document["saasName"]).lower() != record["name"].lower():
+            raise StandInError(400, f"The pricing belongs to {document['saasName']}, not to {record['name']}")
+        pricing = normalize_pricing(document)
+        version = pricing["version"]
+        if version in record["active"] or version in record["archived"]:
+            raise StandInError(409, f"Pricing {version} of {record['name']} already exists")
+        record["active"][version] = pricing
+        record["revision"] += 1
+        return record
+
+    def get_pricing(self, service_name: str, version: str) -> Dict[str, Any]:
+        record = self._service(service_name)
+        pricing = record["active"].get(version) or record["archived"].get(version)
+        if pricing is None:
+            raise StandInError(404, f"Pricing {version} of {service_name} not found")
+        return pricing
+
+    def change_availability(self, service_name: str, version: str, availability: str,
+                            fallback: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+        record = self._service(service_name)
+        self.get_pricing(service_name, version)
+        if availability == "active":
+            if version in record["archived"]:
+                record["active"][version] = record["archived"].pop(version)
+                record["revision"] += 1
+            return record
+        if availability != "archived":
+            raise StandInError(400, f"Invalid availability {availability}")
+        if version not in record["active"]:
+            return record
+        if len(record["active"]) == 1:
+            raise StandInError(400, "Cannot archive the last active pricing of a service")
+        if not fallback or not fallback.get("subscriptionPlan"):
+            raise StandInError(400, "A fallback subscription is required to archive a pricing")
+        target_version = [v for v in record["active"] if v != version][-1]
+        target = record["active"][target_version]
+        if _find(target["plans"], fallback["subscriptionPlan"]) is None:
+            raise StandInError(400, f"Plan {fallback['subscriptionPlan']} not found in {target_version}")
+        record["archived"][version] = record["active"].pop(version)
+        record["revision"] += 1
+        # Los contratos con el pricing archivado pasan a la suscripción de respaldo
+        for contract in self.contracts.values():
+            service = _find(contract["contractedServices"], record["name"])
+            if service is not None and contract["contractedServices"][service] == version:
+                self._novate(contract, {
+                    "contractedServices": {**contract["contractedServices"], service: target_version},
+                    "subscriptionPlans": {**contract["subscriptionPlans"], service: fallback["subscriptionPlan"]},
+                    "subscriptionAddOns": {**contract["subscriptionAddOns"],
+                                           service: dict(fallback.get("subscriptionAddOns") or {})},
+                })
+        return record
+
+    def delete_services(self) -> None:
+        self.services.clear()
+        self._resolved.clear()
+
+    # ------------------------------------------------------------------ contratos
+
+    def _contract(self, user_id: str) -> Dict[str, Any]:
+        contract = self.contracts.get(user_id)
+        if contract is None:
+            raise StandInError(404, f"Contract for user {user_id} not found")
+        return contract
+
+    def contract_json(self, contract: Dict[str, Any]) -> Dict[str, Any]:
+        data = copy.deepcopy(contract)
+        period = data["billingPeriod"]
+        period["startDate"], period["endDate"] = _iso(period["startDate"]), _iso(period["endDate"])
+        for limits in data["usageLevels"].values():
+            for level in limits.values():
+                if level.get("resetTimeStamp") is not None:
+                    level["resetTimeStamp"] = _iso(level["resetTimeStamp"])
+        for entry in data["history"]:
+            entry["startDate"], entry["endDate"] = _iso(entry["startDate"]), _iso(entry["endDate"])
+        return data
+
+    def get_contract(self, user_id: str) -> Dict[str, Any]:
+        contract = self._contract(user_id)
+        for service in contract["usageLevels"]:
+            self._roll(contract, service)
+        return contract
+
+    def list_contracts(self, query: Mapping[str, str]) -> List[Dict[str, Any]]:
+        contracts = list(self.contracts.values())
+        for key in ("username", "email", "firstName", "lastName"):
+            if key in query:
+                contracts = [c for c in contracts if c["userContact"].get(key) == query[key]]
+        return [self.contract_json(c) for c in _page(contracts, query)]
+
+    def _subscription(self, body: Mapping[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Valida una suscripción. Como SPACE, conserva los nombres de servicio tal y como llegan;
+        solo `usageLevels` los guarda en minúsculas.
+        """
+        services = body.get("contractedServices")
+        if not isinstance(services, dict) or not services:
+            raise StandInError(400, "contractedServices is required")
+        plans = body.get("subscriptionPlans") or {}
+        addons = body.get("subscriptionAddOns") or {}
+        subscription = {"contractedServices": {}, "subscriptionPlans": {}, "subscriptionAddOns": {}}
+        for service_name, version in services.items():
+            record = self._service(service_name)
+            pricing = record["active"].get(str(version))
+            if pricing is None:
+                raise StandInError(400, f"Pricing {version} of {service_name} is not active")
+            plan = _lookup(plans, service_name)
+            if pricing["plans"] and _find(pricing["plans"], plan or "") is None:
+                raise StandInError(400, f"Plan {plan} not found in {service_name} {version}")
+            service_addons = dict(_lookup(addons, service_name) or {})
+            for addon_name in service_addons:
+                addon = pricing["addOns"].get(_find(pricing["addOns"], addon_name) or "")
+                if addon is None:
+                    raise StandInError(400, f"Add-on {addon_name} not found in {service_name} {version}")
+                available_for = addon.get("availableFor")
+                if plan and available_for and _find(dict.fromkeys(available_for), plan) is None:
+                    raise StandInError(400, f"Add-on {addon_name} is not available for plan {plan}")
+            subscription["contractedServices"][service_name] = str(version)
+            if plan:
+                subscription["subscriptionPlans"][service_name] = plan
+            subscription["subscriptionAddOns"][service_name] = service_addons
+        return subscription
+
+    def _usage_levels(self, subscription: Mapping[str, Any],
+                      previous: Mapping[str, Any]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        now = self._clock()
+        levels: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for service_name, version in subscription["contractedServices"].items():
+            service = service_name.lower()
+            pricing = self.services[service]["active"][version]
+            for name, spec in pricing["usageLimits"].items():
+                if spec.get("valueType") == "BOOLEAN":
+                    continue
+                kept = previous.get(service, {}).get(name)
+                if kept is not None:
+                    level = dict(kept)
+                else:
+                    level = {"consumed": 0}
+                    if spec.get("type") == "RENEWABLE" and spec.get("period"):
+                        level["resetTimeStamp"] = _add_period(now, spec["period"])
+                levels.setdefault(service, {})[name] = level
+        return levels
+
+    def add_contract(self, body: Mapping[str, Any]) -> Dict[str, Any]:
+        contact = body.get("userContact") or {}
+        user_id = contact.get("userId")
+        if not user_id or not contact.get("username"):
+            raise StandInError(400, "userContact.userId and userContact.username are required")
+        if user_id in self.contracts:
+            raise StandInError(409, f"Contract for user {user_id} already exists")
+        subscription = self._subscription(body)
+        billing = body.get("billingPeriod") or {}
+        renewal_days = billing.get("renewalDays") or 30
+        now = self._clock()
+        contract = {
+            "userContact": dict(contact),
+            "billingPeriod": {"startDate": now, "endDate": now + timedelta(days=renewal_days),
+                              "autoRenew": bool(billing.get("autoRenew", True)), "renewalDays": renewal_days},
+            "usageLevels": self._usage_levels(subscription, {}),
+            **subscription,
+            "history": [],
+        }
+        self.contracts[user_id] = contract
+        return contract
+
+    def _novate(self, contract: Dict[str, Any], subscription: Mapping[str, Any]) -> None:
+        now = self._clock()
+        contract["history"].append({
+            "startDate": contract["billingPeriod"]["startDate"], "endDate": now,
+            "contractedServices": contract["contractedServices"],
+            "subscriptionPlans": contract["subscriptionPlans"],
+            "subscriptionAddOns": contract["subscriptionAddOns"],
+        })
+        contract.update(subscription)
+        contract["usageLevels"] = self._usage_levels(subscription, contract["usageLevels"])
+        contract["billingPeriod"]["startDate"] = now
+
+    def update_subscription(self, user_id: str, body: Mapping[str, Any]) -> Dict[str, Any]:
+        contract = self._contract(user_id)
+        self._novate(contract, self._subscription(body))
+        return contract
+
+    def update_usage_levels(self, user_id: str, body: Mapping[str, Mapping[str, Amount]]) -> Dict[str, Any]:
+        """Suma los incrementos de `body` ({servicio: {límite: cantidad}}) al consumo del contrato."""
+        contract = self._contract(user_id)
+        for service_name, increments in body.items():
+            service = service_name.lower()
+            self._roll(contract, service)
+            levels = contract["usageLevels"].get(service)
+            for name, amount in increments.items():
+                if levels is None or name not in levels:
+                    raise StandInError(400, f"Usage limit {service_name}-{name} is not tracked in the contract")
+                if isinstance(amount, bool) or not isinstance(amount, (int, float)):
+                    raise StandInError(400, f"Invalid increment for {service_name}-{name}")
+                levels[name]["consumed"] += amount
+        return contract
+
+    def update_user_contact(self, user_id: str, body: Mapping[str, Any]) -> Dict[str, Any]:
+        contract = self._contract(user_id)
+        contract["userContact"].update({k: v for k, v in body.items() if k != "userId"})
+        return contract
+
+    def delete_contracts(self) -> None:
+        self.contracts.clear()
+        self._consumptions.clear()
+
+    def _roll(self, contract: Dict[str, Any], service: str) -> None:
+        """Reinicia los límites renovables del servicio cuyo periodo ha vencido."""
+        now = None
+        for name, level in contract["usageLevels"].get(service, {}).items():
+            reset_at = level.get("resetTimeStamp")
+            if reset_at is None:
+                continue
+            now = now or self._clock()
+            if now < reset_at:
+                continue
+            version = _lookup(contract["contractedServices"], service)
+            record = self.services[service]
+            pricing = record["active"].get(version) or record["archived"][version]
+            period = pricing["usageLimits"][name]["period"]
+            periods = 1
+            while _add_period(reset_at, period, periods) <= now:
+                periods += 1
+            level["consumed"] = 0
+            level["resetTimeStamp"] = _add_period(reset_at, period, periods)
+
+    # ------------------------------------------------------------------ evaluación
+
+    def _resolve(self, contract: Dict[str, Any], service: str) -> Optional[ResolvedSubscription]:
+        version = _lookup(contract["contractedServices"], service)
+        record = self.services.get(service)
+        if version is None or record is None:
+            return None
+        addons = _lookup(contract["subscriptionAddOns"], service) or {}
+        plan = _lookup(contract["subscriptionPlans"], service)
+        key = (service, version, plan, tuple(sorted(addons.items())))
+        resolved = self._resolved.get(key)
+        if resolved is None:
+            pricing = record["active"].get(version) or record["archived"].get(version)
+            if pricing is None:
+                return None
+            resolved = self._resolved[key] = ResolvedSubscription(pricing, plan, addons)
+        return resolved
+
+    def evaluate(self, user_id: str, feature_id: str,
+                 expected_consumption: Optional[Mapping[str, Amount]] = None) -> Dict[str, Any]:
+        """Evalúa `servicio-feature` para el usuario y, si está activa, aplica el consumo esperado."""
+        contract = self._contract(user_id)
+        service, _, name = feature_id.partition("-")
+        service = service.lower()
+        resolved = self._resolve(contract, service)
+        if resolved is None or name not in resolved.features:
+            return {"eval": False, "used": None, "limit": None,
+                    "error": {"code": "FLAG_NOT_FOUND", "message": f"Feature {feature_id} not found"}}
+        self._roll(contract, service)
+        levels = contract["usageLevels"].get(service, {})
+        expected_consumption = expected_consumption or {}
+        enabled = bool(resolved.features[name])
+        used: Dict[str, Amount] = {}
+        limit: Dict[str, Any] = {}
+        consumption: Dict[Tuple[str, str], Amount] = {}
+        for limit_name in resolved.linked.get(name, ()):
+            key = f"{service}-{limit_name}"
+            value = resolved.limits.get(limit_name)
+            limit[key] = value
+            if isinstance(value, bool):
+                enabled = enabled and value
+                continue
+            consumed = levels[limit_name]["consumed"] if limit_name in levels else 0
+            amount = expected_consumption.get(key, 0)
+            used[key] = consumed
+            if value is not None and consumed + amount > value:
+                enabled = False
+            if amount and limit_name in levels:
+                consumption[(service, limit_name)] = amount
+        if enabled and consumption:
+            for (_, limit_name), amount in consumption.items():
+                levels[limit_name]["consumed"] += amount
+                used[f"{service}-{limit_name}"] = levels[limit_name]["consumed"]
+            self._consumptions.setdefault((user_id, feature_id), []).append(consumption)
+        return {"eval": enabled, "used": used or None, "limit": limit or None, "error": None}
+
+    def evaluate_all(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        """Evalúa todas las features de los servicios contratados por el usuario."""
+        contract = self._contract(user_id)
+        results = {}
+        for service_name in contract["contractedServices"]:
+            service = service_name.lower()
+            resolved = self._resolve(contract, service)
+            if resolved is None:
+                continue
+            for name in resolved.features:
+                results[f"{service}-{name}"] = self.evaluate(user_id, f"{service}-{name}")
+        return results
+
+    def revert(self, user_id: str, feature_id: str, latest: bool) -> None:
+        """Deshace el último (o, si `latest` es False, el primer) consumo concedido de la feature."""
+        contract = self._contract(user_id)
+        grants = self._consumptions.get((user_id, feature_id))
+        if not grants:
+            raise StandInError(404, f"There is no evaluation of {feature_id} to revert")
+        consumption = grants.pop() if latest else grants.pop(0)
+        for (service, limit_name), amount in consumption.items():
+            level = contract["usageLevels"].get(service, {}).get(limit_name)
+            if level is not None:
+                level["consumed"] -= amount
+
+    def pricing_token(self, user_id: str, secret: str, ttl: float) -> str:
+        """Pricing token HS256 con la evaluación de todas las features del usuario."""
+        features = {
+            feature_id: {key: result[key] for key in ("eval", "used", "limit")}
+            for feature_id, result in self.evaluate_all(user_id).items()}
+        now = time.time()
+        header = _b64url(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+        payload = _b64url(json.dumps({"sub": user_id, "iat": int(now), "exp": now + ttl,
+                                      "features": features}).encode())
+        signature = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+        return f"{header}.{payload}.{_b64url(signature)}"
+
+
+def _page(items: List[Any], query: Mapping[str, str]) -> List[Any]:
+    try:
+        offset = int(query.get("offset", 0))
+        limit = int(query.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError as e:
+        raise StandInError(400, f"offset and limit must be integers: {e}") from e
+    if offset < 0 or limit < 1:
+        raise StandInError(400, "offset must be >= 0 and limit > 0")
+    return items[offset:offset + limit]
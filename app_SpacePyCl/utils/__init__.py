@@ -0,0 +1,21 @@
+from .connection_options import *
+from .pool import *
+from .pricing_token import *
+from .cache import *
+from .single_flight import *
+from .parser import *
+from .codec import *
+from .http import *
+from .retry import *
+from .circuit_breaker import *
+from .usage_reporter import *
+from .expressions import *
+from .pricing_index import *
+from .quota import *
+from .events import *
+from .upload import *
+from .bulk_import import *
+from .bulk import *
+from .pagination import *
+from .metrics import *
+from .errors import *
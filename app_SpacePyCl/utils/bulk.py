@@ -0,0 +1,174 @@
+from __future__ import annotations
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterable, Awaitable, Callable, Iterable, List, Optional, Set, TypeVar, Union
+
+T = TypeVar("T")
+ItemSource = Union[Iterable[T], AsyncIterable[T]]
+
+
+@dataclass(frozen=True)
+class BulkOptions:
+    """
+    Configuración de una operación masiva.
+
+    - max_concurrency: peticiones en vuelo a la vez.
+    - queue_size: elementos leídos por adelantado del origen (por defecto 2 * max_concurrency);
+      cuando la cola está llena se deja de leer el origen (backpressure).
+    - checkpoint_path: fichero JSONL con las claves ya procesadas con éxito. Al repetir la
+      operación con el mismo fichero esos elementos se saltan, de modo que se puede reanudar.
+      Las claves se escriben por lotes en un hilo, sin bloquear el event loop.
+    """
+    max_concurrency: int = 16
+    queue_size: Optional[int] = None
+    checkpoint_path: Optional[str] = None
+
+    def validate(self) -> None:
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency debe ser al menos 1")
+        if self.queue_size is not None and self.queue_size < 1:
+            raise ValueError("queue_size debe ser al menos 1")
+
+
+@dataclass
+class BulkItemResult:
+    """Resultado de un elemento: ok, skipped o failed."""
+    key: str
+    status: str
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    http_status: Optional[int] = None
+
+
+@dataclass
+class BulkReport:
+    results: List[BulkItemResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def count(self, status: str) -> int:
+        return sum(1 for result in self.results if result.status == status)
+
+    @property
+    def failed(self) -> List[BulkItemResult]:
+        return [result for result in self.results if result.status == "failed"]
+
+    def to_dict(self) -> dict:
+        return {
+            "elapsed": self.elapsed,
+            "summary": {status: self.count(status) for status in ("ok", "skipped", "failed")},
+            "results": [asdict(result) for result in self.results],
+        }
+
+
+async def run_bulk(items: ItemSource[T], key: Callable[[T], str], operation: Callable[[T], Awaitable[Any]],
+                   options: Optional[BulkOptions] = None) -> BulkReport:
+    """
+    Aplica `operation` a cada elemento con concurrencia limitada y devuelve un informe por elemento.
+
+    El origen se consume de forma perezosa a través de una cola acotada, así que puede ser un
+    iterable o un stream asíncrono de cualquier tamaño. Un fallo no detiene al resto.
+    """
+    options = options or BulkOptions()
+    options.validate()
+    started = time.perf_counter()
+    report = BulkReport()
+    loop = asyncio.get_running_loop()
+    done = await loop.run_in_executor(None, _load_checkpoint, options.checkpoint_path)
+    checkpoint = (await loop.run_in_executor(None, _open_checkpoint, options.checkpoint_path)
+                  if options.checkpoint_path else None)
+    queue: asyncio.Queue = asyncio.Queue(options.queue_size or 2 * options.max_concurrency)
+    # Claves completadas aún no escritas en el checkpoint, y la tarea que las está escribiendo
+    unsaved: List[str] = []
+    writer: Optional[asyncio.Future] = None
+
+    async def save() -> None:
+        # Un único escritor: lo completado mientras escribe un lote va en el siguiente
+        while unsaved:
+            batch = unsaved[:]
+            unsaved.clear()
+            await loop.run_in_executor(None, _append_keys, checkpoint, batch)
+
+    async def produce() -> None:
+        if hasattr(items, "__aiter__"):
+            async for item in items:
+                await queue.put(item)
+        else:
+            for item in items:
+                await queue.put(item)
+
+    async def work() -> None:
+        while True:
+            item = await queue.get()
+            try:
+                await process(item)
+            finally:
+                queue.task_done()
+
+    async def process(item) -> None:
+        nonlocal writer
+        item_started = time.perf_counter()
+        try:
+            item_key = key(item)
+        except Exception as e:
+            report.results.append(BulkItemResult("", "failed", error=f"Elemento no válido: {e}"))
+            return
+        if item_key in done:
+            report.results.append(BulkItemResult(item_key, "skipped"))
+            return
+        try:
+            await operation(item)
+        except Exception as e:
+            report.results.append(BulkItemResult(
+                item_key, "failed", time.perf_counter() - item_started, str(e) or type(e).__name__,
+                getattr(e, "status", None)))
+            return
+        done.add(item_key)
+        if checkpoint is not None:
+            unsaved.append(item_key)
+            if writer is None or writer.done():
+                writer = asyncio.ensure_future(save())
+        report.results.append(BulkItemResult(item_key, "ok", time.perf_counter() - item_started))
+
+    workers = [asyncio.ensure_future(work()) for _ in range(options.max_concurrency)]
+    try:
+        await produce()
+        await queue.join()
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if checkpoint is not None:
+            try:
+                if writer is not None:
+                    await writer
+                await save()
+            finally:
+                await loop.run_in_executor(None, checkpoint.close)
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def _open_checkpoint(path: str):
+    return open(path, "a", encoding="utf-8")
+
+
+def _append_keys(checkpoint, keys: List[str]) -> None:
+    checkpoint.write("".join(json.dumps(key) + "\n" for key in keys))
+    checkpoint.flush()
+
+
+def _load_checkpoint(path: Optional[str]) -> Set[str]:
+    if not path or not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line))
+            except ValueError:
+                # Última línea truncada por una caída a mitad de escritura
+                continue
+    return done
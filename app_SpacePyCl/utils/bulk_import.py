@@ -0,0 +1,193 @@
+from __future__ import annotations
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple, Union
+from app_SpacePyCl.utils.errors import SpaceNotFoundError
+if TYPE_CHECKING:
+    from app_SpacePyCl.routes.service_context_module import ServiceContextModule
+
+PRICING_EXTENSIONS = (".yml", ".yaml")
+
+
+@dataclass(frozen=True)
+class PricingImportOptions:
+    """
+    Configuración de la importación masiva de pricings.
+
+    - max_concurrency: subidas simultáneas. El primer pricing de un servicio nuevo se sube solo,
+      para crearlo; después, el resto de sus pricings se suben en paralelo como los demás.
+    - manifest_path: fichero JSON con el hash de cada fichero ya importado; los que no han
+      cambiado se saltan. Sin él no se salta nada.
+    """
+    max_concurrency: int = 8
+    manifest_path: Optional[str] = None
+
+    def validate(self) -> None:
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency debe ser al menos 1")
+
+
+@dataclass
+class ImportResult:
+    """Resultado de importar un fichero: created, added, skipped o failed."""
+    path: str
+    service: Optional[str]
+    version: Optional[str]
+    status: str
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class ImportReport:
+    results: List[ImportResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def count(self, status: str) -> int:
+        return sum(1 for result in self.results if result.status == status)
+
+    @property
+    def failed(self) -> List[ImportResult]:
+        return [result for result in self.results if result.status == "failed"]
+
+    def to_dict(self) -> dict:
+        return {
+            "elapsed": self.elapsed,
+            "summary": {status: self.count(status) for status in ("created", "added", "skipped", "failed")},
+            "results": [asdict(result) for result in self.results],
+        }
+
+
+def find_pricing_files(sources: Union[str, Iterable[str]]) -> List[str]:
+    """Expande directorios (recursivamente) y patrones glob a la lista ordenada de ficheros de pricing."""
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+    paths = set()
+    for source in sources:
+        source = os.fspath(source)
+        if os.path.isdir(source):
+            for root, _, files in os.walk(source):
+                paths.update(os.path.join(root, name) for name in files if name.endswith(PRICING_EXTENSIONS))
+        elif glob.has_magic(source):
+            paths.update(path for path in glob.glob(source, recursive=True) if os.path.isfile(path))
+        else:
+            paths.add(source)
+    return sorted(os.path.abspath(path) for path in paths)
+
+
+def read_pricing_header(path: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """Calcula el sha256 del fichero y lee sus claves de primer nivel saasName y version."""
+    digest = hashlib.sha256()
+    header: Dict[str, str] = {}
+    with open(path, "rb") as f:
+        for line in f:
+            digest.update(line)
+            if len(header) < 2 and line[:1] not in (b" ", b"\t", b"#"):
+                key, sep, value = line.decode("utf-8", "replace").partition(":")
+                if sep and key.strip() in ("saasName", "version"):
+                    header[key.strip()] = value.split("#", 1)[0].strip().strip("'\"")
+    return digest.hexdigest(), header.get("saasName"), header.get("version")
+
+
+class PricingImporter:
+    """Sube muchos ficheros de pricing a SPACE con concurrencia limitada."""
+
+    def __init__(self, service_context: ServiceContextModule, options: Optional[PricingImportOptions] = None):
+        self.service_context = service_context
+        self.options = options or PricingImportOptions()
+        self.options.validate()
+
+    async def run(self, sources: Union[str, Iterable[str]]) -> ImportReport:
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        paths = await loop.run_in_executor(None, find_pricing_files, sources)
+        manifest = await loop.run_in_executor(None, self._load_manifest)
+        headers = await asyncio.gather(*(loop.run_in_executor(None, read_pricing_header, path) for path in paths))
+
+        report = ImportReport()
+        by_service: Dict[Optional[str], List[Tuple[str, str, Optional[str]]]] = {}
+        for path, (digest, service, version) in zip(paths, headers):
+            if manifest.get(path) == digest:
+                report.results.append(ImportResult(path, service, version, "skipped"))
+            else:
+                by_service.setdefault(service, []).append((path, digest, version))
+
+        semaphore = asyncio.Semaphore(self.options.max_concurrency)
+        try:
+            await asyncio.gather(*(self._import_service(semaphore, service, files, manifest, report)
+                                   for service, files in by_service.items()))
+        finally:
+            if self.options.manifest_path:
+                await loop.run_in_executor(None, self._save_manifest, manifest)
+        report.results.sort(key=lambda result: result.path)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    async def _import_service(self, semaphore: asyncio.Semaphore, service: Optional[str],
+                              files: List[Tuple[str, str, Optional[str]]], manifest: Dict[str, str],
+                              report: ImportReport) -> None:
+        pending = list(files)
+        async with semaphore:
+            try:
+                exists = await self._service_exists(service) if service else False
+            except Exception as e:
+                report.results.extend(ImportResult(path, service, version, "failed", error=str(e) or type(e).__name__)
+                                      for path, _, version in files)
+                return
+            # El servicio se crea con el primer fichero que se suba bien
+            while not exists and pending:
+                exists = await self._upload(service, pending.pop(0), False, manifest, report)
+        # El resto de versiones se suben en paralelo, cada una con su propio permiso
+        await asyncio.gather(*(self._add_pricing(semaphore, service, file, manifest, report) for file in pending))
+
+    async def _add_pricing(self, semaphore: asyncio.Semaphore, service: str, file: Tuple[str, str, Optional[str]],
+                           manifest: Dict[str, str], report: ImportReport) -> None:
+        async with semaphore:
+            await self._upload(service, file, True, manifest, report)
+
+    async def _upload(self, service: Optional[str], file: Tuple[str, str, Optional[str]], exists: bool,
+                      manifest: Dict[str, str], report: ImportReport) -> bool:
+        """Sube un fichero como pricing (o como servicio nuevo) y anota el resultado."""
+        path, digest, version = file
+        started = time.perf_counter()
+        try:
+            if service is None:
+                raise ValueError("El fichero no declara saasName")
+            if exists:
+                await self.service_context.add_pricing(service, url=path)
+                status = "added"
+            else:
+                await self.service_context.add_service(path)
+                status = "created"
+            manifest[path] = digest
+            result = ImportResult(path, service, version, status)
+        except Exception as e:
+            result = ImportResult(path, service, version, "failed", error=str(e) or type(e).__name__)
+        result.elapsed = time.perf_counter() - started
+        report.results.append(result)
+        return result.status != "failed"
+
+    async def _service_exists(self, service: str) -> bool:
+        try:
+            await self.service_context.get_service(service)
+            return True
+        except SpaceNotFoundError:
+            return False
+
+    def _load_manifest(self) -> Dict[str, str]:
+        path = self.options.manifest_path
+        if not path or not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest: Dict[str, str]) -> None:
+        tmp_path = f"{self.options.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.options.manifest_path)
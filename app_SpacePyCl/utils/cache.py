@@ -0,0 +1,247 @@
+from __future__ import annotations
+import fnmatch
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Caché en memoria acotada, con expulsión LRU y TTL por entrada.
+
+    No es thread-safe: está pensada para usarse desde un único event loop.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0,
+                 on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize debe ser mayor que 0")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._on_evict = on_evict
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None, count: bool = True) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            if count:
+                self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            self._remove(key)
+            if count:
+                self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        if count:
+            self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            self.pop(key)
+            return
+        self._data[key] = (self._clock() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def _remove(self, key: Hashable) -> None:
+        _, value = self._data.pop(key)
+        if self._on_evict is not None:
+            self._on_evict(key, value)
+
+
+@dataclass
+class EvaluationCacheOptions:
+    """
+    Configuración de la caché de resultados de evaluación.
+
+    `feature_ttls` asocia a un id de feature (o a un patrón tipo "servicio-*") su TTL en
+    segundos; un TTL de 0 desactiva la caché para esa feature.
+    """
+    maxsize: int = 10_000
+    default_ttl: float = 5.0
+    feature_ttls: Dict[str, float] = field(default_factory=dict)
+
+    def validate(self) -> None:
+        if self.maxsize <= 0:
+            raise ValueError("maxsize debe ser mayor que 0")
+        if self.default_ttl < 0 or any(ttl < 0 for ttl in self.feature_ttls.values()):
+            raise ValueError("Los TTL no pueden ser negativos")
+
+
+class EvaluationCache:
+    """Caché de FeatureEvaluationResult por (usuario, feature), invalidable por usuario."""
+
+    def __init__(self, options: Optional[EvaluationCacheOptions] = None):
+        self.options = options or EvaluationCacheOptions()
+        self.options.validate()
+        self._entries = TTLCache(self.options.maxsize, self.options.default_ttl, on_evict=self._forget)
+        self._keys_by_user: Dict[str, Set[Tuple[str, str, bool]]] = {}
+        self._ttl_by_feature: Dict[str, float] = {}
+        self._patterns = [(p, ttl) for p, ttl in self.options.feature_ttls.items() if "*" in p]
+
+    @property
+    def hits(self) -> int:
+        return self._entries.hits
+
+    @property
+    def misses(self) -> int:
+        return self._entries.misses
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_for(self, feature_id: str) -> float:
+        ttl = self._ttl_by_feature.get(feature_id)
+        if ttl is None:
+            ttl = self.options.feature_ttls.get(feature_id)
+            if ttl is None:
+                ttl = next((t for p, t in self._patterns if fnmatch.fnmatchcase(feature_id, p)),
+                           self.options.default_ttl)
+            self._ttl_by_feature[feature_id] = ttl
+        return ttl
+
+    def get(self, user_id: str, feature_id: str, server: bool = False) -> Any:
+        return self._entries.get((user_id, feature_id, server))
+
+    def set(self, user_id: str, feature_id: str, value: Any, server: bool = False) -> None:
+        ttl = self.ttl_for(feature_id)
+        if ttl <= 0:
+            return
+        key = (user_id, feature_id, server)
+        self._entries.set(key, value, ttl)
+        self._keys_by_user.setdefault(user_id, set()).add(key)
+
+    def invalidate_user(self, user_id: str) -> None:
+        for key in self._keys_by_user.pop(user_id, ()):
+            self._entries.pop(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_user.clear()
+
+    def _forget(self, key: Tuple[str, str, bool], value: Any) -> None:
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+
+@dataclass
+class DocumentCacheOptions:
+    """
+    Configuración de la caché de servicios y pricings.
+
+    - ttl: segundos durante los que un documento se sirve sin consultar a SPACE.
+    - max_age: segundos que se conserva un documento caducado para revalidarlo con
+      If-None-Match / If-Modified-Since en lugar de descargarlo de nuevo.
+    """
+    maxsize: int = 256
+    ttl: float = 60.0
+    max_age: float = 3600.0
+
+    def validate(self) -> None:
+        if self.maxsize <= 0:
+            raise ValueError("maxsize debe ser mayor que 0")
+        if self.ttl < 0 or self.max_age < self.ttl:
+            raise ValueError("ttl debe ser >= 0 y max_age >= ttl")
+
+
+class CachedDocument:
+    __slots__ = ("data", "etag", "last_modified", "fresh_until")
+
+    def __init__(self, data: Any, etag: Optional[str], last_modified: Optional[str], fresh_until: float):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresh_until = fresh_until
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class DocumentCache:
+    """
+    Caché de documentos de SPACE (servicios y pricings) con revalidación condicional.
+
+    Las claves son tuplas cuyo segundo elemento es el nombre del servicio, lo que permite
+    invalidar de una vez todo lo relativo a un servicio.
+    """
+
+    def __init__(self, options: Optional[DocumentCacheOptions] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.options = options or DocumentCacheOptions()
+        self.options.validate()
+        self._clock = clock
+        self._entries = TTLCache(self.options.maxsize, self.options.max_age, clock=clock)
+        self.revalidations = 0
+
+    @property
+    def hits(self) -> int:
+        return self._entries.hits
+
+    @property
+    def misses(self) -> int:
+        return self._entries.misses
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[CachedDocument]:
+        return self._entries.get(key)
+
+    def is_fresh(self, entry: CachedDocument) -> bool:
+        return entry.fresh_until > self._clock()
+
+    def store(self, key: Hashable, data: Any, etag: Optional[str] = None,
+              last_modified: Optional[str] = None) -> CachedDocument:
+        entry = CachedDocument(data, etag, last_modified, self._clock() + self.options.ttl)
+        # Sin validadores no se puede revalidar: basta con conservarlo durante el TTL
+        ttl = self.options.max_age if (etag or last_modified) else self.options.ttl
+        self._entries.set(key, entry, ttl)
+        return entry
+
+    def refresh(self, key: Hashable, entry: CachedDocument) -> None:
+        """Marca como vigente un documento que SPACE ha confirmado sin cambios (304)."""
+        self.revalidations += 1
+        entry.fresh_until = self._clock() + self.options.ttl
+        self._entries.set(key, entry, self.options.max_age)
+
+    def invalidate_service(self, service_name: str) -> None:
+        service_name = service_name.lower()
+        for key in [k for k in self._entries._data if str(k[1]).lower() == service_name]:
+            self._entries.pop(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,183 @@
+from __future__ import annotations
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Deque, Dict, Optional
+from app_SpacePyCl.utils.errors import SpaceError
+
+
+class CircuitState(str, Enum):
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitOpenError(SpaceError):
+    """El circuito del endpoint está abierto: la petición se rechaza sin llegar a SPACE."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"Circuito abierto para {endpoint}; reintento posible en {retry_in:.1f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+@dataclass(frozen=True)
+class CircuitBreakerOptions:
+    """
+    Configuración del circuit breaker por endpoint.
+
+    El circuito se abre tras `failure_threshold` fallos consecutivos, o cuando en las últimas
+    `window_size` llamadas (con al menos `minimum_calls`) la tasa de fallos supera
+    `failure_rate_threshold`. Tras `recovery_timeout` segundos pasa a semiabierto y deja pasar
+    `half_open_max_calls` llamadas de prueba: si todas van bien se cierra, si una falla se reabre.
+    """
+    failure_threshold: int = 5
+    failure_rate_threshold: float = 0.5
+    window_size: int = 20
+    minimum_calls: int = 10
+    recovery_timeout: float = 30.0
+    half_open_max_calls: int = 1
+
+    def validate(self) -> None:
+        if self.failure_threshold < 1 or self.half_open_max_calls < 1:
+            raise ValueError("failure_threshold y half_open_max_calls deben ser al menos 1")
+        if not 0 < self.failure_rate_threshold <= 1:
+            raise ValueError("failure_rate_threshold debe estar en (0, 1]")
+        if self.window_size < 1 or self.minimum_calls > self.window_size:
+            raise ValueError("Se requiere window_size >= 1 y minimum_calls <= window_size")
+        if self.recovery_timeout < 0:
+            raise ValueError("recovery_timeout no puede ser negativo")
+
+
+class CircuitBreaker:
+    """Circuit breaker de un endpoint, con estados cerrado, abierto y semiabierto."""
+
+    def __init__(self, endpoint: str, options: Optional[CircuitBreakerOptions] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.endpoint = endpoint
+        self.options = options or CircuitBreakerOptions()
+        self._clock = clock
+        self.state = CircuitState.CLOSED
+        self.opened_count = 0
+        self.rejected_count = 0
+        self._consecutive_failures = 0
+        self._outcomes: Deque[bool] = deque(maxlen=self.options.window_size)
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._half_open_successes = 0
+        # Recibe (endpoint, evento) con cada transición o rechazo: opened, half_open, closed, rejected
+        self.listener: Optional[Callable[[str, str], None]] = None
+
+    def _notify(self, event: str) -> None:
+        if self.listener is not None:
+            self.listener(self.endpoint, event)
+
+    def before_request(self) -> None:
+        """Comprueba si la llamada puede hacerse; lanza CircuitOpenError si no."""
+        if self.state == CircuitState.OPEN:
+            elapsed = self._clock() - self._opened_at
+            if elapsed < self.options.recovery_timeout:
+                self.rejected_count += 1
+                self._notify("rejected")
+                raise CircuitOpenError(self.endpoint, self.options.recovery_timeout - elapsed)
+            self.state = CircuitState.HALF_OPEN
+            self._half_open_calls = 0
+            self._half_open_successes = 0
+            self._notify("half_open")
+        if self.state == CircuitState.HALF_OPEN:
+            if self._half_open_calls >= self.options.half_open_max_calls:
+                self.rejected_count += 1
+                self._notify("rejected")
+                raise CircuitOpenError(self.endpoint, 0.0)
+            self._half_open_calls += 1
+
+    def release(self) -> None:
+        """
+        Devuelve el hueco de una llamada que terminó sin resultado (p.ej. cancelada), para que
+        el circuito no se quede semiabierto esperando una prueba que nunca llegará.
+        """
+        if self.state == CircuitState.HALF_OPEN and self._half_open_calls > self._half_open_successes:
+            self._half_open_calls -= 1
+
+    def record_success(self) -> None:
+        self._consecutive_failures = 0
+        self._outcomes.append(True)
+        if self.state == CircuitState.HALF_OPEN:
+            self._half_open_successes += 1
+            if self._half_open_successes >= self.options.half_open_max_calls:
+                self._close()
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        self._outcomes.append(False)
+        if self.state == CircuitState.HALF_OPEN:
+            self._open()
+        elif self.state == CircuitState.CLOSED and self._should_open():
+            self._open()
+
+    def _should_open(self) -> bool:
+        if self._consecutive_failures >= self.options.failure_threshold:
+            return True
+        calls = len(self._outcomes)
+        if calls < self.options.minimum_calls:
+            return False
+        failures = calls - sum(self._outcomes)
+        return failures / calls >= self.options.failure_rate_threshold
+
+    def _open(self) -> None:
+        self.state = CircuitState.OPEN
+        self.opened_count += 1
+        self._opened_at = self._clock()
+        self._notify("opened")
+
+    def _close(self) -> None:
+        self.state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._outcomes.clear()
+        self._notify("closed")
+
+
+class CircuitBreakerRegistry:
+    """Un CircuitBreaker por endpoint, creado bajo demanda."""
+
+    def __init__(self, options: Optional[CircuitBreakerOptions] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.options = options or CircuitBreakerOptions()
+        self.options.validate()
+        self._clock = clock
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._listener: Optional[Callable[[str, str], None]] = None
+
+    def set_listener(self, listener: Optional[Callable[[str, str], None]]) -> None:
+        """Registra quién recibe los eventos de todos los breakers, actuales y futuros."""
+        self._listener = listener
+        for breaker in self._breakers.values():
+            breaker.listener = listener
+
+    def __iter__(self):
+        return iter(self._breakers.values())
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(endpoint, self.options, self._clock)
+            breaker.listener = self._listener
+            self._breakers[endpoint] = breaker
+        return breaker
+
+
+@dataclass
+class EvaluationFallback:
+    """
+    Respuesta de evaluate() cuando el circuito está abierto.
+
+    Se intenta, en orden: el último resultado conocido del usuario para la feature (si
+    `last_known`), el valor de `defaults` para la feature y por último `default_eval`.
+    Si `default_eval` es None y no hay nada que servir, se propaga CircuitOpenError.
+    """
+    last_known: bool = True
+    max_entries: int = 10_000
+    last_known_max_age: float = 3600.0
+    defaults: Dict[str, bool] = field(default_factory=dict)
+    default_eval: Optional[bool] = None
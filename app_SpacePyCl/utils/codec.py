@@ -0,0 +1,91 @@
+from __future__ import annotations
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Optional, Union
+from pydantic import BaseModel
+
+
+def _encode_default(obj: Any) -> Any:
+    """Serializa objetos que el codec no conoce (modelos Pydantic anidados, fechas, enums)."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JsonCodec:
+    """
+    Codifica y decodifica los cuerpos JSON de las peticiones a SPACE.
+
+    Los modelos Pydantic de primer nivel (p.ej. ContractToCreate, Subscription) se serializan
+    directamente a bytes con su serializador, sin pasar por model_dump().
+    """
+    name = "json"
+    content_type = "application/json"
+
+    def dumps(self, obj: Any) -> bytes:
+        if isinstance(obj, BaseModel):
+            return obj.__pydantic_serializer__.to_json(obj)
+        return self._dumps(obj)
+
+    def loads(self, raw: Union[bytes, str]) -> Any:
+        return json.loads(raw)
+
+    def _dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, default=_encode_default, separators=(",", ":")).encode()
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def loads(self, raw: Union[bytes, str]) -> Any:
+        return self._orjson.loads(raw)
+
+    def _dumps(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj, default=_encode_default, option=self._orjson.OPT_NON_STR_KEYS)
+
+
+class MsgspecCodec(JsonCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+        self._encoder = msgspec.json.Encoder(enc_hook=_encode_default)
+        self._decoder = msgspec.json.Decoder()
+
+    def loads(self, raw: Union[bytes, str]) -> Any:
+        return self._decoder.decode(raw)
+
+    def _dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+
+_CODECS = {
+    "json": JsonCodec,
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+}
+
+
+def get_codec(name: Optional[str] = None) -> JsonCodec:
+    """
+    Devuelve el codec indicado ("json", "orjson" o "msgspec"). Sin nombre, usa orjson si
+    está instalado y, si no, la librería estándar.
+    """
+    if name is None:
+        try:
+            return OrjsonCodec()
+        except ImportError:
+            return JsonCodec()
+    codec_class = _CODECS.get(name)
+    if codec_class is None:
+        raise ValueError(f"Codec JSON desconocido: {name}")
+    return codec_class()
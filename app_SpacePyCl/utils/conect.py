@@ -4,7 +4,18 @@ from app_SpacePyCl.routes.config import SpaceClient
 def connect(options: SpaceConnectionOptions) -> SpaceClient:
     """
     Conecta usando SpaceConnectionOptions. Los valores de `url`, `api_key` y `timeout` son obligatorios.
+    Si se indica `pool`, se usa esa configuración del pool de conexiones.
     """
     options.validate()
 
-    return SpaceClient(url=options.url, api_key=options.api_key, timeout=options.timeout)
\ No newline at end of file
+    return SpaceClient(url=options.url, api_key=options.api_key, timeout=options.timeout,
+                       api_prefix=options.api_prefix, pool=options.pool)
+
+
+def connect_sync(options: SpaceConnectionOptions) -> "SyncSpaceClient":
+    """Igual que connect(), pero devuelve un SyncSpaceClient para código síncrono."""
+    from app_SpacePyCl.routes.sync_client import SyncSpaceClient
+    options.validate()
+
+    return SyncSpaceClient(url=options.url, api_key=options.api_key, timeout=options.timeout,
+                           api_prefix=options.api_prefix, pool=options.pool)
@@ -0,0 +1,58 @@
+from __future__ import annotations
+import ssl
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class PoolOptions:
+    """
+    Configuración del pool de conexiones HTTP usado por SpaceClient.
+
+    - limit / limit_per_host: máximo de conexiones simultáneas (0 = sin límite).
+    - keepalive_timeout: segundos que una conexión ociosa se mantiene abierta.
+    - ttl_dns_cache: segundos que se cachea la resolución DNS (None = para siempre).
+    - ssl_context: contexto TLS para las conexiones del pool (None = ssl.create_default_context()).
+    - warmup_connections: conexiones que se abren por adelantado con SpaceClient.warm_up().
+    - shared: si es True, todos los SpaceClient del proceso con las mismas opciones (y el mismo
+      ssl_context) comparten el pool.
+    """
+    limit: int = 100
+    limit_per_host: int = 0
+    keepalive_timeout: float = 15.0
+    use_dns_cache: bool = True
+    ttl_dns_cache: Optional[int] = 300
+    enable_cleanup_closed: bool = False
+    ssl_context: Optional[ssl.SSLContext] = field(default=None, compare=False)
+    warmup_connections: int = 0
+    shared: bool = False
+
+    def validate(self) -> None:
+        if self.limit < 0 or self.limit_per_host < 0:
+            raise ValueError("Los límites del pool no pueden ser negativos")
+        if self.keepalive_timeout <= 0:
+            raise ValueError("keepalive_timeout debe ser mayor que 0")
+        if self.ttl_dns_cache is not None and self.ttl_dns_cache < 0:
+            raise ValueError("ttl_dns_cache no puede ser negativo")
+        if self.warmup_connections < 0:
+            raise ValueError("warmup_connections no puede ser negativo")
+        if self.limit and self.warmup_connections > self.limit:
+            raise ValueError("warmup_connections no puede superar limit")
+
+
+@dataclass
+class SpaceConnectionOptions:
+    """Opciones de conexión a SPACE usadas por connect()."""
+    url: str
+    api_key: str
+    timeout: int = 5000
+    api_prefix: str = "api/v1"
+    pool: Optional[PoolOptions] = None
+
+    def validate(self) -> None:
+        if not self.url or not self.api_key:
+            raise ValueError("Se requieren url y api_key")
+        if not self.timeout or self.timeout <= 0:
+            raise ValueError("timeout debe ser mayor que 0")
+        if self.pool is not None:
+            self.pool.validate()
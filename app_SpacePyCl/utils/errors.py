@@ -0,0 +1,92 @@
+from __future__ import annotations
+import asyncio
+import json
+from typing import Any, Dict, Optional, Type
+import aiohttp
+
+
+class SpaceError(Exception):
+    """Base de todos los errores del cliente de SPACE."""
+
+
+class SpaceHTTPError(SpaceError, aiohttp.ClientResponseError):
+    """
+    SPACE respondió con un estado >= 400.
+
+    Es también un aiohttp.ClientResponseError, así que `status`, `message` y `headers` siguen
+    disponibles. `body` es el cuerpo de la respuesta y `detail` su mensaje de error, si lo hay.
+    """
+
+    def __init__(self, request_info, history, *, status: int, message: str = "", headers=None,
+                 body: bytes = b"", endpoint: Optional[str] = None):
+        super().__init__(request_info, history, status=status, message=message, headers=headers)
+        self.body = body
+        self.endpoint = endpoint
+
+    @property
+    def detail(self) -> Optional[str]:
+        """Mensaje de error que envía SPACE en el cuerpo ({"error": ...} o {"message": ...})."""
+        try:
+            payload = json.loads(self.body)
+        except (ValueError, TypeError):
+            return self.body.decode("utf-8", "replace") or None
+        if isinstance(payload, dict):
+            detail = payload.get("error") or payload.get("message")
+            return detail if isinstance(detail, str) else json.dumps(detail) if detail else None
+        return None
+
+
+class SpaceBadRequestError(SpaceHTTPError):
+    """400/422: la petición no es válida."""
+
+
+class SpaceAuthenticationError(SpaceHTTPError):
+    """401/403: api key ausente, incorrecta o sin permisos."""
+
+
+class SpaceNotFoundError(SpaceHTTPError):
+    """404: el servicio, pricing, contrato o feature no existe."""
+
+
+class SpaceConflictError(SpaceHTTPError):
+    """409: el recurso ya existe o está en un estado incompatible."""
+
+
+class SpaceRateLimitError(SpaceHTTPError):
+    """429: demasiadas peticiones."""
+
+
+class SpaceServerError(SpaceHTTPError):
+    """5xx: SPACE falló o no está disponible."""
+
+
+class SpaceConnectionError(SpaceError, aiohttp.ClientConnectionError):
+    """No se pudo conectar con SPACE o la conexión se cortó."""
+
+
+class SpaceTimeoutError(SpaceError, asyncio.TimeoutError):
+    """SPACE no respondió dentro del timeout."""
+
+
+_ERRORS_BY_STATUS: Dict[int, Type[SpaceHTTPError]] = {
+    400: SpaceBadRequestError,
+    401: SpaceAuthenticationError,
+    403: SpaceAuthenticationError,
+    404: SpaceNotFoundError,
+    409: SpaceConflictError,
+    422: SpaceBadRequestError,
+    429: SpaceRateLimitError,
+}
+
+
+def http_error_class(status: int) -> Type[SpaceHTTPError]:
+    if status >= 500:
+        return SpaceServerError
+    return _ERRORS_BY_STATUS.get(status, SpaceHTTPError)
+
+
+def http_error(response: Any, body: bytes) -> SpaceHTTPError:
+    """Crea el error tipado correspondiente a una respuesta de aiohttp con estado >= 400."""
+    return http_error_class(response.status)(
+        response.request_info, response.history, status=response.status,
+        message=response.reason or "", headers=response.headers, body=body)
@@ -0,0 +1,257 @@
+from __future__ import annotations
+import asyncio
+import random
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Union
+from app_SpacePyCl.utils.errors import SpaceError
+from app_SpacePyCl.utils.log import error_log, logger
+if TYPE_CHECKING:
+    from app_SpacePyCl.routes.config import SpaceClient
+
+# Códigos de evento que invalidan estado local del cliente
+PRICING_EVENTS = frozenset({"PRICING_CREATED", "PRICING_ARCHIVED", "PRICING_ACTIVED", "SERVICE_DISABLED"})
+CONTRACT_EVENTS = frozenset({"CONTRACT_CREATED", "CONTRACT_UPDATED", "CONTRACT_DELETED"})
+
+EventHandler = Callable[["SpaceEvent"], Union[None, Awaitable[None]]]
+
+# Tipos de paquete de Engine.IO v4 y de socket.io v5 (los de socket.io viajan dentro de MESSAGE)
+_ENGINE_OPEN, _ENGINE_CLOSE, _ENGINE_PING, _ENGINE_PONG, _ENGINE_MESSAGE = "0", "1", "2", "3", "4"
+_SOCKET_CONNECT, _SOCKET_DISCONNECT, _SOCKET_EVENT, _SOCKET_CONNECT_ERROR = 0, 1, 2, 4
+
+
+@dataclass(frozen=True)
+class EventListenerOptions:
+    """
+    Configuración del canal de eventos de SPACE (socket.io sobre WebSocket).
+
+    - path: ruta de Engine.IO, relativa a la url del cliente (sin el prefijo de la API).
+    - namespace: namespace de socket.io en el que SPACE publica los eventos.
+    - reconnect_base_delay / reconnect_max_delay: backoff exponencial con jitter entre reconexiones.
+    - ping_interval: segundos entre pings de WebSocket, además del heartbeat de Engine.IO que
+      marca el servidor (None para no enviarlos).
+    - open_timeout: segundos para abrir la conexión y completar el handshake.
+    """
+    path: str = "socket.io"
+    namespace: str = "/events/pricings"
+    reconnect_base_delay: float = 0.5
+    reconnect_max_delay: float = 30.0
+    ping_interval: Optional[float] = None
+    open_timeout: float = 10.0
+
+    def validate(self) -> None:
+        if self.reconnect_base_delay <= 0 or self.reconnect_max_delay < self.reconnect_base_delay:
+            raise ValueError("reconnect_base_delay debe ser mayor que 0 y no superar reconnect_max_delay")
+        if not self.namespace.startswith("/"):
+            raise ValueError("namespace debe empezar por '/'")
+
+
+class EventChannelError(SpaceError):
+    """El canal de eventos ha respondido algo que no sigue el protocolo de socket.io."""
+
+
+@dataclass(frozen=True)
+class SpaceEvent:
+    """Evento recibido por el canal de eventos: {"code": ..., "details": {...}}."""
+    code: str
+    details: Dict[str, Any] = field(default_factory=dict)
+
+
+class SpaceEventListener:
+    """
+    Mantiene una conexión socket.io persistente con SPACE e invalida la caché local con cada evento.
+
+    Habla Engine.IO v4 sobre WebSocket: tras el paquete "open" se une al namespace de eventos
+    ("40<namespace>,"), responde a los pings del servidor y decodifica los eventos ("42<namespace>,
+    [nombre, datos]"). Si el servidor deja de hacer ping durante pingInterval + pingTimeout, la
+    conexión se da por perdida y se reconecta.
+
+    Los eventos de pricing descartan el servicio de la caché de documentos y todas las evaluaciones
+    y tokens cacheados; los de contrato, el estado local del usuario afectado. Tras cada (re)conexión
+    se descarta todo, porque pueden haberse perdido eventos mientras no había conexión.
+    """
+
+    def __init__(self, space_client: SpaceClient, options: Optional[EventListenerOptions] = None):
+        self.space_client = space_client
+        self.options = options or EventListenerOptions()
+        self.options.validate()
+        base_url = space_client.url
+        scheme, _, rest = base_url.partition("://")
+        ws_scheme = "wss" if scheme == "https" else "ws"
+        self.url = f"{ws_scheme}://{rest}/{self.options.path.strip('/')}/?EIO=4&transport=websocket"
+        # Prefijo de los paquetes de socket.io del namespace; el namespace raíz no lo lleva
+        self._prefix = "" if self.options.namespace == "/" else f"{self.options.namespace},"
+        self.connected = asyncio.Event()
+        self.connections = 0
+        self.received = 0
+        self._handlers: List[tuple[Optional[str], EventHandler]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def on(self, code: Optional[str], handler: EventHandler) -> None:
+        """Registra un handler para un código de evento (None: todos). Puede ser una corrutina."""
+        self._handlers.append((code, handler))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def wait_connected(self, timeout: Optional[float] = None) -> None:
+        await asyncio.wait_for(self.connected.wait(), timeout)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.connected.clear()
+
+    async def _run(self) -> None:
+        from websockets.asyncio.client import connect
+
+        attempt = 0
+        while True:
+            try:
+                async with connect(self.url, additional_headers={"x-api-key": self.space_client.api_key},
+                                   ping_interval=self.options.ping_interval,
+                                   open_timeout=self.options.open_timeout) as websocket:
+                    heartbeat = await self._handshake(websocket)
+                    attempt = 0
+                    self.connections += 1
+                    self._invalidate_all()
+                    self.connected.set()
+                    await self._receive(websocket, heartbeat)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error_log.warning("Error en el canal de eventos de SPACE: %s", e)
+            self.connected.clear()
+            attempt += 1
+            delay = min(self.options.reconnect_max_delay, self.options.reconnect_base_delay * 2 ** (attempt - 1))
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+
+    async def _handshake(self, websocket) -> float:
+        """Recibe el paquete open y se une al namespace; devuelve el plazo máximo entre pings."""
+        packet = await asyncio.wait_for(websocket.recv(), self.options.open_timeout)
+        if not isinstance(packet, str) or not packet.startswith(_ENGINE_OPEN):
+            raise EventChannelError(f"Se esperaba el paquete open de Engine.IO y llegó {packet!r}")
+        try:
+            handshake = self.space_client.codec.loads(packet[1:])
+            heartbeat = (handshake.get("pingInterval", 25000) + handshake.get("pingTimeout", 20000)) / 1000
+        except (ValueError, TypeError, AttributeError) as e:
+            raise EventChannelError(f"Handshake de Engine.IO no válido: {packet!r}") from e
+
+        await websocket.send(f"{_ENGINE_MESSAGE}{_SOCKET_CONNECT}{self._prefix}")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.options.open_timeout
+        while True:
+            packet = await asyncio.wait_for(websocket.recv(), max(deadline - loop.time(), 0))
+            if packet == _ENGINE_PING:
+                await websocket.send(_ENGINE_PONG)
+                continue
+            decoded = self._decode(packet)
+            if decoded is None:
+                continue
+            kind, data = decoded
+            if kind == _SOCKET_CONNECT:
+                return heartbeat
+            if kind == _SOCKET_CONNECT_ERROR:
+                message = data.get("message") if isinstance(data, dict) else data
+                raise EventChannelError(f"SPACE rechazó la conexión al namespace {self.options.namespace}: {message}")
+
+    async def _receive(self, websocket, heartbeat: float) -> None:
+        """Atiende el heartbeat y despacha los eventos hasta que se cierra la conexión."""
+        while True:
+            try:
+                packet = await asyncio.wait_for(websocket.recv(), heartbeat)
+            except asyncio.TimeoutError:
+                raise EventChannelError(f"SPACE no ha enviado ningún ping en {heartbeat:g} s") from None
+            if packet == _ENGINE_PING:
+                await websocket.send(_ENGINE_PONG)
+                continue
+            if packet == _ENGINE_CLOSE:
+                return
+            decoded = self._decode(packet)
+            if decoded is None:
+                continue
+            kind, data = decoded
+            if kind == _SOCKET_DISCONNECT:
+                return
+            if kind == _SOCKET_EVENT:
+                await self._dispatch(data)
+
+    def _decode(self, packet: Union[str, bytes]) -> Optional[tuple]:
+        """
+        Decodifica un paquete de socket.io de nuestro namespace en (tipo, datos). Devuelve None
+        para los paquetes de Engine.IO que no llevan socket.io, los de otros namespaces y los
+        mal formados.
+        """
+        if not isinstance(packet, str) or not packet.startswith(_ENGINE_MESSAGE) or len(packet) < 2:
+            logger.debug("Paquete del canal de eventos ignorado: %r", packet)
+            return None
+        body = packet[2:]
+        if not packet[1].isdigit():
+            logger.debug("Paquete de socket.io mal formado ignorado: %r", packet)
+            return None
+        if body.startswith("/"):
+            namespace, _, body = body.partition(",")
+        else:
+            namespace = "/"
+        if namespace != self.options.namespace:
+            return None
+        # Id de ack opcional entre el namespace y los datos: SPACE no lo usa
+        body = body.lstrip("0123456789")
+        try:
+            data = self.space_client.codec.loads(body) if body else None
+        except Exception:
+            logger.debug("Paquete de socket.io mal formado ignorado: %r", packet)
+            return None
+        return int(packet[1]), data
+
+    async def _dispatch(self, data: Any) -> None:
+        """
+        Despacha un evento de socket.io ([nombre, datos...]). SPACE emite {"code", "details"};
+        también se acepta el código como nombre del evento, con los detalles como datos.
+        """
+        try:
+            name, payload = data[0], data[1] if len(data) > 1 else None
+            if isinstance(payload, dict) and "code" in payload:
+                event = SpaceEvent(str(payload["code"]).upper(), payload.get("details") or {})
+            else:
+                event = SpaceEvent(str(name).upper(), payload if isinstance(payload, dict) else {})
+        except (TypeError, KeyError, IndexError, AttributeError):
+            logger.debug("Evento de SPACE mal formado ignorado: %r", data)
+            return
+        self.received += 1
+        self._apply(event)
+        for code, handler in self._handlers:
+            if code is not None and code != event.code:
+                continue
+            try:
+                result = handler(event)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                error_log.error("Error en el handler del evento %s de SPACE: %s", event.code, e)
+
+    def _apply(self, event: SpaceEvent) -> None:
+        """Invalida el estado local afectado por el evento."""
+        if event.code in PRICING_EVENTS:
+            service_name = event.details.get("serviceName")
+            if service_name:
+                self.space_client.service_context.invalidate_service(service_name)
+            else:
+                self.space_client.service_context.invalidate_all()
+            # Cambia lo que evalúan los usuarios del servicio: no se sabe cuáles, se descarta todo
+            self.space_client.featureEvaluators.invalidate_all()
+        elif event.code in CONTRACT_EVENTS:
+            user_id = event.details.get("userId")
+            if user_id:
+                self.space_client._on_contract_changed(user_id)
+            else:
+                self.space_client.featureEvaluators.invalidate_all()
+
+    def _invalidate_all(self) -> None:
+        self.space_client.service_context.invalidate_all()
+        self.space_client.featureEvaluators.invalidate_all()
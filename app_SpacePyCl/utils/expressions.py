@@ -0,0 +1,359 @@
+from __future__ import annotations
+import ast
+import operator
+import re
+from typing import TYPE_CHECKING, Any, Callable, List, Mapping, Optional, Tuple
+from app_SpacePyCl.utils.errors import SpaceError
+if TYPE_CHECKING:
+    from app_SpacePyCl.utils.pricing_index import EffectiveValues, PricingIndex
+
+# (valores efectivos del plan y add-ons, consumo por límite) -> valor
+Evaluator = Callable[["EffectiveValues", Mapping[str, Any]], Any]
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+      (?P<number>(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)
+    | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+    | (?P<name>[A-Za-z_$][A-Za-z0-9_$]*)
+    | (?P<op>===|!==|==|!=|<=|>=|&&|\|\||[!<>+\-*/%?:()\[\].])
+    )""", re.VERBOSE)
+
+_CONTEXTS = ("pricingContext", "subscriptionContext")
+_EMPTY: Mapping[str, Any] = {}
+# Anidamiento máximo de paréntesis, corchetes, operadores unarios y ternarios (cada nivel son
+# unos diez marcos de pila del parser)
+MAX_EXPRESSION_DEPTH = 32
+
+# Precedencia de los operadores binarios, de menor a mayor (como en JavaScript)
+_BINARY_LEVELS = (
+    ("||",),
+    ("&&",),
+    ("==", "!=", "===", "!=="),
+    ("<", "<=", ">", ">="),
+    ("+", "-"),
+    ("*", "/", "%"),
+)
+
+_COMPARISONS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+_ARITHMETIC = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv, "%": operator.mod}
+
+# Nodos: ("const", valor), ("context", nombre), ("member", objeto, clave), ("not", x), ("neg", x),
+# ("and", a, b), ("or", a, b), ("binary", op, a, b), ("cond", test, a, b)
+Node = Tuple[Any, ...]
+
+
+class ExpressionError(SpaceError, ValueError):
+    """Una `expression`/`serverExpression` no se puede compilar o evaluar localmente."""
+
+
+class _Undefined:
+    """`undefined` de JavaScript: falso y distinto de null (salvo con ==)."""
+    __slots__ = ()
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return "undefined"
+
+
+_UNDEFINED = _Undefined()
+_LITERALS = {"true": True, "false": False, "null": None, "undefined": _UNDEFINED}
+
+
+class CompiledExpression:
+    """Expresión de una feature compilada a funciones Python; se evalúa sin eval() ni red."""
+    __slots__ = ("source", "function")
+
+    def __init__(self, source: str, function: Evaluator):
+        self.source = source
+        self.function = function
+
+    def __call__(self, values: EffectiveValues, usage: Optional[Mapping[str, Any]] = None) -> Any:
+        try:
+            result = self.function(values, _EMPTY if usage is None else usage)
+        except RecursionError:
+            raise ExpressionError(f"Expresión demasiado anidada para evaluarla: {self.source!r}") from None
+        return None if result is _UNDEFINED else result
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.source!r})"
+
+
+def compile_expression(source: str, index: Optional[PricingIndex] = None) -> CompiledExpression:
+    """
+    Compila una expresión de SPACE (sintaxis de JavaScript) a una función.
+
+    Se admiten literales, `pricingContext['features'|'usageLimits'][nombre]`,
+    `subscriptionContext[límite]`, acceso con `[]` o `.`, `!`, `-`, aritmética, comparaciones,
+    `==`/`===`/`!=`/`!==`, `&&`, `||` y `cond ? a : b`; cualquier otra cosa es un ExpressionError,
+    también anidar más de MAX_EXPRESSION_DEPTH niveles. Como en JavaScript, null vale 0 en las comparaciones
+    (`null <= 5`) y undefined (un nombre o límite desconocido) hace falsa cualquier comparación.
+    Con `index`, los nombres de features y límites se resuelven a su posición al compilar.
+    """
+    if not isinstance(source, str):
+        raise ExpressionError(f"La expresión debe ser un str, no {type(source).__name__}")
+    try:
+        node = _Parser(source).parse()
+        function = _Compiler(index).compile(node)
+    except RecursionError:
+        # Cadenas muy largas de operadores binarios (1 + 1 + ... + 1), o poca pila disponible
+        raise ExpressionError(f"Expresión demasiado anidada: {source!r}") from None
+    return CompiledExpression(source, function)
+
+
+def _tokenize(source: str) -> List[Tuple[str, Any, int]]:
+    tokens = []
+    position, end = 0, len(source.rstrip())
+    while position < end:
+        match = _TOKEN.match(source, position)
+        if match is None:
+            raise ExpressionError(f"Carácter no válido en la posición {position} de {source!r}")
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == "number":
+            value: Any = float(text) if any(c in text for c in ".eE") else int(text)
+        elif kind == "string":
+            value = ast.literal_eval(text)
+        else:
+            value = text
+        tokens.append((kind, value, match.start(kind)))
+        position = match.end()
+    tokens.append(("end", None, end))
+    return tokens
+
+
+class _Parser:
+    """Parser descendente recursivo de la sintaxis de las expresiones de SPACE."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens = _tokenize(source)
+        self.position = 0
+        self.depth = 0
+
+    def parse(self) -> Node:
+        node = self._conditional()
+        kind, value, position = self.tokens[self.position]
+        if kind != "end":
+            self._fail(f"'{value}' inesperado", position)
+        return node
+
+    def _fail(self, message: str, position: int):
+        raise ExpressionError(f"{message} en la posición {position} de {self.source!r}")
+
+    def _enter(self) -> None:
+        self.depth += 1
+        if self.depth > MAX_EXPRESSION_DEPTH:
+            self._fail(f"Más de {MAX_EXPRESSION_DEPTH} niveles de anidamiento", self.tokens[self.position][2])
+
+    def _peek_op(self) -> Optional[str]:
+        kind, value, _ = self.tokens[self.position]
+        return value if kind == "op" else None
+
+    def _expect(self, op: str) -> None:
+        if self._peek_op() != op:
+            kind, value, position = self.tokens[self.position]
+            self._fail(f"Se esperaba '{op}'" + ("" if kind == "end" else f" y hay '{value}'"), position)
+        self.position += 1
+
+    def _conditional(self) -> Node:
+        test = self._binary(0)
+        if self._peek_op() != "?":
+            return test
+        self.position += 1
+        self._enter()
+        when_true = self._conditional()
+        self._expect(":")
+        node = ("cond", test, when_true, self._conditional())
+        self.depth -= 1
+        return node
+
+    def _binary(self, level: int) -> Node:
+        if level == len(_BINARY_LEVELS):
+            return self._unary()
+        left = self._binary(level + 1)
+        while self._peek_op() in _BINARY_LEVELS[level]:
+            op = self._peek_op()
+            self.position += 1
+            right = self._binary(level + 1)
+            if op == "&&":
+                left = ("and", left, right)
+            elif op == "||":
+                left = ("or", left, right)
+            else:
+                left = ("binary", op, left, right)
+        return left
+
+    def _unary(self) -> Node:
+        op = self._peek_op()
+        if op in ("!", "-", "+"):
+            self.position += 1
+            self._enter()
+            operand = self._unary()
+            self.depth -= 1
+            return operand if op == "+" else ("not" if op == "!" else "neg", operand)
+        return self._member()
+
+    def _member(self) -> Node:
+        node = self._primary()
+        while True:
+            op = self._peek_op()
+            if op == "[":
+                self.position += 1
+                self._enter()
+                key = self._conditional()
+                self._expect("]")
+                self.depth -= 1
+            elif op == ".":
+                self.position += 1
+                kind, value, position = self.tokens[self.position]
+                if kind != "name":
+                    self._fail("Se esperaba un nombre tras '.'", position)
+                self.position += 1
+                key = ("const", value)
+            else:
+                return node
+            node = ("member", node, key)
+
+    def _primary(self) -> Node:
+        kind, value, position = self.tokens[self.position]
+        self.position += 1
+        if kind in ("number", "string"):
+            return ("const", value)
+        if kind == "name":
+            if value in _LITERALS:
+                return ("const", _LITERALS[value])
+            if value in _CONTEXTS:
+                return ("context", value)
+            self._fail(f"Identificador no permitido '{value}'", position)
+        if kind == "op" and value == "(":
+            self._enter()
+            node = self._conditional()
+            self._expect(")")
+            self.depth -= 1
+            return node
+        self._fail("Fin inesperado de la expresión" if kind == "end" else f"'{value}' inesperado", position)
+
+
+class _Compiler:
+    """Traduce los nodos del parser a closures `f(values, usage)`."""
+
+    def __init__(self, index: Optional[PricingIndex]):
+        self.index = index
+
+    def compile(self, node: Node) -> Evaluator:
+        kind = node[0]
+        if kind == "const":
+            value = node[1]
+            return lambda values, usage: value
+        if kind == "context":
+            if node[1] == "subscriptionContext":
+                return lambda values, usage: usage
+            return lambda values, usage: {"features": values.feature_values(), "usageLimits": values.limit_values()}
+        if kind == "member":
+            return self._member(node[1], node[2])
+        if kind == "not":
+            operand = self.compile(node[1])
+            return lambda values, usage: not operand(values, usage)
+        if kind == "neg":
+            operand = self.compile(node[1])
+            return lambda values, usage: _arithmetic("-", 0, operand(values, usage))
+        if kind == "and":
+            left, right = self.compile(node[1]), self.compile(node[2])
+            return lambda values, usage: left(values, usage) and right(values, usage)
+        if kind == "or":
+            left, right = self.compile(node[1]), self.compile(node[2])
+            return lambda values, usage: left(values, usage) or right(values, usage)
+        if kind == "cond":
+            test, when_true, when_false = (self.compile(child) for child in node[1:])
+            return lambda values, usage: (when_true(values, usage) if test(values, usage)
+                                          else when_false(values, usage))
+        return self._binary(node[1], self.compile(node[2]), self.compile(node[3]))
+
+    def _member(self, target: Node, key: Node) -> Evaluator:
+        # pricingContext['features'][...] y pricingContext['usageLimits'][...] con nombre constante
+        if (target[0] == "member" and target[1] == ("context", "pricingContext")
+                and target[2] in (("const", "features"), ("const", "usageLimits")) and key[0] == "const"):
+            return self._pricing_value(target[2][1] == "features", key[1])
+        if target == ("context", "subscriptionContext") and key[0] == "const":
+            return self._usage_value(key[1])
+        get_target, get_key = self.compile(target), self.compile(key)
+        return lambda values, usage: _member(get_target(values, usage), get_key(values, usage))
+
+    def _pricing_value(self, feature: bool, name: Any) -> Evaluator:
+        if self.index is None:
+            if feature:
+                return lambda values, usage: values.feature(name, _UNDEFINED)
+            return lambda values, usage: values.limit(name, _UNDEFINED)
+        slot = (self.index.feature_slots if feature else self.index.limit_slots).get(name)
+        if slot is None:
+            return lambda values, usage: _UNDEFINED
+        if feature:
+            return lambda values, usage: values.features[slot]
+        return lambda values, usage: values.limits[slot]
+
+    def _usage_value(self, name: Any) -> Evaluator:
+        # Un límite del pricing sin consumo registrado vale 0; uno desconocido, undefined
+        default = 0 if self.index is None or name in self.index.limit_slots else _UNDEFINED
+        return lambda values, usage: usage.get(name, default)
+
+    @staticmethod
+    def _binary(op: str, left: Evaluator, right: Evaluator) -> Evaluator:
+        if op == "==":
+            return lambda values, usage: _loose_equal(left(values, usage), right(values, usage))
+        if op == "!=":
+            return lambda values, usage: not _loose_equal(left(values, usage), right(values, usage))
+        if op == "===":
+            return lambda values, usage: _strict_equal(left(values, usage), right(values, usage))
+        if op == "!==":
+            return lambda values, usage: not _strict_equal(left(values, usage), right(values, usage))
+        if op in _COMPARISONS:
+            compare = _COMPARISONS[op]
+            return lambda values, usage: _compare(compare, left(values, usage), right(values, usage))
+        return lambda values, usage: _arithmetic(op, left(values, usage), right(values, usage))
+
+
+def _member(target: Any, key: Any) -> Any:
+    if isinstance(target, Mapping):
+        return target.get(key, _UNDEFINED)
+    if isinstance(target, (list, tuple, str)) and isinstance(key, int) and not isinstance(key, bool):
+        return target[key] if 0 <= key < len(target) else _UNDEFINED
+    return _UNDEFINED
+
+
+def _loose_equal(left: Any, right: Any) -> bool:
+    # null == undefined, pero ninguno de los dos es igual a nada más
+    if left is None or left is _UNDEFINED or right is None or right is _UNDEFINED:
+        return (left is None or left is _UNDEFINED) and (right is None or right is _UNDEFINED)
+    return left == right
+
+
+def _strict_equal(left: Any, right: Any) -> bool:
+    # En JavaScript true !== 1, pero 1 === 1.0
+    if isinstance(left, bool) or isinstance(right, bool):
+        return type(left) is type(right) and left == right
+    numbers = (int, float)
+    if isinstance(left, numbers) and isinstance(right, numbers):
+        return left == right
+    return type(left) is type(right) and left == right
+
+
+def _compare(compare: Callable[[Any, Any], bool], left: Any, right: Any) -> bool:
+    # Como en JavaScript, null vale 0 y undefined (NaN) hace falsa la comparación; comparar
+    # tipos incompatibles también es falso, no un error
+    if left is _UNDEFINED or right is _UNDEFINED:
+        return False
+    left = 0 if left is None else left
+    right = 0 if right is None else right
+    try:
+        return compare(left, right)
+    except TypeError:
+        return False
+
+
+def _arithmetic(op: str, left: Any, right: Any) -> Any:
+    try:
+        return _ARITHMETIC[op](left, right)
+    except (TypeError, ZeroDivisionError) as e:
+        raise ExpressionError(f"No se puede evaluar {left!r} {op} {right!r}: {e}") from e
@@ -0,0 +1,17 @@
+from __future__ import annotations
+from typing import Optional
+from multidict import CIMultiDictProxy
+
+
+class SpaceResponse:
+    """Respuesta de SPACE ya leída por completo: estado, cabeceras y cuerpo en bytes."""
+
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int, headers: Optional[CIMultiDictProxy], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def __repr__(self) -> str:
+        return f"<SpaceResponse status={self.status} bytes={len(self.body)}>"
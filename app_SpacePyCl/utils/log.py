@@ -0,0 +1,51 @@
+from __future__ import annotations
+import logging
+import time
+from typing import Any, Dict, Hashable, List, Optional
+
+logger = logging.getLogger("app_SpacePyCl")
+
+
+class RateLimitedLogger:
+    """
+    Logger que emite como mucho `burst` mensajes por clave cada `interval` segundos.
+
+    La clave es la plantilla del mensaje, junto con `key` si se indica (p.ej. el endpoint, para
+    que una tormenta en uno no silencie los avisos de los demás), así que una tormenta de errores
+    iguales no satura la salida; el siguiente mensaje que se emite indica cuántos se suprimieron. Si el nivel no está
+    habilitado no se formatea nada.
+    """
+
+    def __init__(self, logger: logging.Logger, burst: int = 5, interval: float = 10.0):
+        self.logger = logger
+        self.burst = burst
+        self.interval = interval
+        # plantilla (o (plantilla, key)) -> [inicio de la ventana, emitidos, suprimidos]
+        self._windows: Dict[Hashable, List[float]] = {}
+
+    def log(self, level: int, msg: str, *args: Any, exc_info: Any = None, key: Optional[Hashable] = None) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        window_key = msg if key is None else (msg, key)
+        window = self._windows.get(window_key)
+        if window is None or now - window[0] >= self.interval:
+            suppressed = int(window[2]) if window is not None else 0
+            self._windows[window_key] = window = [now, 0, 0]
+            if suppressed:
+                msg = f"{msg} (%d mensajes iguales suprimidos)"
+                args = (*args, suppressed)
+        if window[1] >= self.burst:
+            window[2] += 1
+            return
+        window[1] += 1
+        self.logger.log(level, msg, *args, exc_info=exc_info)
+
+    def warning(self, msg: str, *args: Any, **kwargs: Any) -> None:
+        self.log(logging.WARNING, msg, *args, **kwargs)
+
+    def error(self, msg: str, *args: Any, **kwargs: Any) -> None:
+        self.log(logging.ERROR, msg, *args, **kwargs)
+
+
+error_log = RateLimitedLogger(logger)
@@ -0,0 +1,331 @@
+from __future__ import annotations
+import bisect
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+import aiohttp
+
+# Límites superiores (en segundos) de los buckets de latencia
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Instrumentation:
+    """
+    Hooks de observabilidad del SpaceClient. Esta clase base no hace nada.
+
+    `endpoint` es la plantilla de la ruta (p.ej. "GET /contracts/{userId}"), nunca la url con
+    identificadores, para que el número de series sea acotado. Lo que devuelva request_started()
+    se recibe como `context` en request_finished() (p.ej. un span).
+    """
+
+    def request_started(self, endpoint: str, method: str) -> Any:
+        return None
+
+    def request_finished(self, endpoint: str, method: str, status: Optional[int],
+                         error: Optional[BaseException], elapsed: float, context: Any) -> None:
+        pass
+
+    def retry(self, endpoint: str, attempt: int) -> None:
+        pass
+
+    def cache_event(self, cache: str, outcome: str) -> None:
+        """`outcome` es hit, miss o revalidated."""
+
+    def breaker_event(self, endpoint: str, event: str) -> None:
+        """`event` es opened, half_open, closed o rejected."""
+
+    def connection_queued(self) -> None:
+        """Una petición espera a que quede libre una conexión del pool (límite alcanzado)."""
+
+    def connection_dequeued(self, waited: float) -> None:
+        """Una petición deja de esperar conexión tras `waited` segundos (la obtenga o no)."""
+
+
+class CompositeInstrumentation(Instrumentation):
+    """Reenvía cada hook a varias instrumentaciones."""
+
+    def __init__(self, *instrumentations: Instrumentation):
+        self.instrumentations = instrumentations
+
+    def request_started(self, endpoint, method):
+        return [i.request_started(endpoint, method) for i in self.instrumentations]
+
+    def request_finished(self, endpoint, method, status, error, elapsed, context):
+        for instrumentation, item_context in zip(self.instrumentations, context):
+            instrumentation.request_finished(endpoint, method, status, error, elapsed, item_context)
+
+    def retry(self, endpoint, attempt):
+        for instrumentation in self.instrumentations:
+            instrumentation.retry(endpoint, attempt)
+
+    def cache_event(self, cache, outcome):
+        for instrumentation in self.instrumentations:
+            instrumentation.cache_event(cache, outcome)
+
+    def breaker_event(self, endpoint, event):
+        for instrumentation in self.instrumentations:
+            instrumentation.breaker_event(endpoint, event)
+
+    def connection_queued(self):
+        for instrumentation in self.instrumentations:
+            instrumentation.connection_queued()
+
+    def connection_dequeued(self, waited):
+        for instrumentation in self.instrumentations:
+            instrumentation.connection_dequeued(waited)
+
+
+class LatencyHistogram:
+    """Histograma de buckets fijos; los percentiles se estiman por interpolación dentro del bucket."""
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, self.max)
+            seen += bucket_count
+        return self.max
+
+
+class InMemoryMetrics(Instrumentation):
+    """
+    Métricas en memoria: latencias y errores por endpoint, peticiones en vuelo, contadores y
+    saturación del pool (peticiones esperando conexión y cuánto esperan).
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.errors: Dict[str, int] = {}
+        self.statuses: Dict[Tuple[str, int], int] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.retries: Dict[str, int] = {}
+        self.cache: Dict[Tuple[str, str], int] = {}
+        self.breaker: Dict[Tuple[str, str], int] = {}
+        self.pool_waiting = 0
+        self.pool_wait = LatencyHistogram(self.buckets)
+
+    def request_started(self, endpoint, method):
+        self.in_flight[endpoint] = self.in_flight.get(endpoint, 0) + 1
+
+    def request_finished(self, endpoint, method, status, error, elapsed, context):
+        self.in_flight[endpoint] -= 1
+        histogram = self.latency.get(endpoint)
+        if histogram is None:
+            histogram = self.latency[endpoint] = LatencyHistogram(self.buckets)
+        histogram.observe(elapsed)
+        if status is not None:
+            self.statuses[(endpoint, status)] = self.statuses.get((endpoint, status), 0) + 1
+        if error is not None:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def retry(self, endpoint, attempt):
+        self.retries[endpoint] = self.retries.get(endpoint, 0) + 1
+
+    def cache_event(self, cache, outcome):
+        self.cache[(cache, outcome)] = self.cache.get((cache, outcome), 0) + 1
+
+    def breaker_event(self, endpoint, event):
+        self.breaker[(endpoint, event)] = self.breaker.get((endpoint, event), 0) + 1
+
+    def connection_queued(self):
+        self.pool_waiting += 1
+
+    def connection_dequeued(self, waited):
+        self.pool_waiting -= 1
+        self.pool_wait.observe(waited)
+
+    def cache_hit_rate(self, cache: str) -> float:
+        hits = self.cache.get((cache, "hit"), 0) + self.cache.get((cache, "revalidated"), 0)
+        total = hits + self.cache.get((cache, "miss"), 0)
+        return hits / total if total else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Resumen serializable: por endpoint, nº de llamadas, errores y percentiles en ms."""
+        endpoints = {}
+        for endpoint, histogram in self.latency.items():
+            endpoints[endpoint] = {
+                "count": histogram.count,
+                "errors": self.errors.get(endpoint, 0),
+                "retries": self.retries.get(endpoint, 0),
+                "in_flight": self.in_flight.get(endpoint, 0),
+                "mean_ms": histogram.total / histogram.count * 1000,
+                "p50_ms": histogram.percentile(0.5) * 1000,
+                "p95_ms": histogram.percentile(0.95) * 1000,
+                "p99_ms": histogram.percentile(0.99) * 1000,
+                "max_ms": histogram.max * 1000,
+            }
+        return {
+            "endpoints": endpoints,
+            "in_flight": sum(self.in_flight.values()),
+            "cache": {f"{cache}.{outcome}": count for (cache, outcome), count in self.cache.items()},
+            "breaker": {f"{endpoint}.{event}": count for (endpoint, event), count in self.breaker.items()},
+            "pool": {
+                "waiting": self.pool_waiting,
+                "waits": self.pool_wait.count,
+                "wait_p95_ms": self.pool_wait.percentile(0.95) * 1000,
+                "wait_max_ms": self.pool_wait.max * 1000,
+            },
+        }
+
+
+class PrometheusInstrumentation(Instrumentation):
+    """Exporta las métricas con prometheus_client (dependencia opcional)."""
+
+    def __init__(self, registry=None, namespace: str = "space_client",
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        try:
+            from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+        except ImportError as e:
+            raise ImportError("PrometheusInstrumentation requiere el paquete prometheus-client") from e
+        registry = registry if registry is not None else REGISTRY
+        self._latency = Histogram("request_duration_seconds", "Latencia de las llamadas a SPACE",
+                                  ["endpoint", "status"], namespace=namespace, registry=registry,
+                                  buckets=tuple(buckets))
+        self._in_flight = Gauge("requests_in_flight", "Llamadas a SPACE en curso", ["endpoint"],
+                                namespace=namespace, registry=registry)
+        self._retries = Counter("retries", "Reintentos de llamadas a SPACE", ["endpoint"],
+                                namespace=namespace, registry=registry)
+        self._cache = Counter("cache_events", "Accesos a las cachés del cliente", ["cache", "outcome"],
+                              namespace=namespace, registry=registry)
+        self._breaker = Counter("circuit_breaker_events", "Eventos de los circuit breakers",
+                                ["endpoint", "event"], namespace=namespace, registry=registry)
+        self._pool_waiting = Gauge("pool_waiting_requests", "Peticiones esperando una conexión libre del pool",
+                                   namespace=namespace, registry=registry)
+        self._pool_wait = Histogram("pool_wait_seconds", "Espera por una conexión libre del pool",
+                                    namespace=namespace, registry=registry, buckets=tuple(buckets))
+
+    def request_started(self, endpoint, method):
+        self._in_flight.labels(endpoint).inc()
+
+    def request_finished(self, endpoint, method, status, error, elapsed, context):
+        self._in_flight.labels(endpoint).dec()
+        label = str(status) if status is not None else type(error).__name__ if error is not None else "none"
+        self._latency.labels(endpoint, label).observe(elapsed)
+
+    def retry(self, endpoint, attempt):
+        self._retries.labels(endpoint).inc()
+
+    def cache_event(self, cache, outcome):
+        self._cache.labels(cache, outcome).inc()
+
+    def breaker_event(self, endpoint, event):
+        self._breaker.labels(endpoint, event).inc()
+
+    def connection_queued(self):
+        self._pool_waiting.inc()
+
+    def connection_dequeued(self, waited):
+        self._pool_waiting.dec()
+        self._pool_wait.observe(waited)
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """Un span CLIENT por llamada y métricas OpenTelemetry (dependencia opcional)."""
+
+    def __init__(self, tracer_provider=None, meter_provider=None):
+        try:
+            from opentelemetry import metrics, trace
+            from opentelemetry.trace import SpanKind, Status, StatusCode
+        except ImportError as e:
+            raise ImportError("OpenTelemetryInstrumentation requiere el paquete opentelemetry-api") from e
+        self._span_kind = SpanKind.CLIENT
+        self._error_status = Status(StatusCode.ERROR)
+        self._tracer = trace.get_tracer("app_SpacePyCl", tracer_provider=tracer_provider)
+        meter = metrics.get_meter("app_SpacePyCl", meter_provider=meter_provider)
+        self._latency = meter.create_histogram("space.client.request.duration", unit="s",
+                                               description="Latencia de las llamadas a SPACE")
+        self._in_flight = meter.create_up_down_counter("space.client.requests.in_flight",
+                                                       description="Llamadas a SPACE en curso")
+        self._retries = meter.create_counter("space.client.retries", description="Reintentos")
+        self._cache = meter.create_counter("space.client.cache.events", description="Accesos a las cachés")
+        self._breaker = meter.create_counter("space.client.circuit_breaker.events",
+                                             description="Eventos de los circuit breakers")
+        self._pool_waiting = meter.create_up_down_counter("space.client.pool.waiting",
+                                                          description="Peticiones esperando conexión del pool")
+        self._pool_wait = meter.create_histogram("space.client.pool.wait_duration", unit="s",
+                                                 description="Espera por una conexión libre del pool")
+
+    def request_started(self, endpoint, method):
+        self._in_flight.add(1, {"endpoint": endpoint})
+        return self._tracer.start_span(f"SPACE {endpoint}", kind=self._span_kind,
+                                       attributes={"http.request.method": method, "space.endpoint": endpoint})
+
+    def request_finished(self, endpoint, method, status, error, elapsed, context):
+        attributes = {"endpoint": endpoint}
+        if status is not None:
+            attributes["status"] = status
+            context.set_attribute("http.response.status_code", status)
+        if error is not None:
+            context.record_exception(error)
+            context.set_status(self._error_status)
+        context.end()
+        self._in_flight.add(-1, {"endpoint": endpoint})
+        self._latency.record(elapsed, attributes)
+
+    def retry(self, endpoint, attempt):
+        self._retries.add(1, {"endpoint": endpoint})
+
+    def cache_event(self, cache, outcome):
+        self._cache.add(1, {"cache": cache, "outcome": outcome})
+
+    def breaker_event(self, endpoint, event):
+        self._breaker.add(1, {"endpoint": endpoint, "event": event})
+
+    def connection_queued(self):
+        self._pool_waiting.add(1)
+
+    def connection_dequeued(self, waited):
+        self._pool_waiting.add(-1)
+        self._pool_wait.record(waited)
+
+
+def pool_trace_config(get_instrumentation: Callable[[], Optional[Instrumentation]]) -> aiohttp.TraceConfig:
+    """
+    TraceConfig de aiohttp que avisa a la instrumentación actual (la que devuelva
+    `get_instrumentation`) cuando una petición espera conexión porque el pool está lleno.
+
+    aiohttp no señala el fin de la espera si la petición se cancela o falla mientras espera;
+    en ese caso se da por terminada al recibir el error de la petición.
+    """
+    async def queued_start(session, context: SimpleNamespace, params) -> None:
+        instrumentation = get_instrumentation()
+        if instrumentation is not None:
+            context.pool_instrumentation = instrumentation
+            context.queued_at = time.perf_counter()
+            instrumentation.connection_queued()
+
+    async def queued_end(session, context: SimpleNamespace, params) -> None:
+        queued_at = getattr(context, "queued_at", None)
+        if queued_at is not None:
+            context.queued_at = None
+            context.pool_instrumentation.connection_dequeued(time.perf_counter() - queued_at)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_queued_start.append(queued_start)
+    trace_config.on_connection_queued_end.append(queued_end)
+    trace_config.on_request_exception.append(queued_end)
+    trace_config.freeze()
+    return trace_config
+
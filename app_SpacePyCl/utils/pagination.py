@@ -0,0 +1,49 @@
+from __future__ import annotations
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def query_params(filters: Dict[str, Any]) -> Dict[str, str]:
+    """Convierte filtros a parámetros de query, omitiendo los None."""
+    return {name: str(value).lower() if isinstance(value, bool) else str(value)
+            for name, value in filters.items() if value is not None}
+
+
+async def paginate(fetch_page: Callable[[int, int], Awaitable[List[T]]], page_size: int = 100,
+                   prefetch: bool = True, max_items: Optional[int] = None) -> AsyncIterator[T]:
+    """
+    Recorre un listado paginado por limit/offset elemento a elemento.
+
+    `fetch_page(offset, limit)` devuelve una página; una página más corta que `page_size` es la
+    última. Con `prefetch` la página siguiente se pide mientras se consume la actual, así que en
+    memoria hay como mucho dos páginas.
+    """
+    if page_size < 1:
+        raise ValueError("page_size debe ser al menos 1")
+    offset = 0
+    yielded = 0
+    next_page: Optional[asyncio.Task] = None
+    try:
+        page = await fetch_page(offset, page_size)
+        while page:
+            offset += len(page)
+            last_page = len(page) < page_size or (max_items is not None and offset >= max_items)
+            if prefetch and not last_page:
+                next_page = asyncio.ensure_future(fetch_page(offset, page_size))
+            for item in page:
+                if max_items is not None and yielded >= max_items:
+                    return
+                yield item
+                yielded += 1
+            if last_page:
+                return
+            page = await next_page if next_page is not None else await fetch_page(offset, page_size)
+            next_page = None
+    finally:
+        if next_page is not None:
+            if not next_page.done():
+                next_page.cancel()
+            elif not next_page.cancelled():
+                next_page.exception()
@@ -1,4 +1,38 @@
-from app.models.feature import Feature
+from functools import lru_cache
+from typing import Dict, List, Type, TypeVar, Union
+from pydantic import BaseModel, TypeAdapter
+from app_SpacePyCl.models.feature_eval_result import FeatureEvaluationResult
 
-def parse_feature_from_dict(data):
-    return Feature(data["name"], data["value"])
+M = TypeVar("M", bound=BaseModel)
+
+# Respuesta de POST /features/{user_id}: por feature, el resultado completo o solo el booleano
+_FEATURE_EVALUATIONS = TypeAdapter(Dict[str, Union[FeatureEvaluationResult, bool]])
+
+
+def parse_model(model: Type[M], raw: Union[bytes, str]) -> M:
+    """Decodifica y valida el cuerpo de una respuesta directamente en el modelo, en una sola pasada."""
+    return model.model_validate_json(raw)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[M]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def parse_models(model: Type[M], raw: Union[bytes, str]) -> List[M]:
+    """Decodifica y valida una lista JSON de modelos en una sola pasada."""
+    return _list_adapter(model).validate_json(raw)
+
+
+def parse_evaluation_result(raw: Union[bytes, str]) -> FeatureEvaluationResult:
+    """Decodifica y valida el resultado de una evaluación en una sola pasada."""
+    return FeatureEvaluationResult.model_validate_json(raw)
+
+
+def parse_evaluation_results(raw: Union[bytes, str]) -> Dict[str, FeatureEvaluationResult]:
+    """Decodifica la evaluación en bloque de varias features."""
+    evaluations = _FEATURE_EVALUATIONS.validate_json(raw)
+    return {
+        feature_id: FeatureEvaluationResult(eval=evaluation) if isinstance(evaluation, bool) else evaluation
+        for feature_id, evaluation in evaluations.items()
+    }
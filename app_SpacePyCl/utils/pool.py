@@ -0,0 +1,146 @@
+from __future__ import annotations
+import asyncio
+import os
+import ssl
+import threading
+import weakref
+from typing import Dict, List, Optional, Tuple
+import aiohttp
+from .connection_options import PoolOptions
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones (aiohttp.TCPConnector) configurable y compartible entre SpaceClient.
+
+    Un TCPConnector está ligado a un event loop, así que se crea uno por loop y se
+    cuentan las referencias: el conector se cierra cuando lo libera el último cliente.
+    Tras un fork, el proceso hijo suelta los conectores heredados sin cerrar sus conexiones,
+    que siguen siendo del padre, y crea los suyos.
+    """
+
+    def __init__(self, options: Optional[PoolOptions] = None):
+        self.options = options or PoolOptions()
+        self.options.validate()
+        self._ssl_context: Optional[ssl.SSLContext] = self.options.ssl_context
+        self._connectors: Dict[asyncio.AbstractEventLoop, Tuple[aiohttp.TCPConnector, int]] = {}
+        _pools.add(self)
+
+    def _get_ssl_context(self) -> ssl.SSLContext:
+        # Un único contexto TLS por pool, creado una vez y no en cada conector
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        return self._ssl_context
+
+    def _create_connector(self) -> aiohttp.TCPConnector:
+        options = self.options
+        return aiohttp.TCPConnector(
+            limit=options.limit,
+            limit_per_host=options.limit_per_host,
+            keepalive_timeout=options.keepalive_timeout,
+            use_dns_cache=options.use_dns_cache,
+            ttl_dns_cache=options.ttl_dns_cache,
+            enable_cleanup_closed=options.enable_cleanup_closed,
+            ssl=self._get_ssl_context(),
+        )
+
+    def acquire(self) -> aiohttp.TCPConnector:
+        """Devuelve el conector del loop actual, creándolo si hace falta."""
+        loop = asyncio.get_running_loop()
+        connector, refs = self._connectors.get(loop, (None, 0))
+        if connector is None or connector.closed:
+            connector, refs = self._create_connector(), 0
+        self._connectors[loop] = (connector, refs + 1)
+        return connector
+
+    async def release(self, connector: aiohttp.TCPConnector) -> None:
+        """Libera una referencia al conector y lo cierra si ya nadie lo usa."""
+        for loop, (current, refs) in list(self._connectors.items()):
+            if current is not connector:
+                continue
+            if refs <= 1:
+                del self._connectors[loop]
+                if not connector.closed:
+                    await connector.close()
+            else:
+                self._connectors[loop] = (current, refs - 1)
+            return
+
+    async def close(self) -> None:
+        """Cierra el conector del loop actual independientemente de sus referencias."""
+        loop = asyncio.get_running_loop()
+        connector, _ = self._connectors.pop(loop, (None, 0))
+        if connector is not None and not connector.closed:
+            await connector.close()
+
+    def _detach_after_fork(self) -> None:
+        connectors, self._connectors = self._connectors, {}
+        for connector, _ in connectors.values():
+            _detach_connector(connector)
+
+
+def _detach_connector(connector: aiohttp.BaseConnector) -> None:
+    """
+    Suelta un conector heredado del proceso padre sin cerrar sus conexiones.
+
+    Cerrarlas desde el hijo (p.ej. en el __del__ del conector) quitaría sus sockets del epoll
+    que comparte con el padre y enviaría el cierre TLS, rompiendo las conexiones del padre. En
+    su lugar, el conector se marca como cerrado y los descriptores del hijo se redirigen a
+    /dev/null, de modo que el hijo deja de retener los sockets sin tocarlos.
+
+    aiohttp no expone las conexiones de un conector, así que esto usa sus atributos internos
+    (`_conns`, `_acquired`, `_closed`) de aiohttp 3.x, con la versión fijada en requirements.txt.
+    Si faltan, el conector se retiene sin soltarlo: el hijo conserva los sockets, pero nunca los
+    cierra.
+    """
+    conns, acquired = getattr(connector, "_conns", None), getattr(connector, "_acquired", None)
+    if not isinstance(conns, dict) or acquired is None or not hasattr(connector, "_closed"):
+        _inherited_connectors.append(connector)
+        return
+    protocols = [protocol for connections in conns.values() for protocol, _ in connections]
+    protocols.extend(acquired)
+    # Con _closed, ni close() ni __del__ vuelven a tocar las conexiones
+    connector._closed = True
+    connector._conns.clear()
+    connector._acquired.clear()
+    devnull = os.open(os.devnull, os.O_RDWR)
+    try:
+        for protocol in protocols:
+            transport = protocol.transport
+            sock = transport.get_extra_info("socket") if transport is not None else None
+            if sock is not None and sock.fileno() >= 0:
+                os.dup2(devnull, sock.fileno())
+    finally:
+        os.close(devnull)
+
+
+_pools: "weakref.WeakSet[ConnectionPool]" = weakref.WeakSet()
+# Conectores heredados que no se han podido soltar; referenciados aquí para que nunca se cierren
+_inherited_connectors: List[aiohttp.BaseConnector] = []
+
+
+def _detach_pools_after_fork() -> None:
+    for pool in list(_pools):
+        pool._detach_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_detach_pools_after_fork)
+
+
+# PoolOptions no compara ssl_context, así que la clave incluye su identidad: clientes con contextos
+# TLS distintos no deben compartir conector. El pool guarda las opciones, y con ellas el contexto,
+# por lo que el id no se reutiliza mientras la entrada exista.
+_shared_pools: Dict[Tuple[PoolOptions, int], ConnectionPool] = {}
+_shared_pools_lock = threading.Lock()
+
+
+def get_shared_pool(options: PoolOptions) -> ConnectionPool:
+    """Devuelve el pool compartido del proceso para unas opciones (y contexto TLS) dados."""
+    key = (options, id(options.ssl_context))
+    with _shared_pools_lock:
+        pool = _shared_pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(options)
+            _shared_pools[key] = pool
+        return pool
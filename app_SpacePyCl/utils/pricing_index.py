@@ -0,0 +1,236 @@
+from __future__ import annotations
+import sys
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterator, List, Mapping, Optional, Tuple, Union
+from app_SpacePyCl.models.compact import CompactPricing
+from app_SpacePyCl.models.service_context import Pricing, PricingFeatureValueType, UsageLimit
+from app_SpacePyCl.utils.cache import TTLCache
+from app_SpacePyCl.utils.expressions import CompiledExpression, compile_expression
+
+# (plan en minúsculas o None, ((add-on, cantidad), ...) ordenado)
+CombinationKey = Tuple[Optional[str], Tuple[Tuple[str, int], ...]]
+
+
+class EffectiveValues:
+    """Valores de las features y límites de uso para un plan con unos add-ons concretos."""
+    __slots__ = ("index", "features", "limits")
+
+    def __init__(self, index: PricingIndex, features: Tuple[Any, ...], limits: Tuple[Any, ...]):
+        self.index = index
+        self.features = features
+        self.limits = limits
+
+    def feature(self, name: str, default: Any = None) -> Any:
+        slot = self.index.feature_slots.get(name)
+        return default if slot is None else self.features[slot]
+
+    def limit(self, name: str, default: Any = None) -> Any:
+        slot = self.index.limit_slots.get(name)
+        return default if slot is None else self.limits[slot]
+
+    def feature_values(self) -> Dict[str, Any]:
+        return dict(zip(self.index.feature_names, self.features))
+
+    def limit_values(self) -> Dict[str, Any]:
+        return dict(zip(self.index.limit_names, self.limits))
+
+
+class _CompiledAddOn:
+    """Cambios que un add-on aplica sobre los valores de un plan, por posición."""
+    __slots__ = ("features", "limits", "extensions")
+
+    def __init__(self, features: Tuple[Tuple[int, Any], ...], limits: Tuple[Tuple[int, Any], ...],
+                 extensions: Tuple[Tuple[int, float], ...]):
+        self.features = features
+        self.limits = limits
+        self.extensions = extensions
+
+
+class PricingIndex:
+    """
+    Índice compilado de un Pricing para resolver los valores de un plan y sus add-ons con una
+    única búsqueda.
+
+    Al construirlo se calculan los valores de cada plan y los cambios de cada add-on, guardados en
+    tuplas indexadas por posición y con los nombres internados. Las combinaciones de plan y
+    add-ons (con sus cantidades) se calculan la primera vez que se piden y se memorizan, hasta
+    `max_combinations`. Planes y add-ons se buscan sin distinguir mayúsculas; un plan
+    desconocido o None resuelve a los valores por defecto del pricing. Acepta tanto un `Pricing`
+    como un `CompactPricing`.
+
+    Los add-ons activan las features booleanas (OR con el valor del plan) y sustituyen el resto;
+    sus `usageLimits` sustituyen el límite y sus `usageLimitsExtensions` se suman multiplicadas
+    por la cantidad contratada.
+
+    Las `expression`/`serverExpression` de las features se compilan la primera vez que se
+    evalúan (ver utils.expressions) y se reutilizan mientras viva el índice.
+    """
+
+    def __init__(self, pricing: Union[Pricing, CompactPricing], max_combinations: int = 1024):
+        if max_combinations <= 0:
+            raise ValueError("max_combinations debe ser mayor que 0")
+        self.version = pricing.version
+        self.pricing_id = pricing.id
+        self.max_combinations = max_combinations
+        self.feature_names: Tuple[str, ...] = tuple(sys.intern(name) for name in pricing.features)
+        self.feature_slots: Dict[str, int] = {name: slot for slot, name in enumerate(self.feature_names)}
+        usage_limits = pricing.usageLimits or {}
+        self.limit_names: Tuple[str, ...] = tuple(sys.intern(name) for name in usage_limits)
+        self.limit_slots: Dict[str, int] = {name: slot for slot, name in enumerate(self.limit_names)}
+        self.usage_limits: Dict[str, UsageLimit] = {sys.intern(name): limit for name, limit in usage_limits.items()}
+        self.boolean_features: Tuple[str, ...] = tuple(
+            name for name in self.feature_names
+            if pricing.features[name].valueType == PricingFeatureValueType.BOOLEAN)
+        # feature -> límites de uso enlazados a ella
+        linked: Dict[str, List[str]] = {}
+        for name, limit in self.usage_limits.items():
+            for feature_name in limit.linkedFeatures or ():
+                linked.setdefault(sys.intern(feature_name), []).append(name)
+        self.linked_limits: Dict[str, Tuple[str, ...]] = {name: tuple(limits) for name, limits in linked.items()}
+        # feature -> (expression, serverExpression)
+        self.expression_sources: Dict[str, Tuple[Optional[str], Optional[str]]] = {
+            name: (pricing.features[name].expression, pricing.features[name].serverExpression)
+            for name in self.feature_names}
+        self._expressions: Dict[Tuple[str, bool], Optional[CompiledExpression]] = {}
+
+        self.defaults = EffectiveValues(
+            self,
+            tuple(_value(pricing.features[name]) for name in self.feature_names),
+            tuple(_value(usage_limits[name]) for name in self.limit_names))
+        self.plans: Dict[str, EffectiveValues] = {}
+        for plan_name, plan in (pricing.plans or {}).items():
+            self.plans[sys.intern(plan_name.lower())] = EffectiveValues(
+                self,
+                self._override(self.defaults.features, self.feature_slots, plan.features),
+                self._override(self.defaults.limits, self.limit_slots, plan.usageLimits))
+        self.addons: Dict[str, _CompiledAddOn] = {}
+        for addon_name, addon in (pricing.addons or {}).items():
+            self.addons[sys.intern(addon_name.lower())] = _CompiledAddOn(
+                self._changes(self.feature_slots, addon.features),
+                self._changes(self.limit_slots, addon.usageLimits),
+                tuple((slot, value) for slot, value in self._changes(self.limit_slots, addon.usageLimitsExtensions)
+                      if isinstance(value, (int, float)) and not isinstance(value, bool)))
+        self._combinations: "OrderedDict[CombinationKey, EffectiveValues]" = OrderedDict()
+
+    @staticmethod
+    def _changes(slots: Mapping[str, int], values: Optional[Mapping[str, Any]]) -> Tuple[Tuple[int, Any], ...]:
+        return tuple((slots[name], value) for name, value in (values or {}).items() if name in slots)
+
+    @classmethod
+    def _override(cls, base: Tuple[Any, ...], slots: Mapping[str, int],
+                  values: Optional[Mapping[str, Any]]) -> Tuple[Any, ...]:
+        changes = cls._changes(slots, values)
+        if not changes:
+            return base
+        result = list(base)
+        for slot, value in changes:
+            result[slot] = value
+        return tuple(result)
+
+    def resolve(self, plan: Optional[str] = None, addons: Optional[Mapping[str, int]] = None) -> EffectiveValues:
+        """Valores efectivos del plan `plan` con los add-ons `addons` ({nombre: cantidad})."""
+        base = self.plans.get(plan.lower(), self.defaults) if plan else self.defaults
+        if not addons:
+            return base
+        key: CombinationKey = (plan.lower() if plan else None,
+                               tuple(sorted((name.lower(), quantity) for name, quantity in addons.items())))
+        values = self._combinations.get(key)
+        if values is not None:
+            self._combinations.move_to_end(key)
+            return values
+        values = self._combine(base, key[1])
+        self._combinations[key] = values
+        if len(self._combinations) > self.max_combinations:
+            self._combinations.popitem(last=False)
+        return values
+
+    def expression(self, feature: str, server: bool = False) -> Optional[CompiledExpression]:
+        """
+        Expresión compilada de una feature, o None si no tiene. Con `server` se usa su
+        `serverExpression` si la hay. Lanza ExpressionError si la expresión no es válida.
+        """
+        key = (feature, server)
+        try:
+            return self._expressions[key]
+        except KeyError:
+            pass
+        expression, server_expression = self.expression_sources.get(feature, (None, None))
+        source = (server_expression or expression) if server else expression
+        compiled = compile_expression(source, self) if source else None
+        self._expressions[key] = compiled
+        return compiled
+
+    def evaluate(self, feature: str, values: EffectiveValues, usage: Optional[Mapping[str, Any]] = None,
+                 server: bool = False) -> Optional[bool]:
+        """
+        Evalúa localmente una feature con los valores de un plan y add-ons (ver resolve()) y el
+        consumo de cada límite (`subscriptionContext`, incluyendo el consumo esperado). Devuelve
+        None si la feature no existe; una feature sin expresión vale lo que su valor.
+        """
+        if feature not in self.feature_slots:
+            return None
+        compiled = self.expression(feature, server)
+        if compiled is None:
+            return bool(values.feature(feature))
+        return bool(compiled(values, usage))
+
+    def _combine(self, base: EffectiveValues, addons: Tuple[Tuple[str, int], ...]) -> EffectiveValues:
+        features = list(base.features)
+        limits = list(base.limits)
+        for addon_name, quantity in addons:
+            addon = self.addons.get(addon_name)
+            if addon is None:
+                continue
+            for slot, value in addon.features:
+                features[slot] = (features[slot] or value) if isinstance(value, bool) else value
+            for slot, value in addon.limits:
+                limits[slot] = value
+            for slot, extension in addon.extensions:
+                if isinstance(limits[slot], (int, float)) and not isinstance(limits[slot], bool):
+                    limits[slot] += extension * quantity
+        return EffectiveValues(self, tuple(features), tuple(limits))
+
+
+def _value(item: Any) -> Any:
+    return item.defaultValue if item.value is None else item.value
+
+
+class PricingIndexCache:
+    """
+    Índices compilados por (servicio, versión del pricing).
+
+    El contenido de una versión de pricing no cambia en SPACE, así que un índice solo se descarta
+    por invalidación explícita (p.ej. al recibir un evento del servicio) o por expulsión LRU.
+    """
+
+    def __init__(self, maxsize: int = 256, max_combinations: int = 1024):
+        self.max_combinations = max_combinations
+        self._indexes = TTLCache(maxsize, ttl=float("inf"))
+        self.builds = 0
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._indexes._data))
+
+    def get(self, service_name: str, version: str) -> Optional[PricingIndex]:
+        return self._indexes.get((service_name.lower(), version))
+
+    def build(self, service_name: str, pricing: Union[Pricing, CompactPricing]) -> PricingIndex:
+        """Devuelve el índice del pricing, compilándolo solo si no está ya en la caché."""
+        key = (service_name.lower(), pricing.version)
+        index = self._indexes.get(key, count=False)
+        if index is None or index.pricing_id != pricing.id:
+            index = PricingIndex(pricing, self.max_combinations)
+            self.builds += 1
+            self._indexes.set(key, index)
+        return index
+
+    def invalidate_service(self, service_name: str) -> None:
+        service_name = service_name.lower()
+        for key in [key for key in self._indexes._data if key[0] == service_name]:
+            self._indexes.pop(key)
+
+    def clear(self) -> None:
+        self._indexes.clear()
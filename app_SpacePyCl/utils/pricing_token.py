@@ -0,0 +1,117 @@
+from __future__ import annotations
+import base64
+import hashlib
+import hmac
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from app_SpacePyCl.utils.errors import SpaceError
+
+_HMAC_ALGORITHMS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+
+class PricingTokenError(SpaceError, ValueError):
+    """El pricing token no se puede decodificar, no es válido o ha expirado."""
+
+
+@dataclass(frozen=True)
+class LocalEvaluationOptions:
+    """
+    Configuración de la evaluación local de features a partir del pricing token.
+
+    - secret: secreto HMAC con el que SPACE firma el token. Es obligatorio salvo con verify=False.
+    - verify: con False no se comprueba la firma y se confía en cualquier token que llegue; solo
+      tiene sentido si el canal con SPACE es de confianza (se avisa en el log al activarlo).
+    - leeway: segundos de tolerancia al comprobar la expiración.
+    - refresh_margin: segundos antes de `exp` en los que se pide un token nuevo.
+    - default_ttl: vida en segundos de un token que no trae `exp`.
+    """
+    secret: Optional[str] = None
+    leeway: float = 0.0
+    refresh_margin: float = 5.0
+    default_ttl: float = 60.0
+    verify: bool = True
+
+    def validate(self) -> None:
+        if self.verify and not self.secret:
+            raise ValueError("Se requiere secret para verificar el pricing token (o verify=False explícito)")
+        if self.leeway < 0 or self.refresh_margin < 0 or self.default_ttl <= 0:
+            raise ValueError("leeway y refresh_margin no pueden ser negativos y default_ttl debe ser mayor que 0")
+
+
+def _b64url_decode(segment: str) -> bytes:
+    padding = "=" * (-len(segment) % 4)
+    return base64.urlsafe_b64decode(segment + padding)
+
+
+def decode_pricing_token(token: str, secret: Optional[str] = None, leeway: float = 0.0,
+                         now: Optional[float] = None, verify: bool = True) -> Dict[str, Any]:
+    """
+    Decodifica un pricing token (JWT) y comprueba su expiración. La firma se verifica con
+    `secret`, que es obligatorio salvo que se pida explícitamente `verify=False`.
+    """
+    if verify and not secret:
+        raise PricingTokenError("Se requiere secret para verificar la firma del pricing token")
+    try:
+        header_segment, payload_segment, signature_segment = token.split(".")
+        header = json.loads(_b64url_decode(header_segment))
+        payload = json.loads(_b64url_decode(payload_segment))
+        signature = _b64url_decode(signature_segment)
+    except (ValueError, AttributeError) as e:
+        raise PricingTokenError(f"Pricing token mal formado: {e}") from e
+
+    if not isinstance(payload, dict):
+        raise PricingTokenError("El payload del pricing token no es un objeto")
+
+    if verify:
+        digest = _HMAC_ALGORITHMS.get(header.get("alg"))
+        if digest is None:
+            raise PricingTokenError(f"Algoritmo de firma no soportado: {header.get('alg')}")
+        signing_input = f"{header_segment}.{payload_segment}".encode()
+        expected = hmac.new(secret.encode(), signing_input, digest).digest()
+        if not hmac.compare_digest(expected, signature):
+            raise PricingTokenError("Firma del pricing token inválida")
+
+    exp = payload.get("exp")
+    if exp is not None:
+        current = time.time() if now is None else now
+        if current > float(exp) + leeway:
+            raise PricingTokenError("El pricing token ha expirado")
+    return payload
+
+
+class PricingToken:
+    """Pricing token decodificado con las evaluaciones de features de un usuario."""
+
+    __slots__ = ("payload", "features", "expires_at")
+
+    def __init__(self, payload: Dict[str, Any], default_ttl: float = 60.0):
+        self.payload = payload
+        self.features: Dict[str, Any] = payload.get("features") or {}
+        exp = payload.get("exp")
+        self.expires_at = float(exp) if exp is not None else time.time() + default_ttl
+
+    @classmethod
+    def from_token(cls, token: str, options: LocalEvaluationOptions) -> "PricingToken":
+        payload = decode_pricing_token(token, secret=options.secret, leeway=options.leeway, verify=options.verify)
+        return cls(payload, default_ttl=options.default_ttl)
+
+    def is_fresh(self, margin: float = 0.0, now: Optional[float] = None) -> bool:
+        current = time.time() if now is None else now
+        return current + margin < self.expires_at
+
+    def feature(self, feature_id: str) -> Optional[Dict[str, Any]]:
+        """Devuelve la evaluación de una feature normalizada a dict, o None si no está en el token."""
+        evaluation = self.features.get(feature_id)
+        if evaluation is None:
+            return None
+        if isinstance(evaluation, bool):
+            return {"eval": evaluation}
+        if isinstance(evaluation, dict) and "eval" in evaluation:
+            return evaluation
+        return None
@@ -0,0 +1,271 @@
+from __future__ import annotations
+import calendar
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Mapping, Optional, Tuple, Union
+from app_SpacePyCl.models.contracts import Contract
+from app_SpacePyCl.models.feature_eval_result import FeatureEvaluationResult
+from app_SpacePyCl.models.service_context import Period, PeriodUnit, Pricing, UsageLimitType
+from app_SpacePyCl.utils.pricing_index import PricingIndex
+
+Amount = Union[int, float]
+
+_FIXED_PERIODS = {
+    PeriodUnit.SEC: timedelta(seconds=1),
+    PeriodUnit.MIN: timedelta(minutes=1),
+    PeriodUnit.HOUR: timedelta(hours=1),
+    PeriodUnit.DAY: timedelta(days=1),
+}
+
+
+def add_period(moment: datetime, period: Period, times: int = 1) -> datetime:
+    """Suma `times` periodos a una fecha; meses y años respetan el calendario."""
+    if period.unit in _FIXED_PERIODS:
+        return moment + _FIXED_PERIODS[period.unit] * (period.value * times)
+    months = period.value * times * (12 if period.unit == PeriodUnit.YEAR else 1)
+    month_index = moment.month - 1 + months
+    year, month = moment.year + month_index // 12, month_index % 12 + 1
+    day = min(moment.day, calendar.monthrange(year, month)[1])
+    return moment.replace(year=year, month=month, day=day)
+
+
+@dataclass(frozen=True)
+class QuotaLedgerOptions:
+    """
+    Configuración del ledger local de cuotas.
+
+    - max_over_grant: consumo por límite que un proceso puede conceder sin que SPACE lo haya
+      confirmado. Es la cota del exceso posible si varios procesos consumen a la vez.
+    - refresh_interval: segundos tras los que la cuota de un usuario se vuelve a sembrar desde
+      su contrato, para ver el consumo hecho por otros procesos.
+    """
+    max_over_grant: Amount = 10
+    refresh_interval: float = 30
+
+    def validate(self) -> None:
+        if self.max_over_grant < 0:
+            raise ValueError("max_over_grant no puede ser negativo")
+        if self.refresh_interval <= 0:
+            raise ValueError("refresh_interval debe ser mayor que 0")
+
+
+class QuotaEntry:
+    """Estado local de un límite de uso de un usuario."""
+    __slots__ = ("limit", "consumed", "unconfirmed", "reset_at", "period")
+
+    def __init__(self, limit: Amount, consumed: Amount, reset_at: Optional[datetime] = None,
+                 period: Optional[Period] = None):
+        self.limit = limit
+        self.consumed = consumed
+        # Consumo concedido localmente y aún no confirmado por SPACE
+        self.unconfirmed: Amount = 0
+        self.reset_at = reset_at
+        self.period = period
+
+    def roll(self, now: datetime) -> None:
+        """Aplica los reinicios de un límite renovable cuyo periodo ha vencido."""
+        if self.reset_at is None or self.period is None or now < self.reset_at:
+            return
+        self.consumed = 0
+        periods = 1
+        while add_period(self.reset_at, self.period, periods) <= now:
+            periods += 1
+        self.reset_at = add_period(self.reset_at, self.period, periods)
+
+
+class UserQuota:
+    """Cuotas y features booleanas de un usuario, sembradas desde su contrato y sus pricings."""
+    __slots__ = ("seeded_at", "limits", "limit_keys", "features", "linked_limits")
+
+    def __init__(self, seeded_at: float):
+        self.seeded_at = seeded_at
+        # (servicio, límite) -> QuotaEntry
+        self.limits: Dict[Tuple[str, str], QuotaEntry] = {}
+        # "servicio-límite", como lo nombra SPACE -> (servicio, límite). Se busca el nombre completo
+        # en vez de partirlo por el guion, que también puede aparecer en servicios y límites.
+        self.limit_keys: Dict[str, Tuple[str, str]] = {}
+        # "servicio-feature" -> valor de la feature para el plan y add-ons contratados
+        self.features: Dict[str, bool] = {}
+        # "servicio-feature" -> límites enlazados a la feature
+        self.linked_limits: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+
+
+class QuotaLedger:
+    """
+    Ledger local de cuotas para conceder consumo de forma optimista, sin ir a SPACE.
+
+    Se siembra con los `usageLevels` del contrato y los `UsageLimit` de los pricings contratados.
+    Solo resuelve features booleanas cuya evaluación sea "feature activa y consumo de cada límite
+    enlazado dentro de su valor"; todo lo demás devuelve None y lo resuelve SPACE. Una concesión
+    que dejaría sin confirmar más de `max_over_grant` unidades de un límite, o que lo superaría,
+    también devuelve None: la decisión final la toma siempre el servidor.
+    """
+
+    def __init__(self, options: Optional[QuotaLedgerOptions] = None, clock=time.monotonic):
+        self.options = options or QuotaLedgerOptions()
+        self.options.validate()
+        self._clock = clock
+        self._users: Dict[str, UserQuota] = {}
+        # (usuario, feature) -> último consumo concedido localmente, para revertirlo
+        self._last_grants: Dict[Tuple[str, str], Dict[Tuple[str, str], Amount]] = {}
+        self.local_grants = 0
+
+    def seed(self, contract: Contract, pricings: Mapping[str, Union[Pricing, PricingIndex]]) -> UserQuota:
+        """
+        Siembra la cuota de un usuario; `pricings` asocia cada servicio contratado a su pricing o,
+        mejor, a su índice compilado (ver ServiceContextModule.get_pricing_index).
+        """
+        user_id = contract.userContact.userId
+        previous = self._users.get(user_id)
+        quota = UserQuota(self._clock())
+        for service_name, pricing in pricings.items():
+            service = service_name.lower()
+            index = pricing if isinstance(pricing, PricingIndex) else PricingIndex(pricing)
+            values = index.resolve(_lookup(contract.subscriptionPlans, service, None),
+                                   _lookup(contract.subscriptionAddOns, service, {}))
+            usage_levels = _lookup(contract.usageLevels, service, {})
+
+            for name in index.boolean_features:
+                value = values.feature(name)
+                if isinstance(value, bool):
+                    quota.features[f"{service}-{name}"] = value
+
+            for name, usage_limit in index.usage_limits.items():
+                limit = values.limit(name)
+                if isinstance(limit, bool):
+                    continue
+                level = usage_levels.get(name)
+                renewable = usage_limit.type == UsageLimitType.RENEWABLE
+                entry = QuotaEntry(
+                    limit, level.consumed if level is not None else 0,
+                    _aware(level.resetTimeStamp) if renewable and level is not None else None,
+                    usage_limit.period if renewable else None)
+                if previous is not None and (service, name) in previous.limits:
+                    # Lo concedido aquí y aún no enviado no figura todavía en el contrato
+                    entry.unconfirmed = previous.limits[(service, name)].unconfirmed
+                    entry.consumed += entry.unconfirmed
+                quota.limits[(service, name)] = entry
+                quota.limit_keys[f"{service}-{name}"] = (service, name)
+            for feature_name, limit_names in index.linked_limits.items():
+                quota.linked_limits[f"{service}-{feature_name}"] = tuple((service, name) for name in limit_names)
+        self._users[user_id] = quota
+        return quota
+
+    def get(self, user_id: str) -> Optional[UserQuota]:
+        """Cuota sembrada del usuario, o None si no existe o debe volver a sembrarse."""
+        quota = self._users.get(user_id)
+        if quota is None or self._clock() - quota.seeded_at >= self.options.refresh_interval:
+            return None
+        return quota
+
+    def try_consume(self, user_id: str, feature_id: str, expected_consumption: Mapping[str, Amount],
+                    now: Optional[datetime] = None) -> Optional[FeatureEvaluationResult]:
+        """Concede localmente el consumo esperado; devuelve None si debe decidirlo SPACE."""
+        quota = self.get(user_id)
+        if quota is None:
+            return None
+        enabled = quota.features.get(feature_id)
+        linked = quota.linked_limits.get(feature_id, ())
+        if enabled is None or not linked:
+            return None
+        consumption = self._resolve(quota, expected_consumption)
+        if consumption is None or not set(consumption) <= set(linked):
+            return None
+
+        now = now or datetime.now(timezone.utc)
+        for key in linked:
+            quota.limits[key].roll(now)
+        if not enabled:
+            return None
+        for key, amount in consumption.items():
+            entry = quota.limits[key]
+            if entry.consumed + amount > entry.limit or max(entry.unconfirmed, 0) + amount > self.options.max_over_grant:
+                return None
+        for key, amount in consumption.items():
+            entry = quota.limits[key]
+            entry.consumed += amount
+            entry.unconfirmed += amount
+        self._last_grants[(user_id, feature_id)] = consumption
+        self.local_grants += 1
+        return FeatureEvaluationResult(
+            eval=True,
+            used={f"{service}-{name}": quota.limits[(service, name)].consumed for service, name in linked},
+            limit={f"{service}-{name}": quota.limits[(service, name)].limit for service, name in linked})
+
+    def last_grant(self, user_id: str, feature_id: str) -> Optional[Dict[Tuple[str, str], Amount]]:
+        """Último consumo concedido localmente para una feature, por (servicio, límite)."""
+        return self._last_grants.get((user_id, feature_id))
+
+    def revert(self, user_id: str, feature_id: str) -> Optional[Dict[Tuple[str, str], Amount]]:
+        """Deshace la última concesión local de una feature; devuelve el consumo revertido."""
+        consumption = self._last_grants.pop((user_id, feature_id), None)
+        quota = self._users.get(user_id)
+        if consumption is None or quota is None:
+            return None
+        for key, amount in consumption.items():
+            entry = quota.limits.get(key)
+            if entry is not None:
+                # El consumo puede venir ya observado de SPACE: nunca por debajo de 0. `unconfirmed`
+                # sí puede quedar negativo: la reversión se envía como -amount y su confirmación lo
+                # devuelve a 0.
+                entry.consumed = max(entry.consumed - amount, 0)
+                entry.unconfirmed -= amount
+        return consumption
+
+    def observe(self, user_id: str, result: FeatureEvaluationResult) -> None:
+        """Actualiza el consumo con el que SPACE devuelve en una evaluación remota."""
+        quota = self._users.get(user_id)
+        if quota is None or not result.used:
+            return
+        for key, used in result.used.items():
+            entry = quota.limits.get(quota.limit_keys.get(key))
+            if entry is not None and not isinstance(used, bool):
+                entry.consumed = used + max(entry.unconfirmed, 0)
+
+    def confirm(self, user_id: str, levels: Mapping[str, Mapping[str, Amount]]) -> None:
+        """Marca como confirmado el consumo que SPACE ya ha recibido (listener del UsageReporter)."""
+        quota = self._users.get(user_id)
+        if quota is None:
+            return
+        for service, limits in levels.items():
+            for name, amount in limits.items():
+                entry = quota.limits.get((service, name))
+                if entry is not None:
+                    entry.unconfirmed -= amount
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Fuerza a volver a sembrar la cuota del usuario, conservando lo aún no confirmado."""
+        quota = self._users.get(user_id)
+        if quota is not None:
+            quota.seeded_at = float("-inf")
+        for key in [key for key in self._last_grants if key[0] == user_id]:
+            del self._last_grants[key]
+
+    def invalidate_all(self) -> None:
+        for user_id in self._users:
+            self.invalidate_user(user_id)
+
+    def _resolve(self, quota: UserQuota, expected_consumption: Mapping[str, Amount]
+                 ) -> Optional[Dict[Tuple[str, str], Amount]]:
+        consumption = {}
+        for key, amount in expected_consumption.items():
+            limit_key = quota.limit_keys.get(key)
+            if limit_key is None:
+                return None
+            consumption[limit_key] = amount
+        return consumption
+
+
+def _lookup(values: Mapping, service: str, default):
+    """Busca un servicio en un dict del contrato sin distinguir mayúsculas."""
+    for name, value in values.items():
+        if name.lower() == service:
+            return value
+    return default
+
+
+def _aware(moment: Optional[datetime]) -> Optional[datetime]:
+    if moment is not None and moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment
@@ -0,0 +1,97 @@
+from __future__ import annotations
+import random
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import FrozenSet, Optional
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Política de reintentos para operaciones idempotentes.
+
+    - max_attempts: intentos totales, incluido el primero.
+    - base_delay / max_delay: backoff exponencial en segundos, con jitter completo si `jitter`.
+    - retry_statuses: códigos HTTP que se consideran transitorios.
+    - budget_ratio / budget_reserve: presupuesto de reintentos; cada petición aporta
+      `budget_ratio` reintentos y se parte de una reserva de `budget_reserve`.
+    - max_retry_after: si SPACE pide esperar más que esto (Retry-After), no se reintenta.
+    """
+    max_attempts: int = 3
+    base_delay: float = 0.1
+    max_delay: float = 2.0
+    jitter: bool = True
+    retry_statuses: FrozenSet[int] = field(default_factory=lambda: frozenset({429, 502, 503, 504}))
+    retry_on_connection_errors: bool = True
+    budget_ratio: float = 0.2
+    budget_reserve: float = 10.0
+    max_retry_after: float = 30.0
+
+    def validate(self) -> None:
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts debe ser al menos 1")
+        if self.base_delay < 0 or self.max_delay < self.base_delay:
+            raise ValueError("Se requiere 0 <= base_delay <= max_delay")
+        if self.budget_ratio < 0 or self.budget_reserve < 0:
+            raise ValueError("El presupuesto de reintentos no puede ser negativo")
+
+    def backoff(self, attempt: int) -> float:
+        """Espera antes del reintento número `attempt` (1 = primer reintento)."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+class RetryBudget:
+    """
+    Limita los reintentos a una fracción de las peticiones, para que un SPACE degradado
+    no reciba una avalancha de reintentos.
+    """
+
+    def __init__(self, ratio: float = 0.2, reserve: float = 10.0):
+        self.ratio = ratio
+        self.capacity = reserve
+        self._tokens = reserve
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def record_request(self) -> None:
+        self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """
+    Peticiones de cobertura (hedging) para lecturas sensibles a la latencia: si la primera
+    petición no ha respondido tras `delay` segundos se lanza otra, hasta `max_hedges`, y se
+    usa la primera respuesta que llegue.
+    """
+    delay: float = 0.05
+    max_hedges: int = 1
+
+    def validate(self) -> None:
+        if self.delay < 0 or self.max_hedges < 1:
+            raise ValueError("Se requiere delay >= 0 y max_hedges >= 1")
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Interpreta la cabecera Retry-After (segundos o fecha HTTP) como segundos de espera."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    current = time.time() if now is None else now
+    return max(0.0, retry_at - current)
@@ -0,0 +1,36 @@
+from __future__ import annotations
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Deduplica llamadas concurrentes idénticas: mientras una llamada con una clave está en
+    curso, el resto de llamadas con la misma clave esperan su resultado en lugar de repetirla.
+
+    El resultado se comparte entre todos los que esperan, así que no debe mutarse.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        # shield: si se cancela quien espera, la llamada compartida sigue para los demás
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Marca la excepción como recuperada aunque nadie siga esperando
+            task.exception()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+import asyncio
+import os
+from typing import IO, AsyncIterable, AsyncIterator, Optional, Tuple, Union
+
+# Origen de un fichero de pricing: ruta, bytes, fichero abierto (síncrono o asíncrono) o iterable asíncrono
+UploadSource = Union[str, "os.PathLike[str]", bytes, bytearray, IO[bytes], AsyncIterable[bytes]]
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+async def open_upload(source: UploadSource, filename: Optional[str] = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[Union[bytes, AsyncIterator[bytes]], str]:
+    """
+    Prepara un origen para subirlo sin bloquear el event loop.
+
+    Devuelve el contenido (bytes o un iterable asíncrono de trozos) y el nombre de fichero. Las rutas
+    se abren y se leen por trozos en el executor por defecto; nunca se cargan enteras en memoria.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source), filename or "service.yml"
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        # FileNotFoundError se lanza aquí, antes de empezar la petición
+        await asyncio.get_running_loop().run_in_executor(None, os.stat, path)
+        return read_file_chunks(path, chunk_size), filename or os.path.basename(path)
+    if hasattr(source, "read"):
+        name = filename or os.path.basename(getattr(source, "name", "") or "") or "service.yml"
+        return read_chunks(source, chunk_size), name
+    if hasattr(source, "__aiter__"):
+        return source, filename or "service.yml"
+    raise TypeError(f"Origen de subida no soportado: {type(source).__name__}")
+
+
+async def read_file_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Abre y lee un fichero por trozos en el executor por defecto."""
+    loop = asyncio.get_running_loop()
+    file = await loop.run_in_executor(None, open, path, "rb")
+    try:
+        async for chunk in read_chunks(file, chunk_size):
+            yield chunk
+    finally:
+        await loop.run_in_executor(None, file.close)
+
+
+async def read_chunks(file, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Lee un fichero abierto por trozos; los ficheros síncronos se leen en el executor por defecto."""
+    loop = asyncio.get_running_loop()
+    is_async = asyncio.iscoroutinefunction(file.read)
+    while True:
+        chunk = await file.read(chunk_size) if is_async else await loop.run_in_executor(None, file.read, chunk_size)
+        if not chunk:
+            break
+        yield chunk.encode() if isinstance(chunk, str) else chunk
@@ -0,0 +1,266 @@
+from __future__ import annotations
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Union
+from app_SpacePyCl.utils.errors import SpaceHTTPError
+from app_SpacePyCl.utils.log import error_log
+if TYPE_CHECKING:
+    from app_SpacePyCl.routes.contract_module import ContractModule
+
+Amount = Union[int, float]
+# user_id -> servicio -> límite -> incremento acumulado
+PendingUsage = Dict[str, Dict[str, Dict[str, Amount]]]
+
+# Estados 4xx que sí merece la pena reintentar; el resto son rechazos definitivos
+_TRANSIENT_CLIENT_STATUSES = frozenset({408, 425, 429})
+
+
+@dataclass
+class UsageReporterOptions:
+    """
+    Configuración del UsageReporter.
+
+    - flush_interval: segundos entre envíos en segundo plano.
+    - max_pending: nº de contadores (usuario, servicio, límite) que fuerza un envío anticipado.
+    - max_concurrency: usuarios que se envían a SPACE en paralelo en cada flush.
+    - journal_path: fichero donde se anotan los incrementos aún no confirmados por SPACE.
+    - fsync_interval: segundos entre fsync del diario; cada anotación se vuelca al sistema
+      operativo al momento, pero solo llega a disco con el fsync.
+    - dead_letter_path: fichero donde se guardan los envíos que SPACE rechaza definitivamente
+      (4xx), en lugar de reintentarlos; sin él solo se registran en el log.
+    """
+    flush_interval: float = 1.0
+    max_pending: int = 1000
+    max_concurrency: int = 10
+    journal_path: Optional[str] = None
+    fsync_interval: float = 1.0
+    dead_letter_path: Optional[str] = None
+
+    def validate(self) -> None:
+        if self.flush_interval <= 0 or self.fsync_interval <= 0:
+            raise ValueError("flush_interval y fsync_interval deben ser mayores que 0")
+        if self.max_pending < 1 or self.max_concurrency < 1:
+            raise ValueError("max_pending y max_concurrency deben ser al menos 1")
+
+
+class UsageReporter:
+    """
+    Acumula incrementos de uso en memoria y los envía a SPACE agrupados, en segundo plano.
+
+    Todos los incrementos de un mismo (usuario, servicio, límite) se suman y cada usuario se
+    envía con un único PUT /contracts/{userId}/usageLevels por flush. Se envía cada
+    `flush_interval` segundos, al alcanzar `max_pending` contadores y al cerrar (close()).
+
+    Semántica de entrega: al menos una vez. Si hay `journal_path`, cada incremento se anota en
+    el diario antes de aceptarse (volcado al sistema operativo al momento y a disco cada
+    `fsync_interval` segundos) y el diario se compacta tras cada flush, fuera del event loop;
+    al arrancar se reenvía lo que quedara en él. Si el proceso muere después de que SPACE
+    acepte un envío pero antes de compactar el diario, esos incrementos se enviarán otra vez.
+    Sin diario, lo pendiente en memoria se pierde si el proceso muere sin llamar a close().
+    Los envíos fallidos se vuelven a acumular y se reintentan en el siguiente flush, salvo los
+    que SPACE rechaza con un 4xx definitivo, que se descartan (ver `dead_letter_path`).
+    """
+
+    def __init__(self, contracts: "ContractModule", options: Optional[UsageReporterOptions] = None):
+        self.contracts = contracts
+        self.options = options or UsageReporterOptions()
+        self.options.validate()
+        self.sent_requests = 0
+        self.failed_requests = 0
+        self.dropped_requests = 0
+        self._pending: PendingUsage = {}
+        self._pending_count = 0
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._early_flush: Optional[asyncio.Task] = None
+        self._journal = None
+        # Anotaciones escritas desde la última compactación (y fsync), y las que llegan durante ella
+        self._journal_writes = 0
+        self._journal_synced = 0
+        self._compacting: Optional[List[str]] = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self._closed = False
+        self._listeners: List[Callable[[str, Dict[str, Dict[str, Amount]]], None]] = []
+        if self.options.journal_path:
+            lines, complete = self._replay_journal()
+            self._journal = open(self.options.journal_path, "a", encoding="utf-8")
+            if not complete:
+                # Que la siguiente anotación no se pegue a una línea truncada
+                self._journal.write("\n")
+            # Lo reenviado al arrancar también debe salir del diario en la primera compactación
+            self._journal_writes = lines
+
+    @property
+    def pending(self) -> int:
+        """Número de contadores pendientes de enviar."""
+        return self._pending_count
+
+    def record(self, user_id: str, service_name: str, limit_name: str, amount: Amount = 1) -> None:
+        """Anota un incremento de uso. No hace I/O de red."""
+        if self._closed:
+            raise RuntimeError("El UsageReporter está cerrado")
+        self._add(user_id, service_name.lower(), limit_name, amount)
+        if self._journal is not None:
+            line = json.dumps([user_id, service_name.lower(), limit_name, amount]) + "\n"
+            self._journal.write(line)
+            self._journal.flush()
+            self._journal_writes += 1
+            if self._compacting is not None:
+                self._compacting.append(line)
+        if self._pending_count >= self.options.max_pending and self._early_flush is None:
+            self._early_flush = asyncio.ensure_future(self._flush_early())
+
+    def add_listener(self, listener: Callable[[str, Dict[str, Dict[str, Amount]]], None]) -> None:
+        """Registra una función que recibe (user_id, incrementos) cada vez que SPACE confirma un envío."""
+        self._listeners.append(listener)
+
+    def start(self) -> None:
+        """Arranca el envío periódico en segundo plano."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+        if self._sync_task is None and self._journal is not None:
+            self._sync_task = asyncio.ensure_future(self._run_sync())
+
+    async def flush(self) -> None:
+        """Envía a SPACE todo lo acumulado hasta ahora."""
+        async with self._flush_lock:
+            batch, self._pending, self._pending_count = self._pending, {}, 0
+            if batch:
+                semaphore = asyncio.Semaphore(self.options.max_concurrency)
+                await asyncio.gather(*(self._send(semaphore, user_id, levels) for user_id, levels in batch.items()))
+            # El diario solo deja de coincidir con lo pendiente si se ha enviado o anotado algo
+            if batch or self._journal_writes:
+                await self._compact_journal()
+
+    async def close(self) -> None:
+        """Detiene el envío periódico y hace un último flush."""
+        if self._closed:
+            return
+        self._closed = True
+        for task in (self._task, self._sync_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._sync_task = None
+        await self.flush()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.options.flush_interval)
+            await self.flush()
+
+    async def _run_sync(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.options.fsync_interval)
+            journal = self._journal
+            if journal is not None and self._journal_synced != self._journal_writes:
+                self._journal_synced = self._journal_writes
+                try:
+                    await loop.run_in_executor(None, os.fsync, journal.fileno())
+                except (OSError, ValueError):
+                    # El diario se ha compactado entretanto (y la copia ya está en disco)
+                    pass
+
+    async def _flush_early(self) -> None:
+        try:
+            await self.flush()
+        finally:
+            self._early_flush = None
+
+    async def _send(self, semaphore: asyncio.Semaphore, user_id: str,
+                    levels: Dict[str, Dict[str, Amount]]) -> None:
+        async with semaphore:
+            try:
+                await self.contracts._update_usage_levels(user_id, levels, usage_only=True)
+            except SpaceHTTPError as e:
+                if 400 <= e.status < 500 and e.status not in _TRANSIENT_CLIENT_STATUSES:
+                    self._drop(user_id, levels, e)
+                else:
+                    self._requeue(user_id, levels)
+                return
+            except Exception:
+                self._requeue(user_id, levels)
+                return
+            self.sent_requests += 1
+            for listener in self._listeners:
+                listener(user_id, levels)
+
+    def _requeue(self, user_id: str, levels: Dict[str, Dict[str, Amount]]) -> None:
+        # Se conserva para el siguiente flush (entrega al menos una vez)
+        self.failed_requests += 1
+        for service_name, limits in levels.items():
+            for limit_name, amount in limits.items():
+                self._add(user_id, service_name, limit_name, amount)
+
+    def _drop(self, user_id: str, levels: Dict[str, Dict[str, Amount]], error: SpaceHTTPError) -> None:
+        """Un rechazo definitivo no se reintenta: se registra y, si hay dónde, se guarda aparte."""
+        self.dropped_requests += 1
+        error_log.error("SPACE rechazó el uso de %s (%s: %s); se descarta: %s",
+                        user_id, error.status, error.detail, json.dumps(levels))
+        if self.options.dead_letter_path:
+            with open(self.options.dead_letter_path, "a", encoding="utf-8") as dead_letters:
+                dead_letters.write(json.dumps([user_id, levels, error.status, error.detail]) + "\n")
+
+    def _add(self, user_id: str, service_name: str, limit_name: str, amount: Amount) -> None:
+        limits = self._pending.setdefault(user_id, {}).setdefault(service_name, {})
+        if limit_name not in limits:
+            self._pending_count += 1
+            limits[limit_name] = amount
+        else:
+            limits[limit_name] += amount
+
+    def _replay_journal(self) -> Tuple[int, bool]:
+        """Reenvía lo anotado en el diario; devuelve las líneas leídas y si la última está completa."""
+        path = self.options.journal_path
+        lines, complete = 0, True
+        if not os.path.exists(path):
+            return lines, complete
+        with open(path, encoding="utf-8") as journal:
+            for line in journal:
+                lines += 1
+                complete = line.endswith("\n")
+                try:
+                    user_id, service_name, limit_name, amount = json.loads(line)
+                except ValueError:
+                    # Última línea truncada por una caída a mitad de escritura
+                    continue
+                self._add(user_id, service_name, limit_name, amount)
+        return lines, complete
+
+    async def _compact_journal(self) -> None:
+        """Deja en el diario solo lo que sigue pendiente, escribiéndolo fuera del event loop."""
+        if self._journal is None:
+            return
+        lines = [json.dumps([user_id, service_name, limit_name, amount]) + "\n"
+                 for user_id, services in self._pending.items()
+                 for service_name, limits in services.items()
+                 for limit_name, amount in limits.items()]
+        tmp_path = f"{self.options.journal_path}.tmp"
+        # Lo que se anote mientras se escribe la copia se añade a ella al terminar
+        self._compacting = []
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, _write_synced, tmp_path, lines)
+            self._journal.close()
+            os.replace(tmp_path, self.options.journal_path)
+            self._journal = open(self.options.journal_path, "a", encoding="utf-8")
+            self._journal.writelines(self._compacting)
+            self._journal.flush()
+            self._journal_writes, self._journal_synced = len(self._compacting), 0
+        finally:
+            self._compacting = None
+
+
+def _write_synced(path: str, lines: List[str]) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        file.writelines(lines)
+        file.flush()
+        os.fsync(file.fileno())
@@ -0,0 +1,81 @@
+"""
+Throughput y percentiles de latencia de evaluate() contra el SPACE stand-in, con concurrencia
+creciente.
+
+Cada nivel de concurrencia lanza `--requests` evaluaciones repartidas entre tantos workers como
+indica el nivel. Las evaluaciones rotan entre usuarios y features para que no se agrupen en una
+sola petición (single-flight) ni se sirvan de la caché.
+
+Uso: python -m benchmarks.bench_evaluate [--requests N] [--concurrency 1,4,16,64] [--output FICHERO]
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional, Sequence
+from app_SpacePyCl.testing import StandInOptions
+from benchmarks.support import SERVICE, latency_metrics, print_results, seeded_stand_in, write_results
+
+DEFAULT_CONCURRENCY = (1, 4, 16, 64)
+FEATURES = 10
+
+
+async def _measure(evaluate, requests: int, concurrency: int) -> Dict[str, dict]:
+    samples: List[float] = []
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        for i in counter:
+            started = time.perf_counter()
+            await evaluate(i)
+            samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latency_metrics(f"evaluate/c{concurrency}", samples, time.perf_counter() - started)
+
+
+async def run(requests: int = 2000, concurrency: Sequence[int] = DEFAULT_CONCURRENCY, users: int = 50,
+              latency: float = 0.0, consumption: bool = False) -> Dict[str, dict]:
+    """
+    Mide evaluate() a cada nivel de `concurrency`. Con `consumption` cada evaluación lleva consumo
+    esperado (no idempotente: sin reintentos ni cobertura), como las de los límites de uso.
+    """
+    service = SERVICE.lower()
+    options = StandInOptions(latency=latency)
+    async with seeded_stand_in(users, options=options) as (stand_in, client):
+        evaluator = client.featureEvaluators
+
+        async def evaluate(i: int) -> None:
+            user_id = f"u{i % users}"
+            if consumption:
+                await evaluator.evaluate(user_id, f"{service}-feature0", {f"{service}-limit0": 0})
+            else:
+                await evaluator.evaluate(user_id, f"{service}-feature{(i // users) % FEATURES}")
+
+        await _measure(evaluate, min(requests, 100), 4)
+        results: Dict[str, dict] = {}
+        for level in concurrency:
+            stand_in.reset_stats()
+            results.update(await _measure(evaluate, requests, level))
+        return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", default=",".join(map(str, DEFAULT_CONCURRENCY)))
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="latencia simulada del stand-in en segundos")
+    parser.add_argument("--consumption", action="store_true", help="evaluar con consumo esperado")
+    parser.add_argument("--output", help="fichero JSON de resultados")
+    args = parser.parse_args(argv)
+    parameters = {"requests": args.requests, "concurrency": [int(c) for c in args.concurrency.split(",")],
+                  "users": args.users, "latency": args.latency, "consumption": args.consumption}
+    results = asyncio.run(run(**parameters))
+    print_results(results)
+    if args.output:
+        write_results(args.output, results, parameters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Memoria retenida por pricing con los modelos de Pydantic frente a su representación compacta
+(models/compact.py), medida con tracemalloc.
+
+Cada escenario carga `count` pricings por separado, como llegarían de SPACE:
+- pydantic: modelos `Pricing` tal cual.
+- compact: CompactPricing en un CompactCatalog, con textos distintos en cada pricing (solo se
+  comparten nombres): el caso peor.
+- compact_versions: versiones de un mismo servicio que solo cambian en algunos elementos, que es
+  lo habitual en un catálogo; las partes iguales se guardan una vez.
+
+Uso: python -m benchmarks.bench_memory [--count N] [--output FICHERO]
+"""
+import argparse
+import gc
+import json
+import os
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence
+from app_SpacePyCl.models import Pricing
+from app_SpacePyCl.models.compact import CompactCatalog
+from app_SpacePyCl.testing.state import normalize_pricing
+from app_SpacePyCl.utils.parser import parse_model
+from benchmarks.support import metric, print_results, synthetic_pricing, write_results
+
+PRICING_PATH = os.path.join(os.path.dirname(__file__), "..", "tests", "resources", "pricings", "TomatoMeter.json")
+
+
+def _tomatometer() -> dict:
+    with open(PRICING_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _variants(document: dict, count: int, distinct: bool) -> List[bytes]:
+    """`count` versiones del pricing; con `distinct` cambian todas las descripciones."""
+    variants = []
+    for i in range(count):
+        variant = json.loads(json.dumps(document))
+        variant["version"] = f"{i}.0.0"
+        if distinct:
+            for section in ("features", "usageLimits", "plans", "addOns"):
+                for item in (variant.get(section) or {}).values():
+                    item["description"] = f"{item.get('description')} ({i})"
+        else:
+            # Como entre versiones reales: cambian precios y algún plan, no las features
+            first_plan = next(iter(variant["plans"].values()))
+            first_plan["price"] = float(i)
+        variants.append(json.dumps(variant).encode())
+    return variants
+
+
+def _retained(build: Callable[[], object]) -> int:
+    """Bytes que siguen reservados tras construir (y conservar) lo que devuelve `build`."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def _pydantic(raws: List[bytes]) -> object:
+    return [parse_model(Pricing, raw) for raw in raws]
+
+
+def _compact(raws: List[bytes]) -> object:
+    catalog = CompactCatalog()
+    for raw in raws:
+        catalog.add_pricing("service", parse_model(Pricing, raw))
+    return catalog
+
+
+def run(count: int = 200) -> Dict[str, float]:
+    """KiB retenidos por pricing en cada escenario."""
+    documents = {
+        "tomatometer": _tomatometer(),
+        "f100": normalize_pricing(synthetic_pricing(features=100, plans=4, addons=4, limits=4)),
+    }
+    results = {}
+    for name, document in documents.items():
+        distinct = _variants(document, count, distinct=True)
+        versions = _variants(document, count, distinct=False)
+        results[f"{name}/pydantic"] = _retained(lambda: _pydantic(distinct)) / count / 1024
+        results[f"{name}/compact"] = _retained(lambda: _compact(distinct)) / count / 1024
+        results[f"{name}/compact_versions"] = _retained(lambda: _compact(versions)) / count / 1024
+    return results
+
+
+def metrics(count: int) -> Dict[str, dict]:
+    return {f"memory/{name}": metric(kib, "KiB/pricing") for name, kib in run(count).items()}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--output", help="fichero JSON de resultados")
+    args = parser.parse_args(argv)
+    results = metrics(args.count)
+    print_results(results)
+    if args.output:
+        write_results(args.output, results, {"count": args.count})
+
+
+if __name__ == "__main__":
+    main()
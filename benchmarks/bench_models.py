@@ -0,0 +1,116 @@
+"""
+Compara el coste de decodificar respuestas de SPACE con la ruta anterior (json.loads + dict,
+o FeatureEvaluationResult(**dict)) frente a la decodificación tipada en una sola pasada, y mide
+la construcción de los modelos de `models/` (contratos, servicios y pricings grandes), del
+índice compilado de un pricing y la evaluación local de expresiones de features.
+
+Uso: python -m benchmarks.bench_models [--number N] [--output FICHERO]
+"""
+import argparse
+import json
+import os
+import timeit
+from typing import Dict, Optional, Sequence
+from app_SpacePyCl.models import Contract, FeatureEvaluationResult, Pricing, Service
+from app_SpacePyCl.testing.state import normalize_pricing
+from app_SpacePyCl.utils.expressions import compile_expression
+from app_SpacePyCl.utils.parser import parse_evaluation_result, parse_model
+from app_SpacePyCl.utils.pricing_index import PricingIndex
+from benchmarks.support import metric, print_results, synthetic_pricing, write_results
+
+PRICING_PATH = os.path.join(os.path.dirname(__file__), "..", "tests", "resources", "pricings", "TomatoMeter.json")
+
+EVALUATION = json.dumps({
+    "eval": True,
+    "used": {"tomatometer-maxPomodoroTimers": 2},
+    "limit": {"tomatometer-maxPomodoroTimers": 10},
+    "error": None,
+}).encode()
+
+CONTRACT = json.dumps({
+    "userContact": {"userId": "u1", "username": "alice"},
+    "billingPeriod": {"startDate": "2025-01-01T00:00:00Z", "endDate": "2025-02-01T00:00:00Z",
+                      "autoRenew": True, "renewalDays": 30},
+    "usageLevels": {"tomatometer": {"maxPomodoroTimers": {"consumed": 2, "resetTimeStamp": "2025-01-02T00:00:00Z"}}},
+    "contractedServices": {"tomatometer": "1.0.0"},
+    "subscriptionPlans": {"tomatometer": "ADVANCED"},
+    "subscriptionAddOns": {"tomatometer": {"extraTimers": 1}},
+    "history": [{"startDate": "2024-12-01T00:00:00Z", "endDate": "2025-01-01T00:00:00Z",
+                 "contractedServices": {"tomatometer": "1.0.0"}, "subscriptionPlans": {"tomatometer": "BASIC"},
+                 "subscriptionAddOns": {}}],
+}).encode()
+
+SERVICE = json.dumps({
+    "name": "TomatoMeter",
+    "disabled": False,
+    "activePricings": {f"{v}.0.0": {"id": f"{v:024x}"} for v in range(10)},
+    "archivedPricings": {f"0.{v}.0": {"id": f"{v + 100:024x}"} for v in range(10)},
+}).encode()
+
+
+def _load_pricing() -> bytes:
+    with open(PRICING_PATH, "rb") as f:
+        return f.read()
+
+
+def run(number: int) -> dict:
+    """Microsegundos por operación de cada caso."""
+    pricing_raw = _load_pricing()
+    large_pricing_raw = json.dumps(normalize_pricing(synthetic_pricing(features=500, plans=5, addons=5))).encode()
+    cases = {
+        "evaluation/dict": lambda: FeatureEvaluationResult(**json.loads(EVALUATION)),
+        "evaluation/typed": lambda: parse_evaluation_result(EVALUATION),
+        "pricing/dict": lambda: json.loads(pricing_raw),
+        "pricing/dict+validate": lambda: Pricing(**json.loads(pricing_raw)),
+        "pricing/typed": lambda: parse_model(Pricing, pricing_raw),
+        "contract/typed": lambda: parse_model(Contract, CONTRACT),
+        "service/typed": lambda: parse_model(Service, SERVICE),
+    }
+    results = {}
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=number, repeat=5))
+        results[name] = best / number * 1e6
+    # Un pricing de 500 features cuesta cientos de veces más: se repite menos
+    large_number = max(1, number // 200)
+    best = min(timeit.repeat(lambda: parse_model(Pricing, large_pricing_raw), number=large_number, repeat=5))
+    results["pricing/large/typed"] = best / large_number * 1e6
+    large_pricing = parse_model(Pricing, large_pricing_raw)
+    best = min(timeit.repeat(lambda: PricingIndex(large_pricing), number=large_number, repeat=5))
+    results["pricing_index/large/build"] = best / large_number * 1e6
+    index = PricingIndex(large_pricing)
+    addons = {"addon0": 1, "addon1": 2}
+    cases = {
+        "pricing_index/large/resolve": lambda: index.resolve("PLAN1", addons).feature("feature250"),
+        "pricing_index/large/limit": lambda: index.resolve("PLAN1", addons).limit("limit0"),
+    }
+    # La expresión de feature0 no usa límites: se mide una con subscriptionContext, como las de SPACE
+    expression = compile_expression(
+        "pricingContext['features']['feature0'] && "
+        "subscriptionContext['limit0'] <= pricingContext['usageLimits']['limit0']",
+        index)
+    values, usage = index.resolve("PLAN1", addons), {"limit0": 50}
+    cases["pricing_index/large/expression"] = lambda: expression(values, usage)
+    cases["pricing_index/large/evaluate"] = lambda: index.evaluate("feature250", values, usage)
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=number, repeat=5))
+        results[name] = best / number * 1e6
+    return results
+
+
+def metrics(number: int) -> Dict[str, dict]:
+    return {f"models/{name}": metric(micros, "us/op") for name, micros in run(number).items()}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20_000)
+    parser.add_argument("--output", help="fichero JSON de resultados")
+    args = parser.parse_args(argv)
+    results = metrics(args.number)
+    print_results(results)
+    if args.output:
+        write_results(args.output, results, {"number": args.number})
+
+
+if __name__ == "__main__":
+    main()
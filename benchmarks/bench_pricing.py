@@ -0,0 +1,65 @@
+"""
+Coste de get_pricing() con pricings de tamaño creciente: la petición completa contra el SPACE
+stand-in y, por separado, la decodificación del JSON recibido a modelos.
+
+Uso: python -m benchmarks.bench_pricing [--sizes 10,100,1000] [--number N] [--output FICHERO]
+"""
+import argparse
+import asyncio
+import time
+import timeit
+from typing import Dict, Optional, Sequence
+from app_SpacePyCl.models import Pricing
+from app_SpacePyCl.utils.parser import parse_model
+from benchmarks.support import SERVICE, metric, print_results, seeded_stand_in, synthetic_pricing, write_results
+
+DEFAULT_SIZES = (10, 100, 1000)
+
+
+async def _measure_size(features: int, number: int) -> Dict[str, dict]:
+    pricing = synthetic_pricing(features=features, plans=5, addons=5, limits=max(2, features // 20))
+    prefix = f"pricing/f{features}"
+    # Sin caché de documentos ni single-flight: cada llamada descarga y decodifica el pricing
+    async with seeded_stand_in(pricing=pricing, coalesce_requests=False) as (stand_in, client):
+        service_context = client.service_context
+        await service_context.get_pricing(SERVICE, "1.0.0")
+        started = time.perf_counter()
+        for _ in range(number):
+            await service_context.get_pricing(SERVICE, "1.0.0")
+        elapsed = time.perf_counter() - started
+
+        response = await client._request(
+            "GET", f"{client.http_url}/services/{SERVICE}/pricings/1.0.0", idempotent=True)
+    raw = response.body
+    parse_number = max(1, number // 4)
+    parse = min(timeit.repeat(lambda: parse_model(Pricing, raw), number=parse_number, repeat=3)) / parse_number
+    return {
+        f"{prefix}/get_pricing": metric(elapsed / number * 1e6, "us/op"),
+        f"{prefix}/parse": metric(parse * 1e6, "us/op"),
+        f"{prefix}/size": metric(len(raw) / 1024, "KiB", None),
+    }
+
+
+async def run(sizes: Sequence[int] = DEFAULT_SIZES, number: int = 200) -> Dict[str, dict]:
+    results: Dict[str, dict] = {}
+    for features in sizes:
+        # Los pricings grandes se miden con menos repeticiones para acotar la duración
+        results.update(await _measure_size(features, max(5, number * 10 // max(features, 10))))
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="número de features")
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--output", help="fichero JSON de resultados")
+    args = parser.parse_args(argv)
+    parameters = {"sizes": [int(s) for s in args.sizes.split(",")], "number": args.number}
+    results = asyncio.run(run(**parameters))
+    print_results(results)
+    if args.output:
+        write_results(args.output, results, parameters)
+
+
+if __name__ == "__main__":
+    main()
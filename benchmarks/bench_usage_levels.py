@@ -0,0 +1,52 @@
+"""
+Ritmo de update_usage_levels() contra el SPACE stand-in, con concurrencia creciente.
+
+Uso: python -m benchmarks.bench_usage_levels [--requests N] [--concurrency 1,8,32] [--output FICHERO]
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional, Sequence
+from benchmarks.support import SERVICE, latency_metrics, print_results, seeded_stand_in, write_results
+
+DEFAULT_CONCURRENCY = (1, 8, 32)
+
+
+async def run(requests: int = 1000, concurrency: Sequence[int] = DEFAULT_CONCURRENCY,
+              users: int = 50) -> Dict[str, dict]:
+    async with seeded_stand_in(users) as (stand_in, client):
+        contracts = client.contracts
+        results: Dict[str, dict] = {}
+        for level in concurrency:
+            samples: List[float] = []
+            counter = iter(range(requests))
+
+            async def worker() -> None:
+                for i in counter:
+                    started = time.perf_counter()
+                    await contracts.update_usage_levels(f"u{i % users}", {SERVICE: {"limit0": 1}})
+                    samples.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(level)))
+            results.update(latency_metrics(f"usage_levels/c{level}", samples, time.perf_counter() - started))
+        return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", default=",".join(map(str, DEFAULT_CONCURRENCY)))
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--output", help="fichero JSON de resultados")
+    args = parser.parse_args(argv)
+    parameters = {"requests": args.requests, "concurrency": [int(c) for c in args.concurrency.split(",")],
+                  "users": args.users}
+    results = asyncio.run(run(**parameters))
+    print_results(results)
+    if args.output:
+        write_results(args.output, results, parameters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compara dos ficheros de resultados de benchmarks y señala las regresiones.
+
+Una métrica empeora si cambia más de `--threshold` (en proporción) en la dirección contraria a su
+campo `better`. Las métricas sin dirección o que solo están en uno de los ficheros se listan pero
+no cuentan. Sale con código 1 si hay alguna regresión.
+
+Uso: python -m benchmarks.compare BASE.json ACTUAL.json [--threshold 0.1]
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+def _load(path: str) -> Dict[str, dict]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare(baseline: Dict[str, dict], current: Dict[str, dict],
+            threshold: float = 0.1) -> List[Tuple[str, Optional[float], Optional[float], Optional[float], str]]:
+    """
+    Devuelve (nombre, base, actual, cambio relativo, estado) por métrica. El estado es
+    "regression", "improvement", "ok", "info" (sin dirección), "new" o "removed".
+    """
+    rows = []
+    for name in sorted(set(baseline) | set(current)):
+        before, after = baseline.get(name), current.get(name)
+        if before is None or after is None:
+            rows.append((name, before and before["value"], after and after["value"], None,
+                         "new" if before is None else "removed"))
+            continue
+        old, new = before["value"], after["value"]
+        change = (new - old) / old if old else None
+        better = after.get("better")
+        if better is None or change is None:
+            status = "info"
+        else:
+            worse = change if better == "lower" else -change
+            status = "regression" if worse > threshold else "improvement" if worse < -threshold else "ok"
+        rows.append((name, old, new, change, status))
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+    rows = compare(_load(args.baseline), _load(args.current), args.threshold)
+    for name, old, new, change, status in rows:
+        old_text = f"{old:12.2f}" if old is not None else f"{'-':>12}"
+        new_text = f"{new:12.2f}" if new is not None else f"{'-':>12}"
+        change_text = f"{change:+8.1%}" if change is not None else f"{'':>8}"
+        print(f"{name:<44} {old_text} {new_text} {change_text}  {status}")
+    return 1 if any(row[4] == "regression" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Ejecuta todos los benchmarks y escribe sus resultados en un único JSON, comparable con
+benchmarks.compare entre versiones.
+
+Uso: python -m benchmarks.run_all [--output FICHERO] [--quick]
+"""
+import argparse
+import asyncio
+from typing import Dict, Optional, Sequence
+from benchmarks import bench_evaluate, bench_memory, bench_models, bench_pricing, bench_usage_levels
+from benchmarks.support import print_results, write_results
+
+# Parámetros por defecto y, con --quick, reducidos para una comprobación rápida
+PARAMETERS = {
+    "evaluate": {"requests": 2000, "concurrency": [1, 4, 16, 64]},
+    "pricing": {"sizes": [10, 100, 1000], "number": 200},
+    "usage_levels": {"requests": 1000, "concurrency": [1, 8, 32]},
+    "models": {"number": 20_000},
+    "memory": {"count": 200},
+}
+QUICK_PARAMETERS = {
+    "evaluate": {"requests": 200, "concurrency": [1, 16]},
+    "pricing": {"sizes": [10, 100], "number": 20},
+    "usage_levels": {"requests": 100, "concurrency": [1, 8]},
+    "models": {"number": 500},
+    "memory": {"count": 20},
+}
+
+
+def run(parameters: Dict[str, dict]) -> Dict[str, dict]:
+    results: Dict[str, dict] = {}
+    results.update(asyncio.run(bench_evaluate.run(**parameters["evaluate"])))
+    results.update(asyncio.run(bench_pricing.run(**parameters["pricing"])))
+    results.update(asyncio.run(bench_usage_levels.run(**parameters["usage_levels"])))
+    results.update(bench_models.metrics(**parameters["models"]))
+    results.update(bench_memory.metrics(**parameters["memory"]))
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="benchmark-results.json", help="fichero JSON de resultados")
+    parser.add_argument("--quick", action="store_true", help="menos repeticiones; útil para comprobar que todo funciona")
+    args = parser.parse_args(argv)
+    parameters = QUICK_PARAMETERS if args.quick else PARAMETERS
+    results = run(parameters)
+    print_results(results)
+    write_results(args.output, results, parameters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Utilidades comunes de los benchmarks: formato de resultados, percentiles, pricings sintéticos y
+un SPACE stand-in con datos sembrados.
+
+Cada benchmark devuelve un dict plano {nombre: métrica}, donde cada métrica es
+{"value": float, "unit": str, "better": "lower" | "higher" | None}. `better` indica en qué
+dirección mejora la métrica; las métricas informativas (p.ej. tamaños) lo dejan a None y no se
+comparan.
+"""
+import json
+import math
+import os
+import platform
+import sys
+import time
+from contextlib import asynccontextmanager
+from importlib import metadata
+from typing import AsyncIterator, Dict, Optional, Sequence, Tuple
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.testing import SpaceStandIn, StandInOptions
+
+SERVICE = "BenchService"
+RESULTS_FORMAT = 1
+
+
+def metric(value: float, unit: str, better: Optional[str] = "lower") -> dict:
+    return {"value": value, "unit": unit, "better": better}
+
+
+def percentiles(samples: Sequence[float], points: Sequence[int] = (50, 90, 99)) -> Dict[int, float]:
+    """Percentiles por rango más cercano; `samples` no tiene por qué estar ordenado."""
+    ordered = sorted(samples)
+    return {p: ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)] for p in points}
+
+
+def latency_metrics(prefix: str, samples: Sequence[float], elapsed: float) -> Dict[str, dict]:
+    """Throughput y percentiles de latencia (en ms) de `samples`, tiempos por petición en segundos."""
+    results = {f"{prefix}/throughput": metric(len(samples) / elapsed, "req/s", "higher")}
+    for point, value in percentiles(samples).items():
+        results[f"{prefix}/p{point}"] = metric(value * 1000, "ms")
+    return results
+
+
+def synthetic_pricing(features: int = 10, plans: int = 3, addons: int = 2, limits: int = 2,
+                      service: str = SERVICE, version: str = "1.0.0") -> dict:
+    """
+    Pricing con `features` features booleanas, `limits` límites de uso enlazados a la primera
+    feature, y `plans` planes y `addons` add-ons que activan cada uno una parte de las features.
+    """
+    feature_names = [f"feature{i}" for i in range(features)]
+    limit_names = [f"limit{i}" for i in range(limits)]
+    document = {
+        "saasName": service,
+        "syntaxVersion": "3.0",
+        "version": version,
+        "createdAt": "2025-01-01",
+        "currency": "USD",
+        "features": {name: {
+            "description": f"Feature {name}", "valueType": "BOOLEAN", "defaultValue": i == 0,
+            "type": "DOMAIN", "expression": f"pricingContext['features']['{name}']",
+        } for i, name in enumerate(feature_names)},
+        "usageLimits": {name: {
+            "description": f"Limit {name}", "valueType": "NUMERIC", "defaultValue": 100,
+            "type": "RENEWABLE", "period": {"unit": "DAY", "value": 1},
+            "linkedFeatures": feature_names[:1],
+        } for name in limit_names},
+        "plans": {f"PLAN{p}": {
+            "description": f"Plan {p}", "price": float(p * 10),
+            "features": {name: {"value": True} for name in feature_names[:(p + 1) * features // plans]},
+            "usageLimits": {name: {"value": 100 * (p + 1)} for name in limit_names},
+        } for p in range(plans)},
+        "addOns": {f"addon{a}": {
+            "description": f"Add-on {a}", "price": 1.0,
+            "features": {name: {"value": True} for name in feature_names[a::max(addons, 1)]},
+            "usageLimitsExtensions": {name: {"value": 10} for name in limit_names},
+        } for a in range(addons)},
+    }
+    return document
+
+
+def contract(user_id: str, plan: str = "PLAN0", service: str = SERVICE) -> dict:
+    return {
+        "userContact": {"userId": user_id, "username": f"user_{user_id}"},
+        "billingPeriod": {"autoRenew": True, "renewalDays": 30},
+        "contractedServices": {service: "1.0.0"},
+        "subscriptionPlans": {service: plan},
+        "subscriptionAddOns": {service: {}},
+    }
+
+
+@asynccontextmanager
+async def seeded_stand_in(users: int = 0, pricing: Optional[dict] = None,
+                          options: Optional[StandInOptions] = None,
+                          **client_options) -> AsyncIterator[Tuple[SpaceStandIn, SpaceClient]]:
+    """
+    Arranca un stand-in con el pricing (por defecto synthetic_pricing()) y `users` contratos
+    (usuarios "u0", "u1", ...), y un SpaceClient conectado a él.
+
+    El stand-in comparte proceso y event loop con el cliente: los resultados miden el cliente
+    más un servidor mínimo, no la latencia de red ni la de un SPACE real.
+    """
+    async with SpaceStandIn(options) as stand_in:
+        async with SpaceClient(stand_in.url, "bench", **client_options) as client:
+            await client.service_context.add_service(
+                json.dumps(pricing or synthetic_pricing()).encode(), filename="pricing.json")
+            for i in range(users):
+                await client.contracts.add_contract(contract(f"u{i}"))
+            stand_in.reset_stats()
+            yield stand_in, client
+
+
+def environment() -> dict:
+    try:
+        version = metadata.version("app_SpacePyCl")
+    except metadata.PackageNotFoundError:
+        version = None
+    return {
+        "package_version": version,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def write_results(path: str, results: Dict[str, dict], parameters: Optional[dict] = None) -> None:
+    """Escribe los resultados en JSON junto con el entorno y los parámetros de la ejecución."""
+    document = {
+        "format": RESULTS_FORMAT,
+        "environment": environment(),
+        "parameters": parameters or {},
+        "results": dict(sorted(results.items())),
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+        f.write("\n")
+
+
+def print_results(results: Dict[str, dict]) -> None:
+    for name, result in sorted(results.items()):
+        print(f"{name:<44} {result['value']:12.2f} {result['unit']}")
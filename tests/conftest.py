@@ -4,12 +4,15 @@ import pytest_asyncio
 import tempfile
 import uuid
 from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.testing import SpaceStandIn
 from dotenv import load_dotenv
 
 load_dotenv(encoding='utf-8-sig')
 
 TEST_SPACE_URL = "http://localhost:5403"
 API_KEY = os.getenv('API_KEY')
+# Con SPACE_STAND_IN=1 los tests usan un stand-in en proceso en lugar de un SPACE real
+USE_STAND_IN = os.getenv('SPACE_STAND_IN', '').lower() in ('1', 'true', 'yes')
 
 if not API_KEY:
     print("API_KEY no encontrada en las variables de entorno.")
@@ -22,7 +25,12 @@ print("-------------------------------------------------------------------------
 
 @pytest_asyncio.fixture
 async def space_client():
-    client = SpaceClient(TEST_SPACE_URL, API_KEY)
+    stand_in = None
+    url = TEST_SPACE_URL
+    if USE_STAND_IN:
+        stand_in = SpaceStandIn()
+        url = await stand_in.start()
+    client = SpaceClient(url, API_KEY or "stand-in")
     
     yield client
     print("-------------------------------------------------------------------------------------------------------------")
@@ -41,6 +49,8 @@ async def space_client():
         print(f"Error borrando: {e}")
 
     await client.close()
+    if stand_in is not None:
+        await stand_in.close()
 
 #-------------------------------------------------------------------------------------------------------------
 
@@ -0,0 +1,47 @@
+import json
+import pytest
+from benchmarks import bench_evaluate, bench_memory, bench_pricing, bench_usage_levels, compare
+from benchmarks.support import metric, percentiles, write_results
+
+
+class TestBenchmarks:
+
+    def test_percentiles(self):
+        """Test de percentiles por rango más cercano"""
+        samples = list(range(100, 0, -1))
+        assert percentiles(samples) == {50: 50, 90: 90, 99: 99}
+        assert percentiles([7]) == {50: 7, 90: 7, 99: 7}
+
+    @pytest.mark.asyncio
+    async def test_suite_runs_against_stand_in(self, tmp_path):
+        """Test de que los benchmarks se ejecutan contra el stand-in y escriben JSON"""
+        results = {}
+        results.update(await bench_evaluate.run(requests=40, concurrency=[1, 4], users=5))
+        results.update(await bench_pricing.run(sizes=[10], number=5))
+        results.update(await bench_usage_levels.run(requests=20, concurrency=[2], users=5))
+        assert results["evaluate/c4/throughput"]["better"] == "higher"
+        assert results["evaluate/c4/p99"]["value"] >= results["evaluate/c4/p50"]["value"]
+        assert "pricing/f10/parse" in results and "usage_levels/c2/p90" in results
+
+        path = tmp_path / "results.json"
+        write_results(str(path), results, {"quick": True})
+        document = json.loads(path.read_text())
+        assert document["parameters"] == {"quick": True}
+        assert document["environment"]["python"]
+        assert set(document["results"]) == set(results)
+
+    def test_compact_pricings_use_less_memory(self):
+        """Test de que la representación compacta retiene menos memoria que los modelos"""
+        results = bench_memory.run(count=5)
+        for name in ("tomatometer", "f100"):
+            assert results[f"{name}/compact_versions"] < results[f"{name}/compact"] < results[f"{name}/pydantic"]
+
+    def test_compare_flags_regressions(self):
+        """Test de detección de regresiones según la dirección de cada métrica"""
+        baseline = {"a/throughput": metric(1000, "req/s", "higher"), "a/p99": metric(10, "ms"),
+                    "a/size": metric(5, "KiB", None), "old": metric(1, "ms")}
+        current = {"a/throughput": metric(800, "req/s", "higher"), "a/p99": metric(8, "ms"),
+                   "a/size": metric(50, "KiB", None), "new": metric(1, "ms")}
+        statuses = {row[0]: row[4] for row in compare.compare(baseline, current, threshold=0.1)}
+        assert statuses == {"a/throughput": "regression", "a/p99": "improvement", "a/size": "info",
+                            "old": "removed", "new": "new"}
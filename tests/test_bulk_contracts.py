@@ -0,0 +1,143 @@
+import asyncio
+import json
+import threading
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.utils import bulk
+from app_SpacePyCl.utils.bulk import BulkOptions, run_bulk
+
+
+def contract(user_id: str) -> dict:
+    return {
+        "userContact": {"userId": user_id, "username": f"user_{user_id}"},
+        "billingPeriod": {"autoRenew": True, "renewalDays": 30},
+        "contractedServices": {"svc": "1.0"},
+        "subscriptionPlans": {"svc": "BASIC"},
+        "subscriptionAddOns": {},
+    }
+
+
+def contract_response(body: dict) -> dict:
+    return {**body, "billingPeriod": {"startDate": "2025-01-01T00:00:00Z", "endDate": "2025-02-01T00:00:00Z",
+                                      "autoRenew": True, "renewalDays": 30}}
+
+
+@pytest_asyncio.fixture
+async def contracts_server():
+    state = {"created": [], "updated": {}, "received": 0, "in_flight": 0, "max_in_flight": 0}
+
+    async def track(coro):
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            await asyncio.sleep(0.005)
+            return await coro
+        finally:
+            state["in_flight"] -= 1
+
+    async def create(request):
+        state["received"] += 1
+
+        async def run():
+            body = await request.json()
+            user_id = body["userContact"]["userId"]
+            if user_id.startswith("dup"):
+                return web.Response(status=409, reason="Contract already exists")
+            state["created"].append(user_id)
+            return web.json_response(contract_response(body))
+        return await track(run())
+
+    async def update(request):
+        async def run():
+            user_id = request.match_info["user_id"]
+            body = await request.json()
+            state["updated"][user_id] = body["subscriptionPlans"]
+            return web.json_response(contract_response({**contract(user_id), **body}))
+        return await track(run())
+
+    app = web.Application()
+    app.router.add_post("/api/v1/contracts", create)
+    app.router.add_put("/api/v1/contracts/{user_id}", update)
+    server = TestServer(app)
+    await server.start_server()
+    client = SpaceClient(str(server.make_url("")), "key", retry_policy=None)
+    yield client, state
+    await client.close()
+    await server.close()
+
+
+class TestBulkContracts:
+
+    @pytest.mark.asyncio
+    async def test_add_contracts_from_async_stream(self, contracts_server):
+        """Test de alta masiva desde un stream asíncrono, con concurrencia limitada y backpressure"""
+        client, state = contracts_server
+        produced = 0
+
+        async def stream():
+            nonlocal produced
+            for i in range(50):
+                produced += 1
+                # Con la cola llena el productor no puede adelantarse a lo procesado
+                assert produced - state["received"] <= 4 + 4 + 1
+                yield contract(f"dup{i}" if i == 7 else f"u{i}")
+
+        report = await client.contracts.add_contracts(stream(), BulkOptions(max_concurrency=4, queue_size=4))
+        assert report.count("ok") == 49 and report.count("failed") == 1
+        assert report.failed[0].key == "dup7" and report.failed[0].http_status == 409
+        assert state["max_in_flight"] == 4
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_resumes(self, contracts_server, tmp_path):
+        """Test de reanudación con checkpoint: lo ya creado se salta"""
+        client, state = contracts_server
+        checkpoint = tmp_path / "contracts.jsonl"
+        options = BulkOptions(max_concurrency=2, checkpoint_path=str(checkpoint))
+        await client.contracts.add_contracts([contract(f"u{i}") for i in range(5)], options)
+        report = await client.contracts.add_contracts([contract(f"u{i}") for i in range(8)], options)
+        assert report.count("skipped") == 5 and report.count("ok") == 3
+        assert sorted(state["created"]) == sorted(f"u{i}" for i in range(8))
+        assert len(checkpoint.read_text().splitlines()) == 8
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_written_in_batches(self, tmp_path, monkeypatch):
+        """Test de que el checkpoint se escribe por lotes fuera del event loop"""
+        loop_thread = threading.get_ident()
+        batches = []
+        append_keys = bulk._append_keys
+
+        def recording_append(checkpoint, keys):
+            batches.append((threading.get_ident(), list(keys)))
+            append_keys(checkpoint, keys)
+
+        async def operation(item: int) -> None:
+            await asyncio.sleep(0.001)
+
+        monkeypatch.setattr(bulk, "_append_keys", recording_append)
+        checkpoint = tmp_path / "items.jsonl"
+        options = BulkOptions(max_concurrency=8, checkpoint_path=str(checkpoint))
+        report = await run_bulk(range(200), str, operation, options)
+        assert report.count("ok") == 200
+        assert sorted(json.loads(line) for line in checkpoint.read_text().splitlines()) == sorted(map(str, range(200)))
+        assert len(batches) < 200 and all(thread != loop_thread for thread, _ in batches)
+
+    @pytest.mark.asyncio
+    async def test_update_subscriptions(self, contracts_server):
+        """Test de migración masiva de suscripciones"""
+        client, state = contracts_server
+        subscription = {"contractedServices": {"svc": "2.0"}, "subscriptionPlans": {"svc": "PRO"},
+                        "subscriptionAddOns": {}}
+        report = await client.contracts.update_contract_subscriptions(
+            ((f"u{i}", subscription) for i in range(10)), BulkOptions(max_concurrency=3))
+        assert report.count("ok") == 10
+        assert state["updated"] == {f"u{i}": {"svc": "PRO"} for i in range(10)}
+        assert json.loads(json.dumps(report.to_dict()))["summary"]["ok"] == 10
+
+    @pytest.mark.asyncio
+    async def test_invalid_item(self, contracts_server):
+        client, _ = contracts_server
+        report = await client.contracts.add_contracts([{"userContact": {}}])
+        assert report.failed[0].error.startswith("Elemento no válido")
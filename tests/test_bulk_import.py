@@ -0,0 +1,127 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app_SpacePyCl import cli
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.utils.bulk_import import PricingImportOptions, find_pricing_files, read_pricing_header
+
+PRICING_YAML = """saasName: {name}
+syntaxVersion: "3.0"
+version: "{version}" # comentario
+createdAt: "2025-01-01"
+currency: USD
+features:
+  feature:
+    version: no-es-de-primer-nivel
+"""
+
+
+def write_pricings(directory, pricings):
+    for name, version in pricings:
+        (directory / f"{name}-{version}.yml").write_text(PRICING_YAML.format(name=name, version=version))
+
+
+@pytest_asyncio.fixture
+async def import_server():
+    state = {"services": {"existing": []}, "calls": [], "in_flight": 0, "max_in_flight": 0}
+
+    async def upload(request):
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            reader = await request.multipart()
+            content = (await (await reader.next()).read()).decode()
+            name = content.split("\n")[0].split(": ")[1]
+            await asyncio.sleep(0.02)
+            if "broken" in name:
+                return web.Response(status=400, reason="Invalid pricing")
+            target = request.match_info.get("name")
+            state["calls"].append((target or "create", name))
+            state["services"].setdefault(name, []).append(content)
+            return web.json_response({"name": name})
+        finally:
+            state["in_flight"] -= 1
+
+    async def get_service(request):
+        name = request.match_info["name"]
+        if name not in state["services"]:
+            return web.Response(status=404)
+        return web.json_response({"name": name})
+
+    app = web.Application()
+    app.router.add_post("/api/v1/services", upload)
+    app.router.add_post("/api/v1/services/{name}/pricings", upload)
+    app.router.add_get("/api/v1/services/{name}", get_service)
+    server = TestServer(app)
+    await server.start_server()
+    client = SpaceClient(str(server.make_url("")), "key", retry_policy=None)
+    yield client, state, server
+    await client.close()
+    await server.close()
+
+
+class TestBulkImport:
+
+    def test_read_pricing_header(self, tmp_path):
+        write_pricings(tmp_path, [("svc", "1.0")])
+        digest, name, version = read_pricing_header(str(tmp_path / "svc-1.0.yml"))
+        assert (name, version) == ("svc", "1.0") and len(digest) == 64
+
+    def test_find_pricing_files(self, tmp_path):
+        (tmp_path / "nested").mkdir()
+        write_pricings(tmp_path / "nested", [("a", "1")])
+        write_pricings(tmp_path, [("b", "1")])
+        (tmp_path / "notes.txt").write_text("x")
+        assert len(find_pricing_files(str(tmp_path))) == 2
+        assert len(find_pricing_files(str(tmp_path / "*.yml"))) == 1
+
+    @pytest.mark.asyncio
+    async def test_import_directory(self, import_server, tmp_path):
+        """Test de importación concurrente, con un servicio por fichero o varios pricings por servicio"""
+        client, state, _ = import_server
+        pricings = [(f"svc{i}", "1.0") for i in range(6)] + [("svc0", "2.0"), ("existing", "3.0"), ("broken", "1.0")]
+        write_pricings(tmp_path, pricings)
+        manifest = tmp_path / "manifest.json"
+
+        report = await client.service_context.import_pricings(
+            str(tmp_path), PricingImportOptions(max_concurrency=3, manifest_path=str(manifest)))
+        summary = report.to_dict()["summary"]
+        assert summary == {"created": 6, "added": 2, "skipped": 0, "failed": 1}
+        assert state["calls"].index(("create", "svc0")) < state["calls"].index(("svc0", "svc0"))
+        assert ("existing", "existing") in state["calls"]
+        assert 1 < state["max_in_flight"] <= 3
+        assert report.failed[0].service == "broken" and "400" in report.failed[0].error
+        assert all(result.elapsed > 0 for result in report.results)
+
+        state["calls"].clear()
+        report = await client.service_context.import_pricings(
+            str(tmp_path), PricingImportOptions(manifest_path=str(manifest)))
+        assert report.count("skipped") == 8 and report.count("failed") == 1
+        assert state["calls"] == []
+        assert len(json.loads(manifest.read_text())) == 8
+
+    @pytest.mark.asyncio
+    async def test_versions_of_one_service_in_parallel(self, import_server, tmp_path):
+        """Test de que las versiones de un mismo servicio se suben en paralelo tras crearlo"""
+        client, state, _ = import_server
+        write_pricings(tmp_path, [("many", f"{i}.0") for i in range(7)])
+        report = await client.service_context.import_pricings(str(tmp_path), PricingImportOptions(max_concurrency=3))
+        assert report.count("created") == 1 and report.count("added") == 6
+        assert state["calls"][0] == ("create", "many")
+        assert state["max_in_flight"] == 3
+
+    @pytest.mark.asyncio
+    async def test_cli(self, import_server, tmp_path, capsys):
+        """Test de la línea de comandos"""
+        client, state, server = import_server
+        write_pricings(tmp_path, [("cli", "1.0")])
+        url = str(server.make_url(""))
+        code = await asyncio.get_running_loop().run_in_executor(
+            None, cli.main, [str(tmp_path / "*.yml"), "--url", url, "--api-key", "key", "--json"])
+        assert code == 0
+        out = capsys.readouterr().out
+        output = json.loads(out[out.index("{\n"):])
+        assert output["summary"]["created"] == 1
@@ -0,0 +1,150 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.utils.circuit_breaker import (CircuitBreaker, CircuitBreakerOptions, CircuitOpenError,
+                                                 CircuitState, EvaluationFallback)
+from app_SpacePyCl.utils.errors import SpaceServerError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest_asyncio.fixture
+async def failing_server():
+    state = {"calls": 0, "healthy": True, "delay": 0.0}
+
+    async def handler(request):
+        state["calls"] += 1
+        await asyncio.sleep(state["delay"])
+        if not state["healthy"]:
+            return web.Response(status=503)
+        return web.json_response({"eval": True, "used": None, "limit": None})
+
+    app = web.Application()
+    app.router.add_post("/api/v1/features/{user_id}/{feature_id}", handler)
+    server = TestServer(app)
+    await server.start_server()
+    yield server, state
+    await server.close()
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_consecutive_failures(self):
+        """Test de apertura tras fallos consecutivos y rechazo inmediato"""
+        clock = FakeClock()
+        breaker = CircuitBreaker("GET /x", CircuitBreakerOptions(failure_threshold=3, recovery_timeout=10), clock)
+        for _ in range(3):
+            breaker.before_request()
+            breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+
+    def test_half_open_recovery(self):
+        """Test de paso a semiabierto tras el tiempo de recuperación y cierre si la prueba va bien"""
+        clock = FakeClock()
+        breaker = CircuitBreaker("GET /x", CircuitBreakerOptions(failure_threshold=1, recovery_timeout=10), clock)
+        breaker.before_request()
+        breaker.record_failure()
+        clock.now = 11
+        breaker.before_request()
+        assert breaker.state == CircuitState.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_half_open_failure_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker("GET /x", CircuitBreakerOptions(failure_threshold=1, recovery_timeout=10), clock)
+        breaker.before_request()
+        breaker.record_failure()
+        clock.now = 11
+        breaker.before_request()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.opened_count == 2
+
+    def test_release_returns_half_open_slot(self):
+        """Test de que una prueba sin resultado libera su hueco en semiabierto"""
+        clock = FakeClock()
+        breaker = CircuitBreaker("GET /x", CircuitBreakerOptions(failure_threshold=1, recovery_timeout=10), clock)
+        breaker.before_request()
+        breaker.record_failure()
+        clock.now = 11
+        breaker.before_request()
+        breaker.release()
+        breaker.before_request()
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_opens_on_failure_rate(self):
+        """Test de apertura por tasa de fallos en la ventana"""
+        breaker = CircuitBreaker("GET /x", CircuitBreakerOptions(
+            failure_threshold=100, failure_rate_threshold=0.5, window_size=10, minimum_calls=10))
+        for i in range(10):
+            breaker.record_failure() if i % 2 else breaker.record_success()
+        assert breaker.state == CircuitState.OPEN
+
+
+class TestEvaluationFallback:
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_serves_last_known_result(self, failing_server):
+        """Test de que con el circuito abierto se sirve el último resultado conocido sin ir a SPACE"""
+        server, state = failing_server
+        client = SpaceClient(str(server.make_url("/")), "api-key", retry_policy=None,
+                             circuit_breaker=CircuitBreakerOptions(failure_threshold=2, recovery_timeout=60),
+                             evaluation_fallback=EvaluationFallback(defaults={"svc-b": False}))
+        try:
+            assert (await client.featureEvaluators.evaluate("user1", "svc-a")).eval is True
+            state["healthy"] = False
+            for _ in range(2):
+                with pytest.raises(SpaceServerError):
+                    await client.featureEvaluators.evaluate("user1", "svc-b")
+            calls = state["calls"]
+
+            assert (await client.featureEvaluators.evaluate("user1", "svc-a")).eval is True
+            assert (await client.featureEvaluators.evaluate("user1", "svc-b")).eval is False
+            assert state["calls"] == calls
+            with pytest.raises(CircuitOpenError):
+                await client.featureEvaluators.evaluate("user1", "svc-c")
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_half_open_probe(self, failing_server):
+        """Test de que cancelar la petición de prueba no deja el circuito semiabierto para siempre"""
+        server, state = failing_server
+        clock = FakeClock()
+        # Sin coalescencia, para que la cancelación llegue a la propia petición
+        client = SpaceClient(str(server.make_url("/")), "api-key", retry_policy=None, coalesce_requests=False,
+                             circuit_breaker=CircuitBreakerOptions(failure_threshold=1, recovery_timeout=10))
+        client.circuit_breakers._clock = clock
+        try:
+            state["healthy"] = False
+            with pytest.raises(SpaceServerError):
+                await client.featureEvaluators.evaluate("user1", "svc-a")
+            clock.now = 11
+            state["healthy"], state["delay"] = True, 10.0
+            probe = asyncio.ensure_future(client.featureEvaluators.evaluate("user1", "svc-a"))
+            await asyncio.sleep(0.1)
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+
+            state["delay"] = 0.0
+            assert (await client.featureEvaluators.evaluate("user1", "svc-a")).eval is True
+            breaker = next(iter(client.circuit_breakers))
+            assert breaker.state == CircuitState.CLOSED
+        finally:
+            await client.close()
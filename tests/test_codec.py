@@ -0,0 +1,81 @@
+import json
+from datetime import datetime
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app_SpacePyCl.models import ContractToCreate, Subscription
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.utils.codec import JsonCodec, get_codec
+
+CONTRACT_TO_CREATE = ContractToCreate(
+    userContact={"userId": "user1", "username": "user_1"},
+    billingPeriod={"autoRenew": True, "renewalDays": 30},
+    contractedServices={"tomatometer": "1.0.0"},
+    subscriptionPlans={"tomatometer": "BASIC"},
+    subscriptionAddOns={},
+)
+
+
+def available_codecs():
+    codecs = []
+    for name in ("json", "orjson", "msgspec"):
+        try:
+            codecs.append(get_codec(name))
+        except ImportError:
+            pass
+    return codecs
+
+
+class TestCodec:
+
+    @pytest.mark.parametrize("codec", available_codecs(), ids=lambda c: c.name)
+    def test_encode_models_without_model_dump(self, codec):
+        """Test de serialización de modelos Pydantic, también anidados, con cada codec"""
+        subscription = Subscription(contractedServices={"svc": "1.0"}, subscriptionPlans={"svc": "BASIC"},
+                                    subscriptionAddOns={})
+        assert json.loads(codec.dumps(subscription)) == subscription.model_dump()
+        nested = json.loads(codec.dumps({"subscription": subscription, "at": datetime(2025, 1, 1)}))
+        assert nested["subscription"]["subscriptionPlans"] == {"svc": "BASIC"}
+        assert nested["at"] == "2025-01-01T00:00:00"
+        assert codec.loads(b'{"a": [1, 2]}') == {"a": [1, 2]}
+
+    def test_unknown_codec(self):
+        with pytest.raises(ValueError):
+            get_codec("yaml")
+
+    @pytest.mark.asyncio
+    async def test_client_uses_codec_for_request_bodies(self):
+        """Test de que los módulos envían los cuerpos con el codec del cliente"""
+        received = {}
+
+        async def add_contract(request):
+            received["content_type"] = request.headers.get("Content-Type")
+            received["body"] = await request.json()
+            return web.json_response({
+                **received["body"],
+                "billingPeriod": {"startDate": "2025-01-01T00:00:00Z", "endDate": "2025-02-01T00:00:00Z",
+                                  "autoRenew": True, "renewalDays": 30},
+                "usageLevels": {}, "history": [],
+            })
+
+        class CountingCodec(JsonCodec):
+            dumps_calls = 0
+
+            def dumps(self, obj):
+                CountingCodec.dumps_calls += 1
+                return super().dumps(obj)
+
+        app = web.Application()
+        app.router.add_post("/api/v1/contracts", add_contract)
+        server = TestServer(app)
+        await server.start_server()
+        client = SpaceClient(str(server.make_url("/")), "api-key", codec=CountingCodec())
+        try:
+            contract = await client.contracts.add_contract(CONTRACT_TO_CREATE)
+            assert contract.userContact.userId == "user1"
+            assert received["content_type"] == "application/json"
+            assert received["body"]["subscriptionPlans"] == {"tomatometer": "BASIC"}
+            assert CountingCodec.dumps_calls == 1
+        finally:
+            await client.close()
+            await server.close()
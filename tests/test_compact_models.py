@@ -0,0 +1,71 @@
+import json
+import os
+import sys
+from app_SpacePyCl.models import Pricing, PricingFeatureValueType, Service, UsageLimitType
+from app_SpacePyCl.models.compact import CompactCatalog, CompactPricing, CompactService, FrozenMap
+from app_SpacePyCl.utils.pricing_index import PricingIndex
+
+PRICING_PATH = os.path.join(os.path.dirname(__file__), "resources", "pricings", "TomatoMeter.json")
+
+
+def load_document(**changes) -> dict:
+    with open(PRICING_PATH, encoding="utf-8") as f:
+        return {**json.load(f), **changes}
+
+
+class TestCompactModels:
+
+    def test_round_trip_and_read_api(self):
+        """Test de que el pricing compacto conserva todos los datos y la API de lectura del modelo"""
+        pricing = Pricing.model_validate(load_document())
+        compact = CompactPricing.from_model(pricing)
+        assert compact.to_model() == pricing
+
+        feature = compact.features["pomodoroTimer"]
+        assert feature.valueType == PricingFeatureValueType.BOOLEAN and feature.tag is None
+        assert not hasattr(feature, "__dict__")
+        limit = compact.usageLimits["maxPomodoroTimers"]
+        assert limit.type == UsageLimitType.RENEWABLE and limit.linkedFeatures == ("pomodoroTimer",)
+        assert isinstance(compact.plans["ADVANCED"].usageLimits, FrozenMap)
+        assert compact.plans["ADVANCED"].usageLimits.get("maxPomodoroTimers") == 10
+        assert compact.addons["exportAsJson"].availableFor == ("PREMIUM",)
+
+    def test_pricing_index_from_compact(self):
+        """Test de que un PricingIndex se construye igual desde el pricing compacto"""
+        pricing = Pricing.model_validate(load_document())
+        expected = PricingIndex(pricing).resolve("ADVANCED", {"extraTimers": 2})
+        resolved = PricingIndex(CompactPricing.from_model(pricing)).resolve("ADVANCED", {"extraTimers": 2})
+        assert resolved.features == expected.features and resolved.limits == expected.limits
+
+    def test_catalog_shares_unchanged_elements(self):
+        """Test de que las versiones de un catálogo comparten lo que no cambia entre ellas"""
+        catalog = CompactCatalog()
+        first = catalog.add_pricing("TomatoMeter", Pricing.model_validate(load_document()))
+        document = load_document(version="2.0.0")
+        document["plans"]["BASIC"] = {**document["plans"]["BASIC"], "price": 99.0}
+        document["features"]["darkMode"] = {**document["features"]["darkMode"], "defaultValue": 1}
+        second = catalog.add_pricing("tomatometer", Pricing.model_validate(document))
+
+        assert second.features["pomodoroTimer"] is first.features["pomodoroTimer"]
+        assert second.plans["ADVANCED"] is first.plans["ADVANCED"]
+        assert second.plans["BASIC"] is not first.plans["BASIC"]
+        # True y 1 no son el mismo valor en un pricing
+        assert second.features["darkMode"] is not first.features["darkMode"]
+        assert second.features["pomodoroTimer"].name is sys.intern("pomodoroTimer")
+        assert list(catalog.get("TOMATOMETER").activePricings) == ["1.0.0", "2.0.0"]
+        assert catalog.pricing("tomatometer", "2.0.0") is second
+
+        catalog.add_pricing("TomatoMeter", Pricing.model_validate(load_document()), archived=True)
+        assert list(catalog.get("tomatometer").archivedPricing) == ["1.0.0"]
+        assert list(catalog.get("tomatometer").activePricings) == ["2.0.0"]
+
+    def test_service_round_trip(self):
+        """Test de servicios con pricings completos y referencias"""
+        service = Service.model_validate({
+            "name": "TomatoMeter", "disabled": False,
+            "activePricings": {"1.0.0": load_document()},
+            "archivedPricings": {"0.9.0": {"id": "abc", "url": None}},
+        })
+        compact = CompactService.from_model(service)
+        assert compact.to_model() == service
+        assert compact.pricing("0.9.0").id == "abc" and compact.pricing("1.0.0").version == "1.0.0"
@@ -0,0 +1,93 @@
+import ssl
+import pytest
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.utils import PoolOptions, ConnectionPool, SpaceConnectionOptions
+from app_SpacePyCl.utils.conect import connect
+from app_SpacePyCl.utils import pool
+
+TEST_URL = "http://localhost:5403"
+
+
+class TestConnectionPool:
+
+    @pytest.mark.asyncio
+    async def test_pool_options_applied_to_connector(self):
+        """Test de que las opciones del pool llegan al conector de aiohttp"""
+        options = PoolOptions(limit=250, limit_per_host=50, keepalive_timeout=30, ttl_dns_cache=60)
+        client = SpaceClient(TEST_URL, "api-key", pool=options)
+        try:
+            session = await client._get_session()
+            assert session.connector.limit == 250
+            assert session.connector.limit_per_host == 50
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_shared_pool_between_clients(self):
+        """Test de que dos clientes con pool compartido usan el mismo conector"""
+        options = PoolOptions(limit=300, shared=True)
+        client_a = SpaceClient(TEST_URL, "api-key", pool=options)
+        client_b = SpaceClient(TEST_URL, "other-key", pool=options)
+        try:
+            session_a = await client_a._get_session()
+            session_b = await client_b._get_session()
+            assert client_a.pool is client_b.pool
+            connector = session_a.connector
+            assert connector is session_b.connector
+
+            await client_a.close()
+            assert not connector.closed
+        finally:
+            await client_b.close()
+        assert connector.closed
+
+    @pytest.mark.asyncio
+    async def test_shared_pool_per_ssl_context(self):
+        """Test de que clientes con contextos TLS distintos no comparten pool"""
+        context_a, context_b = ssl.create_default_context(), ssl.create_default_context()
+        client_a = SpaceClient(TEST_URL, "api-key", pool=PoolOptions(limit=301, shared=True, ssl_context=context_a))
+        client_b = SpaceClient(TEST_URL, "api-key", pool=PoolOptions(limit=301, shared=True, ssl_context=context_b))
+        client_c = SpaceClient(TEST_URL, "api-key", pool=PoolOptions(limit=301, shared=True, ssl_context=context_a))
+        try:
+            assert client_a.pool is not client_b.pool
+            assert client_a.pool is client_c.pool
+        finally:
+            for client in (client_a, client_b, client_c):
+                await client.close()
+
+    @pytest.mark.asyncio
+    async def test_explicit_pool_instance(self):
+        """Test de que se puede pasar un ConnectionPool ya creado"""
+        pool = ConnectionPool(PoolOptions(limit=10))
+        client = SpaceClient(TEST_URL, "api-key", pool=pool)
+        try:
+            session = await client._get_session()
+            assert client.pool is pool
+            assert session.connector.limit == 10
+        finally:
+            await client.close()
+
+    def test_invalid_pool_options(self):
+        """Test de validación de las opciones del pool"""
+        with pytest.raises(ValueError):
+            ConnectionPool(PoolOptions(limit=-1))
+        with pytest.raises(ValueError):
+            SpaceConnectionOptions(TEST_URL, "api-key", pool=PoolOptions(limit=5, warmup_connections=10)).validate()
+
+    def test_connect_with_pool_options(self):
+        """Test de connect() propagando las opciones del pool"""
+        options = SpaceConnectionOptions(TEST_URL, "api-key", pool=PoolOptions(limit=42))
+        client = connect(options)
+        assert client.pool.options.limit == 42
+
+    @pytest.mark.asyncio
+    async def test_detach_connector(self):
+        """Test de que un conector heredado se suelta sin cerrarse, también sin los internos de aiohttp"""
+        connector = ConnectionPool(PoolOptions()).acquire()
+        pool._detach_connector(connector)
+        assert connector.closed and not connector._conns
+
+        unknown = object()
+        pool._detach_connector(unknown)
+        assert pool._inherited_connectors[-1] is unknown
+        pool._inherited_connectors.remove(unknown)
@@ -61,7 +61,7 @@ plans:
 		}
 		#Generamos el contrato y comprobamos que existe
 		response= await space_client.contracts.add_contract(contract_to_create)
-		assert response["userContact"]["userId"] == user_id
+		assert response.userContact.userId == user_id
 		print("Test OK :) Created Contract:", response)
 
 	@pytest.mark.asyncio
@@ -198,7 +198,7 @@ plans:
 		#await space_client.contracts.add_contract(contract_to_create2)
 		contract = await space_client.contracts.get_user_id_contract(user_id)
 		#print("Retrieved contracts:", contract)
-		assert contract["userContact"]["userId"] == user_id
+		assert contract.userContact.userId == user_id
 		print("Test OK :) user contract correctly retrieved:", contract)
 
 	@pytest.mark.asyncio
@@ -343,7 +343,7 @@ plans:
 		}
 		#Generamos el contrato y comprobamos que existe
 		response= await space_client.contracts.add_contract(contract_to_create)
-		assert response["userContact"]["userId"] == user_id
+		assert response.userContact.userId == user_id
   
 		#Actualizamos las suscripciones al plan GOLD
 		new_subscription = {
@@ -356,8 +356,8 @@ plans:
 			"subscriptionAddOns": {}
 		}
 		response_updated= await space_client.contracts.update_contract_subscription(user_id, new_subscription)
-		assert response_updated["subscriptionPlans"][service_name] == "GOLD"
-		print("Test OK :) Contract updated for the user:", response_updated["subscriptionPlans"], "Previous version:", response["subscriptionPlans"])
+		assert response_updated.subscriptionPlans[service_name] == "GOLD"
+		print("Test OK :) Contract updated for the user:", response_updated.subscriptionPlans, "Previous version:", response.subscriptionPlans)
 		
 	@pytest.mark.asyncio
 	async def test_update_usage_levels(self, space_client):
@@ -434,7 +434,7 @@ plans:
 		#Generamos el contrato y comprobamos que existe
 		response= await space_client.contracts.add_contract(contract_to_create)
 		print("Created contract:", response)
-		assert response["userContact"]["userId"] == user_id
+		assert response.userContact.userId == user_id
 
 		#Actualizamos los niveles de uso
 		usageLevels = { 
@@ -443,5 +443,5 @@ plans:
   			}
 		}
 		response_updated= await space_client.contracts.update_usage_levels(user_id, usageLevels)
-		assert response_updated["usageLevels"][service_name.lower()]["api_calls"]["consumed"] == 1
-		print("Test OK :) Usage levels updated for the user:", response_updated["usageLevels"])
\ No newline at end of file
+		assert response_updated.usageLevels[service_name.lower()]["api_calls"].consumed == 1
+		print("Test OK :) Usage levels updated for the user:", response_updated.usageLevels)
\ No newline at end of file
@@ -0,0 +1,112 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.utils.cache import DocumentCache, DocumentCacheOptions
+
+PRICING = {"version": "1.0.0", "currency": "USD", "createdAt": "2025-01-01", "features": {}}
+
+
+@pytest_asyncio.fixture
+async def server_and_state():
+    state = {"full": 0, "not_modified": 0, "etag": '"v1"'}
+
+    async def get_pricing(request):
+        if request.headers.get("If-None-Match") == state["etag"]:
+            state["not_modified"] += 1
+            return web.Response(status=304)
+        state["full"] += 1
+        return web.json_response(PRICING, headers={"ETag": state["etag"]})
+
+    app = web.Application()
+    app.router.add_get("/api/v1/services/{service}/pricings/{version}", get_pricing)
+    server = TestServer(app)
+    await server.start_server()
+    yield server, state
+    await server.close()
+
+
+class TestDocumentCache:
+
+    def test_fresh_and_stale_entries(self):
+        """Test de que un documento deja de estar vigente tras el TTL pero se conserva para revalidar"""
+        now = [0.0]
+        cache = DocumentCache(DocumentCacheOptions(ttl=10, max_age=100), clock=lambda: now[0])
+        entry = cache.store(("pricing", "svc", "1.0"), PRICING, etag='"v1"')
+        assert cache.is_fresh(entry)
+        now[0] = 20
+        entry = cache.get(("pricing", "svc", "1.0"))
+        assert entry is not None and not cache.is_fresh(entry)
+        assert entry.conditional_headers() == {"If-None-Match": '"v1"'}
+
+    def test_invalidate_service(self):
+        """Test de invalidación del servicio y todos sus pricings"""
+        cache = DocumentCache()
+        cache.store(("service", "Svc"), {})
+        cache.store(("pricing", "Svc", "1.0"), {})
+        cache.store(("pricing", "Other", "1.0"), {})
+        cache.invalidate_service("svc")
+        assert len(cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_get_pricing_revalidates_with_etag(self, server_and_state):
+        """Test de que get_pricing revalida con If-None-Match en lugar de descargar de nuevo"""
+        server, state = server_and_state
+        client = SpaceClient(str(server.make_url("/")), "api-key",
+                             document_cache=DocumentCacheOptions(ttl=0, max_age=60))
+        try:
+            first = await client.service_context.get_pricing("svc", "1.0.0")
+            second = await client.service_context.get_pricing("svc", "1.0.0")
+            assert first == second
+            assert first.currency == "USD"
+            assert state["full"] == 1
+            assert state["not_modified"] == 1
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_get_pricing_served_while_fresh(self, server_and_state):
+        """Test de que un pricing vigente se sirve sin peticiones"""
+        server, state = server_and_state
+        client = SpaceClient(str(server.make_url("/")), "api-key", document_cache=DocumentCacheOptions(ttl=60))
+        try:
+            for _ in range(3):
+                await client.service_context.get_pricing("svc", "1.0.0")
+            assert state["full"] == 1
+            assert state["not_modified"] == 0
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_add_pricing_invalidates_after_upload(self):
+        """Test de que una lectura durante la subida de un pricing no deja en caché el servicio anterior"""
+        service = {"name": "svc", "disabled": False, "activePricings": {"1.0.0": {"id": "p1"}},
+                   "archivedPricings": {}}
+
+        async def get_service(request):
+            return web.json_response(service)
+
+        async def add_pricing(request):
+            await request.read()
+            await asyncio.sleep(0.1)
+            service["activePricings"]["2.0.0"] = {"id": "p2"}
+            return web.json_response(service, status=201)
+
+        app = web.Application()
+        app.router.add_get("/api/v1/services/{service}", get_service)
+        app.router.add_post("/api/v1/services/{service}/pricings", add_pricing)
+        server = TestServer(app)
+        await server.start_server()
+        client = SpaceClient(str(server.make_url("/")), "api-key", document_cache=DocumentCacheOptions(ttl=60))
+        try:
+            await client.service_context.get_service("svc")
+            upload = asyncio.ensure_future(client.service_context.add_pricing("svc", service_file=b"pricing"))
+            await asyncio.sleep(0.05)
+            await client.service_context.get_service("svc")
+            await upload
+            assert set((await client.service_context.get_service("svc")).activePricings) == {"1.0.0", "2.0.0"}
+        finally:
+            await client.close()
+            await server.close()
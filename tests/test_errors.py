@@ -0,0 +1,115 @@
+import logging
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.utils.errors import (SpaceAuthenticationError, SpaceBadRequestError, SpaceConnectionError,
+                                        SpaceError, SpaceHTTPError, SpaceNotFoundError, SpaceRateLimitError,
+                                        SpaceServerError, http_error_class)
+from app_SpacePyCl.utils.log import RateLimitedLogger
+
+
+@pytest_asyncio.fixture
+async def error_server():
+    state = {"status": 404, "body": {"error": "Service not found"}}
+
+    async def handler(request):
+        return web.json_response(state["body"], status=state["status"])
+
+    async def evaluate(request):
+        feature_id = request.match_info["feature_id"]
+        if feature_id == "svc-missing":
+            return web.json_response({"error": "Feature not found"}, status=404)
+        return web.json_response({"eval": True, "used": None, "limit": None})
+
+    app = web.Application()
+    app.router.add_get("/api/v1/services/{name}", handler)
+    app.router.add_post("/api/v1/features/{user_id}/{feature_id}", evaluate)
+    server = TestServer(app)
+    await server.start_server()
+    yield server, state
+    await server.close()
+
+
+class TestErrors:
+
+    def test_status_mapping(self):
+        """Test de la clase de error que corresponde a cada estado"""
+        assert http_error_class(400) is SpaceBadRequestError
+        assert http_error_class(422) is SpaceBadRequestError
+        assert http_error_class(403) is SpaceAuthenticationError
+        assert http_error_class(404) is SpaceNotFoundError
+        assert http_error_class(429) is SpaceRateLimitError
+        assert http_error_class(503) is SpaceServerError
+        assert http_error_class(418) is SpaceHTTPError
+
+    @pytest.mark.asyncio
+    async def test_typed_http_error(self, error_server):
+        """Test de que un 404 lanza SpaceNotFoundError, compatible con aiohttp.ClientResponseError"""
+        server, _ = error_server
+        async with SpaceClient(str(server.make_url("/")), "key", retry_policy=None) as client:
+            with pytest.raises(SpaceNotFoundError) as info:
+                await client.service_context.get_service("missing")
+        error = info.value
+        assert isinstance(error, aiohttp.ClientResponseError)
+        assert error.status == 404
+        assert error.detail == "Service not found"
+        assert error.endpoint == "GET /services/{serviceName}"
+
+    @pytest.mark.asyncio
+    async def test_connection_error(self):
+        """Test de que un fallo de conexión se lanza como SpaceConnectionError"""
+        async with SpaceClient("http://127.0.0.1:1", "key", retry_policy=None) as client:
+            with pytest.raises(SpaceConnectionError) as info:
+                await client.service_context.get_service("svc")
+        assert isinstance(info.value, aiohttp.ClientConnectionError)
+        assert isinstance(info.value, SpaceError)
+
+    @pytest.mark.asyncio
+    async def test_evaluate_many_maps_http_errors_to_none(self, error_server):
+        """Test de que evaluate_many deja a None las features cuya evaluación falla"""
+        server, _ = error_server
+        async with SpaceClient(str(server.make_url("/")), "key", retry_policy=None) as client:
+            results = await client.featureEvaluators.evaluate_many(
+                "user1", ["svc-a", "svc-missing"], expected_consumption={"svc-a": {"svc-calls": 1},
+                                                                          "svc-missing": {"svc-calls": 1}})
+        assert results["svc-a"].eval is True
+        assert results["svc-missing"] is None
+
+
+class TestRateLimitedLogger:
+
+    def test_suppresses_repeated_messages(self, caplog):
+        """Test de que solo se emiten `burst` mensajes iguales por ventana"""
+        log = RateLimitedLogger(logging.getLogger("test_errors"), burst=2, interval=60)
+        with caplog.at_level(logging.WARNING, logger="test_errors"):
+            for i in range(10):
+                log.warning("Fallo %d", i)
+            log.warning("Otro fallo")
+        assert [r.getMessage() for r in caplog.records] == ["Fallo 0", "Fallo 1", "Otro fallo"]
+
+    def test_windows_per_key(self, caplog):
+        """Test de que cada clave tiene su propia ventana"""
+        log = RateLimitedLogger(logging.getLogger("test_errors"), burst=1, interval=60)
+        with caplog.at_level(logging.WARNING, logger="test_errors"):
+            for endpoint in ("GET /a", "GET /a", "GET /b"):
+                log.warning("Fallo en %s", endpoint, key=endpoint)
+        assert [r.getMessage() for r in caplog.records] == ["Fallo en GET /a", "Fallo en GET /b"]
+
+    def test_reports_suppressed_count(self, caplog):
+        """Test de que al abrir una ventana nueva se indica cuántos mensajes se suprimieron"""
+        log = RateLimitedLogger(logging.getLogger("test_errors"), burst=1, interval=0)
+        log._windows["Fallo %d"] = [0.0, 1, 4]
+        with caplog.at_level(logging.WARNING, logger="test_errors"):
+            log.warning("Fallo %d", 7)
+        assert caplog.records[0].getMessage() == "Fallo 7 (4 mensajes iguales suprimidos)"
+
+    def test_disabled_level_is_free(self, caplog):
+        """Test de que con el nivel deshabilitado no se registra ni se cuenta nada"""
+        log = RateLimitedLogger(logging.getLogger("test_errors"), burst=1)
+        with caplog.at_level(logging.ERROR, logger="test_errors"):
+            log.warning("Fallo")
+        assert not caplog.records
+        assert log._windows == {}
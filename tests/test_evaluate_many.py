@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app_SpacePyCl.routes.config import SpaceClient
+
+
+def build_app(batch_supported: bool, state: dict) -> web.Application:
+    async def evaluate_all(request):
+        state["batch_calls"] += 1
+        if not batch_supported:
+            return web.Response(status=405)
+        return web.json_response({
+            "svc-a": {"eval": True, "used": None, "limit": None, "error": None},
+            "svc-b": {"eval": False, "used": None, "limit": None, "error": None},
+        })
+
+    async def evaluate_one(request):
+        state["single_calls"] += 1
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        body = await request.json() if request.can_read_body else {}
+        return web.json_response({"eval": True, "used": body or None, "limit": None})
+
+    app = web.Application()
+    app.router.add_post("/api/v1/features/{user_id}", evaluate_all)
+    app.router.add_post("/api/v1/features/{user_id}/{feature_id}", evaluate_one)
+    return app
+
+
+@pytest_asyncio.fixture
+async def make_client():
+    servers, clients = [], []
+
+    async def _make(batch_supported: bool):
+        state = {"batch_calls": 0, "single_calls": 0, "in_flight": 0, "max_in_flight": 0}
+        server = TestServer(build_app(batch_supported, state))
+        await server.start_server()
+        client = SpaceClient(str(server.make_url("/")), "api-key")
+        servers.append(server)
+        clients.append(client)
+        return client, state
+
+    yield _make
+    for client in clients:
+        await client.close()
+    for server in servers:
+        await server.close()
+
+
+class TestEvaluateMany:
+
+    @pytest.mark.asyncio
+    async def test_evaluate_many_uses_batch_endpoint(self, make_client):
+        """Test de que varias features se evalúan en una única petición"""
+        client, state = await make_client(batch_supported=True)
+        results = await client.featureEvaluators.evaluate_many("user1", ["svc-a", "svc-b"])
+        assert results["svc-a"].eval is True
+        assert results["svc-b"].eval is False
+        assert state["batch_calls"] == 1
+        assert state["single_calls"] == 0
+
+    @pytest.mark.asyncio
+    async def test_evaluate_many_fallback_is_bounded(self, make_client):
+        """Test de la evaluación concurrente acotada cuando no hay endpoint en bloque"""
+        client, state = await make_client(batch_supported=False)
+        feature_ids = [f"svc-f{i}" for i in range(12)]
+        results = await client.featureEvaluators.evaluate_many("user1", feature_ids, max_concurrency=3)
+        assert list(results) == feature_ids
+        assert all(r.eval for r in results.values())
+        assert state["single_calls"] == 12
+        assert state["max_in_flight"] <= 3
+
+        await client.featureEvaluators.evaluate_many("user1", ["svc-x", "svc-y"])
+        assert state["batch_calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_evaluate_many_with_expected_consumption(self, make_client):
+        """Test de que las features con consumo esperado se evalúan individualmente"""
+        client, state = await make_client(batch_supported=True)
+        results = await client.featureEvaluators.evaluate_many(
+            "user1", ["svc-a", "svc-b", "svc-api"],
+            expected_consumption={"svc-api": {"svc-calls": 1}})
+        assert results["svc-api"].used == {"svc-calls": 1}
+        assert state["batch_calls"] == 1
+        assert state["single_calls"] == 1
@@ -0,0 +1,73 @@
+import pytest
+from app_SpacePyCl.models.feature_eval_result import FeatureEvaluationResult
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.utils.cache import EvaluationCache, EvaluationCacheOptions, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+
+    def test_entries_expire(self):
+        """Test de expiración de entradas por TTL"""
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        clock.now = 6
+        assert cache.get("a") is None
+        assert cache.hits == 1 and cache.misses == 1
+
+    def test_lru_eviction(self):
+        """Test de expulsión LRU al superar el tamaño máximo"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert "a" in cache and "c" in cache
+        assert "b" not in cache
+
+
+class TestEvaluationCache:
+
+    def test_per_feature_ttl_policies(self):
+        """Test de TTL por feature, con patrones y TTL 0 para no cachear"""
+        cache = EvaluationCache(EvaluationCacheOptions(
+            default_ttl=5, feature_ttls={"svc-live": 0, "svc-*": 60}))
+        assert cache.ttl_for("svc-live") == 0
+        assert cache.ttl_for("svc-other") == 60
+        assert cache.ttl_for("other-feature") == 5
+
+        cache.set("user1", "svc-live", "value")
+        assert cache.get("user1", "svc-live") is None
+
+    def test_invalidate_user(self):
+        """Test de invalidación de todas las entradas de un usuario"""
+        cache = EvaluationCache()
+        cache.set("user1", "svc-a", "a")
+        cache.set("user1", "svc-b", "b")
+        cache.set("user2", "svc-a", "c")
+        cache.invalidate_user("user1")
+        assert cache.get("user1", "svc-a") is None
+        assert cache.get("user2", "svc-a") == "c"
+        assert len(cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_evaluate_served_from_cache(self):
+        """Test de que evaluate() usa la caché salvo con consumo esperado"""
+        client = SpaceClient("http://localhost:5403", "api-key", evaluation_cache=EvaluationCacheOptions())
+        cached = FeatureEvaluationResult(eval=True)
+        client.featureEvaluators.cache.set("user1", "svc-a", cached)
+
+        assert await client.featureEvaluators.evaluate("user1", "svc-a") is cached
+
+        client._on_contract_changed("user1")
+        assert client.featureEvaluators.cache.get("user1", "svc-a") is None
+        await client.close()
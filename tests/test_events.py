@@ -0,0 +1,125 @@
+import asyncio
+import os
+import pytest
+import pytest_asyncio
+from websockets.asyncio.client import connect
+from app_SpacePyCl.models.feature_eval_result import FeatureEvaluationResult
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.testing.server import SpaceStandIn, StandInOptions
+from app_SpacePyCl.utils.cache import DocumentCacheOptions, EvaluationCacheOptions
+from app_SpacePyCl.utils.events import EventListenerOptions
+
+FAST_RECONNECT = EventListenerOptions(reconnect_base_delay=0.01, reconnect_max_delay=0.05)
+PRICING_PATH = os.path.join(os.path.dirname(__file__), "resources", "pricings", "TomatoMeter.yml")
+
+
+@pytest_asyncio.fixture
+async def stand_in():
+    """SPACE en memoria con el canal de eventos por socket.io."""
+    async with SpaceStandIn(StandInOptions(api_key="key", ping_interval=0.05, ping_timeout=0.5)) as server:
+        client = SpaceClient(server.url, "key",
+                             evaluation_cache=EvaluationCacheOptions(default_ttl=3600),
+                             document_cache=DocumentCacheOptions(ttl=3600))
+        yield client, server
+        await client.close()
+
+
+async def wait_for(predicate, timeout=1.0):
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("La condición no se cumplió a tiempo")
+
+
+class TestEventListener:
+
+    @pytest.mark.asyncio
+    async def test_events_invalidate_caches(self, stand_in):
+        """Test de que los eventos de pricing y contrato invalidan las cachés"""
+        client, server = stand_in
+        listener = client.start_event_listener(FAST_RECONNECT)
+        await listener.wait_connected(1)
+
+        evaluations = client.featureEvaluators.cache
+        documents = client.service_context.cache
+        result = FeatureEvaluationResult(eval=True)
+        evaluations.set("u1", "svc-a", result)
+        evaluations.set("u2", "svc-a", result)
+        documents.store(("service", "svc"), object(), None, None)
+        documents.store(("service", "other"), object(), None, None)
+
+        received = []
+        listener.on("CONTRACT_UPDATED", received.append)
+        await server.emit("CONTRACT_UPDATED", userId="u1")
+        await wait_for(lambda: received)
+        assert received[0].details == {"userId": "u1"}
+        assert evaluations.get("u1", "svc-a") is None
+        assert evaluations.get("u2", "svc-a") is result
+
+        await server.emit("PRICING_ARCHIVED", serviceName="svc", pricingVersion="1.0")
+        await wait_for(lambda: listener.received == 2)
+        assert documents.get(("service", "svc")) is None
+        assert documents.get(("service", "other")) is not None
+        assert evaluations.get("u2", "svc-a") is None
+
+    @pytest.mark.asyncio
+    async def test_changes_from_other_clients(self, stand_in):
+        """Test de que un cambio de pricing hecho por otro cliente llega como evento"""
+        client, server = stand_in
+        listener = client.start_event_listener(FAST_RECONNECT)
+        await listener.wait_connected(1)
+        codes = []
+        listener.on(None, lambda event: codes.append((event.code, event.details)))
+
+        other = SpaceClient(server.url, "key")
+        try:
+            service = await other.service_context.add_service(PRICING_PATH)
+        finally:
+            await other.close()
+        await wait_for(lambda: codes)
+        assert codes == [("PRICING_CREATED", {"serviceName": service.name,
+                                              "pricingVersion": next(iter(service.activePricings))})]
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_and_reconnection(self, stand_in):
+        """Test de respuesta a los pings de Engine.IO y de reconexión con descarte de la caché"""
+        client, server = stand_in
+        listener = client.start_event_listener(FAST_RECONNECT)
+        await listener.wait_connected(1)
+        await wait_for(lambda: server.pongs >= 2)
+        client.featureEvaluators.cache.set("u1", "svc-a", FeatureEvaluationResult(eval=True))
+
+        await server.disconnect_event_clients()
+        await wait_for(lambda: listener.connections == 2)
+        assert client.featureEvaluators.cache.get("u1", "svc-a") is None
+
+        # Un evento mal formado se ignora sin cortar la conexión
+        await server._broadcast("not json")
+        await server.emit("PRICING_CREATED", serviceName="svc")
+        await wait_for(lambda: listener.received == 1)
+        assert listener.connections == 2
+
+    @pytest.mark.asyncio
+    async def test_rejected_connections(self, stand_in):
+        """Test de que el canal exige la api key y un namespace válido"""
+        client, server = stand_in
+        client.api_key = "wrong"
+        listener = client.start_event_listener(FAST_RECONNECT)
+        with pytest.raises(asyncio.TimeoutError):
+            await listener.wait_connected(0.2)
+        await listener.close()
+
+        url = client.url.replace("http", "ws") + "/socket.io/?EIO=4&transport=websocket"
+        async with connect(url, additional_headers={"x-api-key": "key"}) as websocket:
+            assert (await websocket.recv()).startswith('0{"sid"')
+            await websocket.send("40/other,")
+            assert await websocket.recv() == '44/other,{"message": "Invalid namespace"}'
+
+    @pytest.mark.asyncio
+    async def test_close_stops_listener(self, stand_in):
+        client, server = stand_in
+        listener = client.start_event_listener(FAST_RECONNECT)
+        await listener.wait_connected(1)
+        await client.close()
+        assert client.events is None and not listener.connected.is_set()
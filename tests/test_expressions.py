@@ -0,0 +1,74 @@
+import json
+import os
+import pytest
+from app_SpacePyCl.models.service_context import Pricing
+from app_SpacePyCl.utils.expressions import MAX_EXPRESSION_DEPTH, ExpressionError, compile_expression
+from app_SpacePyCl.utils.pricing_index import PricingIndex
+
+PRICING_PATH = os.path.join(os.path.dirname(__file__), "resources", "pricings", "TomatoMeter.json")
+
+
+@pytest.fixture
+def index() -> PricingIndex:
+    with open(PRICING_PATH, encoding="utf-8") as f:
+        return PricingIndex(Pricing.model_validate(json.load(f)))
+
+
+class TestExpressions:
+
+    def test_pricing_expressions(self, index):
+        """Test de evaluación local de las expresiones del pricing según plan, add-ons y consumo"""
+        values = index.resolve("ADVANCED", {"extraTimers": 1})
+        assert index.evaluate("pomodoroTimer", values, {"maxPomodoroTimers": 15}) is True
+        assert index.evaluate("pomodoroTimer", values, {"maxPomodoroTimers": 16}) is False
+        assert index.evaluate("pomodoroTimer", values) is True
+        assert index.evaluate("darkMode", values) is True
+        assert index.evaluate("exportDataToJson", values) is False
+        assert index.evaluate("exportDataToJson", index.resolve("PREMIUM", {"exportAsJson": 1})) is True
+        assert index.evaluate("unknown", values) is None
+
+    def test_compiled_once_per_index(self, index):
+        """Test de que cada expresión se compila una vez y serverExpression cae en expression"""
+        compiled = index.expression("pomodoroTimer")
+        assert index.expression("pomodoroTimer") is compiled
+        assert index.expression("pomodoroTimer", server=True).source == compiled.source
+
+    def test_javascript_semantics(self, index):
+        """Test de operadores, precedencia e igualdad estricta al estilo de JavaScript"""
+        values = index.resolve("BASIC")
+        cases = {
+            "1 + 2 * 3 === 7 ? 'yes' : 'no'": "yes",
+            "!false && (2 > 1 || null)": True,
+            "null || 'default'": "default",
+            "true === 1": False,
+            "1 === 1.0 && 'a' !== \"b\"": True,
+            "-pricingContext.usageLimits.maxPomodoroTimers": -values.limit("maxPomodoroTimers"),
+            "pricingContext['features']['missing'] === undefined": True,
+            "subscriptionContext['missing'] <= 1": False,
+            "null <= 5 && null >= 0 && !(null < 0)": True,
+            "undefined <= 5 || undefined >= 5": False,
+            "null == undefined && null !== undefined": True,
+            "pricingContext.features.missing == null": True,
+            "pricingContext['features'][subscriptionContext.feature]": True,
+        }
+        for source, expected in cases.items():
+            assert compile_expression(source, index)(values, {"feature": "soundNotifications"}) == expected, source
+
+    def test_rejects_unsafe_or_invalid_expressions(self, index):
+        """Test de que solo se admiten los contextos de SPACE y la sintaxis soportada"""
+        for source in ["__import__('os').system('true')", "pricingContext.__class__ && open",
+                       "(1 + 2", "1 +", "a = 1", "pricingContext['features'] ; 1", "`x`"]:
+            with pytest.raises(ExpressionError):
+                compile_expression(source, index)
+        with pytest.raises(ExpressionError):
+            compile_expression("1 / 0")(index.defaults)
+
+    def test_nesting_is_bounded(self, index):
+        """Test de que el anidamiento excesivo es un ExpressionError y no un RecursionError"""
+        for source in ["(" * 400 + "1" + ")" * 400, "!" * 3000 + "true", "[" * 400,
+                       "true ? " * 400 + "1" + " : 0" * 400, "1" + " + 1" * 5000]:
+            with pytest.raises(ExpressionError):
+                compile_expression(source, index)
+        depth = MAX_EXPRESSION_DEPTH
+        assert compile_expression("(" * depth + "1" + ")" * depth)(index.defaults) == 1
+        assert compile_expression("!" * depth + "true")(index.defaults) is True
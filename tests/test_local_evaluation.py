@@ -0,0 +1,111 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+import pytest
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.utils.pricing_token import LocalEvaluationOptions, PricingTokenError, decode_pricing_token
+
+SECRET = "space-test-secret"
+
+
+def _b64(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+
+def make_token(payload: dict, secret: str = SECRET) -> str:
+    signing_input = f"{_b64({'alg': 'HS256', 'typ': 'JWT'})}.{_b64(payload)}"
+    signature = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{base64.urlsafe_b64encode(signature).rstrip(b'=').decode()}"
+
+
+class TestPricingToken:
+
+    def test_decode_valid_token(self):
+        """Test de decodificación de un token firmado correctamente"""
+        token = make_token({"sub": "user1", "exp": time.time() + 60, "features": {"svc-a": {"eval": True}}})
+        payload = decode_pricing_token(token, secret=SECRET)
+        assert payload["sub"] == "user1"
+
+    def test_decode_invalid_signature(self):
+        """Test de rechazo de un token con firma incorrecta"""
+        token = make_token({"exp": time.time() + 60}, secret="otro-secreto")
+        with pytest.raises(PricingTokenError):
+            decode_pricing_token(token, secret=SECRET)
+
+    def test_decode_expired_token(self):
+        """Test de rechazo de un token expirado"""
+        token = make_token({"exp": time.time() - 10})
+        with pytest.raises(PricingTokenError):
+            decode_pricing_token(token, secret=SECRET)
+
+    def test_decode_malformed_token(self):
+        with pytest.raises(PricingTokenError):
+            decode_pricing_token("no-es-un-jwt")
+
+    def test_signature_required(self, caplog):
+        """Test de que sin secret solo se acepta el token con un verify=False explícito"""
+        token = make_token({"exp": time.time() + 60}, secret="otro-secreto")
+        with pytest.raises(PricingTokenError):
+            decode_pricing_token(token)
+        assert decode_pricing_token(token, verify=False)["exp"] > time.time()
+        with pytest.raises(ValueError):
+            SpaceClient("http://localhost:5403", "key", local_evaluation=LocalEvaluationOptions())
+        client = SpaceClient("http://localhost:5403", "key", local_evaluation=LocalEvaluationOptions(verify=False))
+        assert client.featureEvaluators.local_evaluation.verify is False
+        assert "verify=False" in caplog.text
+
+
+class TestLocalEvaluation:
+
+    @pytest.fixture
+    def client(self):
+        return SpaceClient("http://localhost:5403", "api-key",
+                           local_evaluation=LocalEvaluationOptions(secret=SECRET))
+
+    @pytest.mark.asyncio
+    async def test_boolean_feature_evaluated_locally(self, client, monkeypatch):
+        """Test de que una feature booleana se resuelve sin llamar al endpoint de evaluación"""
+        calls = []
+        token = make_token({"exp": time.time() + 60, "features": {
+            "svc-basic": {"eval": True, "used": None, "limit": None}}})
+
+        async def fake_token(user_id):
+            calls.append(user_id)
+            return token
+        monkeypatch.setattr(client.featureEvaluators, "generate_user_pricing_token", fake_token)
+
+        for _ in range(3):
+            result = await client.featureEvaluators.evaluate("user1", "svc-basic")
+            assert result.eval is True
+        assert calls == ["user1"]
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_usage_limited_feature_falls_back_to_server(self, client, monkeypatch):
+        """Test de que las features con límites de uso se evalúan en el servidor"""
+        token = make_token({"exp": time.time() + 60, "features": {
+            "svc-api": {"eval": True, "used": {"svc-calls": 3}, "limit": {"svc-calls": 10}}}})
+
+        async def fake_token(user_id):
+            return token
+        monkeypatch.setattr(client.featureEvaluators, "generate_user_pricing_token", fake_token)
+
+        assert await client.featureEvaluators._evaluate_locally("user1", "svc-api") is None
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_contract_change_invalidates_token(self, client, monkeypatch):
+        """Test de que un cambio de contrato descarta el token local del usuario"""
+        token = make_token({"exp": time.time() + 60, "features": {"svc-basic": {"eval": False}}})
+
+        async def fake_token(user_id):
+            return token
+        monkeypatch.setattr(client.featureEvaluators, "generate_user_pricing_token", fake_token)
+
+        await client.featureEvaluators.evaluate("user1", "svc-basic")
+        assert "user1" in client.featureEvaluators._pricing_tokens
+        client._on_contract_changed("user1")
+        assert "user1" not in client.featureEvaluators._pricing_tokens
+        await client.close()
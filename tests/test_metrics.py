@@ -0,0 +1,144 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.utils.cache import EvaluationCacheOptions
+from app_SpacePyCl.utils.connection_options import PoolOptions
+from app_SpacePyCl.utils.circuit_breaker import CircuitBreakerOptions, CircuitOpenError
+from app_SpacePyCl.utils.errors import SpaceServerError
+from app_SpacePyCl.utils.metrics import (CompositeInstrumentation, InMemoryMetrics, LatencyHistogram,
+                                         OpenTelemetryInstrumentation, PrometheusInstrumentation)
+from app_SpacePyCl.utils.retry import RetryPolicy
+
+EVALUATE = "POST /features/{userId}/{featureId}"
+
+
+@pytest_asyncio.fixture
+async def metrics_server():
+    state = {"fail": 0, "delay": 0.0}
+
+    async def evaluate(request):
+        await asyncio.sleep(state["delay"])
+        if state["fail"]:
+            state["fail"] -= 1
+            return web.Response(status=503)
+        return web.json_response({"eval": True, "used": None, "limit": None})
+
+    app = web.Application()
+    app.router.add_post("/api/v1/features/{user_id}/{feature_id}", evaluate)
+    server = TestServer(app)
+    await server.start_server()
+    yield str(server.make_url("")), state
+    await server.close()
+
+
+class TestMetrics:
+
+    def test_histogram_percentiles(self):
+        histogram = LatencyHistogram((0.01, 0.1, 1.0))
+        for value in [0.005] * 90 + [0.05] * 9 + [0.5]:
+            histogram.observe(value)
+        assert histogram.count == 100
+        assert histogram.percentile(0.5) <= 0.01
+        assert 0.01 < histogram.percentile(0.95) <= 0.1
+        assert histogram.percentile(1.0) == 0.5
+
+    @pytest.mark.asyncio
+    async def test_requests_retries_and_cache(self, metrics_server):
+        """Test de latencias, reintentos y aciertos de caché por endpoint"""
+        url, state = metrics_server
+        metrics = InMemoryMetrics()
+        async with SpaceClient(url, "key", instrumentation=metrics,
+                               evaluation_cache=EvaluationCacheOptions(default_ttl=60),
+                               retry_policy=RetryPolicy(base_delay=0.001, max_delay=0.002)) as client:
+            state["fail"] = 1
+            await client.featureEvaluators.evaluate("u1", "svc-a")
+            await client.featureEvaluators.evaluate("u1", "svc-a")
+        snapshot = metrics.snapshot()
+        assert snapshot["endpoints"][EVALUATE]["count"] == 1
+        assert snapshot["endpoints"][EVALUATE]["retries"] == 1
+        assert snapshot["in_flight"] == 0
+        assert metrics.statuses == {(EVALUATE, 200): 1}
+        assert metrics.cache_hit_rate("evaluation") == 0.5
+
+    @pytest.mark.asyncio
+    async def test_breaker_events(self, metrics_server):
+        """Test de contadores del circuit breaker"""
+        url, state = metrics_server
+        metrics = InMemoryMetrics()
+        async with SpaceClient(url, "key", retry_policy=None, instrumentation=metrics,
+                               circuit_breaker=CircuitBreakerOptions(failure_threshold=1)) as client:
+            state["fail"] = 1
+            with pytest.raises(SpaceServerError):
+                await client.featureEvaluators.evaluate("u1", "svc-a")
+            with pytest.raises(CircuitOpenError):
+                await client.featureEvaluators.evaluate("u1", "svc-a")
+        assert metrics.breaker == {(EVALUATE, "opened"): 1, (EVALUATE, "rejected"): 1}
+        assert metrics.errors[EVALUATE] == 2
+
+    @pytest.mark.asyncio
+    async def test_pool_saturation(self, metrics_server):
+        """Test de las peticiones que esperan conexión con el pool lleno, también si se cancelan"""
+        url, state = metrics_server
+        state["delay"] = 0.05
+        metrics = InMemoryMetrics()
+        async with SpaceClient(url, "key", pool=PoolOptions(limit=1), coalesce_requests=False,
+                               instrumentation=metrics) as client:
+            await asyncio.gather(*(client.featureEvaluators.evaluate(f"u{i}", "svc-a") for i in range(3)))
+            pool = metrics.snapshot()["pool"]
+            assert pool["waiting"] == 0 and pool["waits"] == 2
+            assert pool["wait_max_ms"] >= 40
+
+            first = asyncio.ensure_future(client.featureEvaluators.evaluate("u1", "svc-a"))
+            queued = asyncio.ensure_future(client.featureEvaluators.evaluate("u2", "svc-a"))
+            await asyncio.sleep(0.01)
+            assert metrics.pool_waiting == 1
+            queued.cancel()
+            await asyncio.gather(first, queued, return_exceptions=True)
+            assert metrics.pool_waiting == 0 and metrics.pool_wait.count == 3
+
+    @pytest.mark.asyncio
+    async def test_pool_tracing_only_with_instrumentation(self, metrics_server):
+        """Test de que las trazas del pool solo se instalan al activar la instrumentación"""
+        url, _ = metrics_server
+        async with SpaceClient(url, "key") as client:
+            await client.featureEvaluators.evaluate("u1", "svc-a")
+            session = await client._get_session()
+            assert not session.trace_configs
+            metrics = InMemoryMetrics()
+            client.instrumentation = metrics
+            await client.featureEvaluators.evaluate("u1", "svc-a")
+            assert session.closed and (await client._get_session()).trace_configs
+            assert client._connector.closed is False
+
+    @pytest.mark.asyncio
+    async def test_prometheus_adapter(self, metrics_server):
+        prometheus_client = pytest.importorskip("prometheus_client")
+        url, _ = metrics_server
+        registry = prometheus_client.CollectorRegistry()
+        async with SpaceClient(url, "key", instrumentation=PrometheusInstrumentation(registry)) as client:
+            await client.featureEvaluators.evaluate("u1", "svc-a")
+        labels = {"endpoint": EVALUATE, "status": "200"}
+        assert registry.get_sample_value("space_client_request_duration_seconds_count", labels) == 1
+        assert registry.get_sample_value("space_client_requests_in_flight", {"endpoint": EVALUATE}) == 0
+
+    @pytest.mark.asyncio
+    async def test_opentelemetry_adapter(self, metrics_server):
+        pytest.importorskip("opentelemetry.sdk")
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+        url, _ = metrics_server
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        metrics = InMemoryMetrics()
+        instrumentation = CompositeInstrumentation(OpenTelemetryInstrumentation(tracer_provider=provider), metrics)
+        async with SpaceClient(url, "key", instrumentation=instrumentation) as client:
+            await client.featureEvaluators.evaluate("u1", "svc-a")
+        [span] = exporter.get_finished_spans()
+        assert span.name == f"SPACE {EVALUATE}"
+        assert span.attributes["http.response.status_code"] == 200
+        assert metrics.snapshot()["endpoints"][EVALUATE]["count"] == 1
@@ -0,0 +1,58 @@
+import json
+import os
+from app_SpacePyCl.models import Contract, FeatureError, Pricing, PricingReference, Service
+from app_SpacePyCl.utils.parser import parse_evaluation_result, parse_evaluation_results, parse_model
+
+RESOURCES = os.path.join(os.path.dirname(__file__), "resources", "pricings")
+
+CONTRACT = {
+    "userContact": {"userId": "user1", "username": "user_1"},
+    "billingPeriod": {"startDate": "2025-01-01T00:00:00Z", "endDate": "2025-02-01T00:00:00Z",
+                      "autoRenew": True, "renewalDays": 30},
+    "usageLevels": {"tomatometer": {"maxPomodoroTimers": {"consumed": 2, "resetTimeStamp": "2025-01-02T00:00:00Z"}}},
+    "contractedServices": {"tomatometer": "1.0.0"},
+    "subscriptionPlans": {"tomatometer": "ADVANCED"},
+    "subscriptionAddOns": {},
+    "history": [],
+}
+
+
+def read_pricing() -> bytes:
+    with open(os.path.join(RESOURCES, "TomatoMeter.json"), "rb") as f:
+        return f.read()
+
+
+class TestModelsParsing:
+
+    def test_parse_pricing(self):
+        """Test de decodificación de un pricing de SPACE en el modelo Pricing"""
+        pricing = parse_model(Pricing, read_pricing())
+        assert pricing.version == "1.0.0"
+        assert pricing.plans["PREMIUM"].usageLimits["maxPomodoroTimers"] == 15
+        assert pricing.addons["extraTimers"].usageLimitsExtensions["maxPomodoroTimers"] == 5
+
+    def test_parse_service_with_pricing_references(self):
+        """Test de un servicio cuyos pricings vienen como referencias"""
+        raw = json.dumps({"name": "TomatoMeter", "activePricings": {"1.0.0": {"id": "abc"}},
+                          "archivedPricings": {}})
+        service = parse_model(Service, raw)
+        assert isinstance(service.activePricings["1.0.0"], PricingReference)
+
+    def test_parse_contract(self):
+        """Test de decodificación de un contrato"""
+        contract = parse_model(Contract, json.dumps(CONTRACT))
+        assert contract.usageLevels["tomatometer"]["maxPomodoroTimers"].consumed == 2
+
+    def test_parse_evaluation_error(self):
+        """Test de decodificación de una evaluación con error"""
+        raw = b'{"eval": false, "used": null, "limit": null, "error": {"code": "FLAG_NOT_FOUND", "message": "x"}}'
+        result = parse_evaluation_result(raw)
+        assert isinstance(result.error, FeatureError)
+        assert result.error.code == "FLAG_NOT_FOUND"
+        assert result.eval is False
+
+    def test_parse_batch_evaluation(self):
+        """Test de la evaluación en bloque con resultados completos o booleanos"""
+        results = parse_evaluation_results(b'{"svc-a": true, "svc-b": {"eval": false}}')
+        assert results["svc-a"].eval is True
+        assert results["svc-b"].eval is False
@@ -0,0 +1,112 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app_SpacePyCl.models.contracts import Contract
+from app_SpacePyCl.models.service_context import Service
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.utils.pagination import paginate
+
+
+def contract(i: int) -> dict:
+    return {
+        "userContact": {"userId": f"u{i}", "username": "alice" if i % 2 else "bob"},
+        "billingPeriod": {"startDate": "2025-01-01T00:00:00Z", "endDate": "2025-02-01T00:00:00Z",
+                          "autoRenew": True, "renewalDays": 30},
+        "contractedServices": {"svc": "1.0"},
+        "subscriptionPlans": {"svc": "BASIC"},
+    }
+
+
+@pytest_asyncio.fixture
+async def listing_server():
+    contracts = [contract(i) for i in range(25)]
+    services = [{"name": f"svc{i}"} for i in range(3)]
+    requests = []
+
+    def page(request, items):
+        requests.append(dict(request.query))
+        offset, limit = int(request.query["offset"]), int(request.query["limit"])
+        return web.json_response(items[offset:offset + limit])
+
+    async def list_contracts(request):
+        await asyncio.sleep(0.01)
+        items = contracts
+        if "username" in request.query:
+            items = [c for c in items if c["userContact"]["username"] == request.query["username"]]
+        return page(request, items)
+
+    async def list_services(request):
+        return page(request, services)
+
+    app = web.Application()
+    app.router.add_get("/api/v1/contracts", list_contracts)
+    app.router.add_get("/api/v1/services", list_services)
+    server = TestServer(app)
+    await server.start_server()
+    client = SpaceClient(str(server.make_url("")), "key")
+    yield client, requests
+    await client.close()
+    await server.close()
+
+
+class TestPagination:
+
+    @pytest.mark.asyncio
+    async def test_iter_contracts(self, listing_server):
+        """Test de paginación de contratos con modelos tipados"""
+        client, requests = listing_server
+        contracts = [c async for c in client.contracts.iter_contracts(page_size=10)]
+        assert [c.userContact.userId for c in contracts] == [f"u{i}" for i in range(25)]
+        assert all(isinstance(c, Contract) for c in contracts)
+        assert [r["offset"] for r in requests] == ["0", "10", "20"]
+
+    @pytest.mark.asyncio
+    async def test_filters_and_max_items(self, listing_server):
+        """Test de filtros y de límite de elementos"""
+        client, requests = listing_server
+        alices = [c async for c in client.contracts.iter_contracts(page_size=5, username="alice", email=None)]
+        assert len(alices) == 12 and requests[0] == {"username": "alice", "limit": "5", "offset": "0"}
+        requests.clear()
+        first = [c async for c in client.contracts.iter_contracts(page_size=10, max_items=3)]
+        assert len(first) == 3 and len(requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_iter_services(self, listing_server):
+        client, _ = listing_server
+        services = [s async for s in client.service_context.iter_services(page_size=2)]
+        assert [s.name for s in services] == ["svc0", "svc1", "svc2"]
+        assert isinstance(services[0], Service)
+
+    @pytest.mark.asyncio
+    async def test_prefetch_overlaps_pages(self):
+        """Test de que la página siguiente se pide mientras se consume la actual"""
+        events = []
+
+        async def fetch_page(offset, limit):
+            events.append(("fetch", offset))
+            await asyncio.sleep(0)
+            return list(range(offset, min(offset + limit, 6)))
+
+        async for item in paginate(fetch_page, page_size=3):
+            events.append(("item", item))
+            await asyncio.sleep(0.001)
+        assert events.index(("fetch", 3)) < events.index(("item", 1))
+        # Una página completa no indica el final: hace falta una petición más, que vuelve vacía
+        assert [e for e in events if e[0] == "fetch"] == [("fetch", 0), ("fetch", 3), ("fetch", 6)]
+
+    @pytest.mark.asyncio
+    async def test_early_exit_cancels_prefetch(self):
+        started = asyncio.Event()
+
+        async def fetch_page(offset, limit):
+            if offset:
+                started.set()
+                await asyncio.sleep(10)
+            return list(range(limit))
+
+        pages = paginate(fetch_page, page_size=2)
+        assert await pages.__anext__() == 0
+        await started.wait()
+        await pages.aclose()
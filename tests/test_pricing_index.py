@@ -0,0 +1,75 @@
+import json
+import os
+import pytest
+from app_SpacePyCl.models.service_context import Pricing
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.testing import SpaceStandIn, StandInOptions
+from app_SpacePyCl.utils.pricing_index import PricingIndex, PricingIndexCache
+
+PRICING_PATH = os.path.join(os.path.dirname(__file__), "resources", "pricings", "TomatoMeter.json")
+YAML_PRICING_PATH = os.path.join(os.path.dirname(__file__), "resources", "pricings", "TomatoMeter.yml")
+PRICING_ENDPOINT = "GET /services/{serviceName}/pricings/{pricingVersion}"
+
+
+def load_pricing() -> Pricing:
+    with open(PRICING_PATH, encoding="utf-8") as f:
+        return Pricing.model_validate(json.load(f))
+
+
+class TestPricingIndex:
+
+    def test_plans_and_addons(self):
+        """Test de los valores efectivos de un plan con y sin add-ons"""
+        index = PricingIndex(load_pricing())
+        advanced = index.resolve("advanced")
+        assert advanced.limit("maxPomodoroTimers") == 10
+        assert advanced.feature("exportDataToJson") is False
+
+        extended = index.resolve("ADVANCED", {"extraTimers": 2, "exportAsJson": 1})
+        assert extended.limit("maxPomodoroTimers") == 20
+        assert extended.feature("exportDataToJson") is True
+        assert extended.limit_values() == {"maxPomodoroTimers": 20}
+        assert index.linked_limits == {"pomodoroTimer": ("maxPomodoroTimers",)}
+
+    def test_defaults_and_unknown_names(self):
+        """Test de que un plan desconocido usa los valores por defecto y los nombres ausentes dan None"""
+        index = PricingIndex(load_pricing())
+        assert index.resolve(None) is index.defaults
+        assert index.resolve("enterprise") is index.defaults
+        assert index.resolve("BASIC").feature("unknown") is None
+        assert index.resolve("BASIC", {"unknown": 3}).features == index.resolve("BASIC").features
+
+    def test_combinations_are_memoized(self):
+        """Test de que cada combinación de plan y add-ons se calcula una sola vez y de forma acotada"""
+        index = PricingIndex(load_pricing(), max_combinations=2)
+        first = index.resolve("ADVANCED", {"extraTimers": 1, "exportAsJson": 1})
+        assert index.resolve("advanced", {"exportAsJson": 1, "extraTimers": 1}) is first
+        index.resolve("ADVANCED", {"extraTimers": 2})
+        index.resolve("ADVANCED", {"extraTimers": 3})
+        assert index.resolve("ADVANCED", {"extraTimers": 1, "exportAsJson": 1}) is not first
+
+    def test_cache_rebuilds_on_new_pricing(self):
+        """Test de que la caché reutiliza el índice por versión y lo invalida por servicio"""
+        cache = PricingIndexCache()
+        pricing = load_pricing()
+        index = cache.build("TomatoMeter", pricing)
+        assert cache.build("tomatometer", pricing) is index and cache.get("TOMATOMETER", "1.0.0") is index
+        assert cache.build("tomatometer", pricing.model_copy(update={"id": "other"})) is not index
+        cache.invalidate_service("TomatoMeter")
+        assert cache.get("tomatometer", "1.0.0") is None and cache.builds == 2
+
+    @pytest.mark.asyncio
+    async def test_service_context_builds_once_per_version(self):
+        """Test de que el índice se descarga y compila una vez por versión hasta que se invalida"""
+        async with SpaceStandIn(StandInOptions(seed=1)) as server:
+            async with SpaceClient(server.url, "api-key", retry_policy=None) as client:
+                await client.service_context.add_service(YAML_PRICING_PATH)
+                server.reset_stats()
+                service_context = client.service_context
+                index = await service_context.get_pricing_index("TomatoMeter", "1.0.0")
+                assert await service_context.get_pricing_index("tomatometer", "1.0.0") is index
+                assert server.stats().endpoints[PRICING_ENDPOINT].requests == 1
+
+                service_context.invalidate_service("TomatoMeter")
+                assert await service_context.get_pricing_index("TomatoMeter", "1.0.0") is not index
+                assert server.stats().endpoints[PRICING_ENDPOINT].requests == 2
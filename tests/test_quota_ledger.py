@@ -0,0 +1,206 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app_SpacePyCl.models.contracts import Contract
+from app_SpacePyCl.models.feature_eval_result import FeatureEvaluationResult
+from app_SpacePyCl.models.service_context import Period, PeriodUnit, Pricing
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.utils.quota import QuotaLedger, QuotaLedgerOptions, add_period
+from app_SpacePyCl.utils.usage_reporter import UsageReporterOptions
+
+PRICING_PATH = os.path.join(os.path.dirname(__file__), "resources", "pricings", "TomatoMeter.json")
+FEATURE = "tomatometer-pomodoroTimer"
+LIMIT = "tomatometer-maxPomodoroTimers"
+
+
+def load_pricing() -> dict:
+    with open(PRICING_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def make_contract(consumed=0, plan="ADVANCED", addons=None, reset=None) -> dict:
+    reset = reset or datetime.now(timezone.utc) + timedelta(hours=1)
+    return {
+        "userContact": {"userId": "u1", "username": "user_u1"},
+        "billingPeriod": {"startDate": "2025-01-01T00:00:00Z", "endDate": "2025-02-01T00:00:00Z",
+                          "autoRenew": True, "renewalDays": 30},
+        "usageLevels": {"tomatometer": {"maxPomodoroTimers": {
+            "consumed": consumed, "resetTimeStamp": reset.isoformat()}}},
+        "contractedServices": {"tomatometer": "1.0.0"},
+        "subscriptionPlans": {"tomatometer": plan},
+        "subscriptionAddOns": {"tomatometer": addons or {}},
+    }
+
+
+def renamed_contract(service: str, **contract) -> dict:
+    """Contrato de make_contract con el servicio tomatometer renombrado a `service`."""
+    return json.loads(json.dumps(make_contract(**contract)).replace('"tomatometer"', json.dumps(service)))
+
+
+def seeded_ledger(options=None, **contract) -> QuotaLedger:
+    ledger = QuotaLedger(options)
+    ledger.seed(Contract.model_validate(make_contract(**contract)),
+                {"tomatometer": Pricing.model_validate(load_pricing())})
+    return ledger
+
+
+class TestQuotaLedger:
+
+    def test_limit_includes_plan_and_addons(self):
+        """Test de que el límite combina el plan y las extensiones de los add-ons"""
+        ledger = seeded_ledger(addons={"extraTimers": 2})
+        entry = ledger.get("u1").limits[("tomatometer", "maxPomodoroTimers")]
+        assert entry.limit == 20
+
+    def test_grants_within_limit_and_over_grant(self):
+        """Test de que se concede localmente solo dentro del límite y del exceso permitido"""
+        ledger = seeded_ledger(QuotaLedgerOptions(max_over_grant=3), consumed=8)
+        result = ledger.try_consume("u1", FEATURE, {LIMIT: 1})
+        assert result.eval is True and result.used == {LIMIT: 9} and result.limit == {LIMIT: 10}
+        assert ledger.try_consume("u1", FEATURE, {LIMIT: 2}) is None
+        ledger.confirm("u1", {"tomatometer": {"maxPomodoroTimers": 1}})
+        assert ledger.try_consume("u1", FEATURE, {LIMIT: 1}).used == {LIMIT: 10}
+        assert ledger.try_consume("u1", FEATURE, {LIMIT: 1}) is None
+
+    def test_renewable_limit_resets(self):
+        """Test de que un límite renovable se reinicia al vencer su periodo"""
+        reset = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        ledger = seeded_ledger(consumed=10, reset=reset)
+        result = ledger.try_consume("u1", FEATURE, {LIMIT: 1}, now=reset + timedelta(days=2, hours=1))
+        assert result.used == {LIMIT: 1}
+        entry = ledger.get("u1").limits[("tomatometer", "maxPomodoroTimers")]
+        assert entry.reset_at == reset + timedelta(days=3)
+
+    def test_add_period_months(self):
+        assert add_period(datetime(2025, 1, 31), Period(value=1, unit=PeriodUnit.MONTH)) == datetime(2025, 2, 28)
+        assert add_period(datetime(2024, 2, 29), Period(value=1, unit=PeriodUnit.YEAR)) == datetime(2025, 2, 28)
+
+    def test_revert_and_unknown_features(self):
+        """Test de reversión local y de features que debe resolver SPACE"""
+        ledger = seeded_ledger(consumed=2)
+        ledger.try_consume("u1", FEATURE, {LIMIT: 3})
+        assert ledger.revert("u1", FEATURE) == {("tomatometer", "maxPomodoroTimers"): 3}
+        assert ledger.get("u1").limits[("tomatometer", "maxPomodoroTimers")].consumed == 2
+        assert ledger.revert("u1", FEATURE) is None
+        assert ledger.try_consume("u1", "tomatometer-darkMode", {LIMIT: 1}) is None
+        assert ledger.try_consume("u2", FEATURE, {LIMIT: 1}) is None
+
+    def test_revert_after_confirmation(self):
+        """Test de que revertir una concesión ya confirmada no deja consumo negativo ni pendiente"""
+        ledger = seeded_ledger()
+        ledger.try_consume("u1", FEATURE, {LIMIT: 3})
+        ledger.confirm("u1", {"tomatometer": {"maxPomodoroTimers": 3}})
+        ledger.observe("u1", FeatureEvaluationResult(eval=True, used={LIMIT: 1}))
+        ledger.revert("u1", FEATURE)
+        entry = ledger.get("u1").limits[("tomatometer", "maxPomodoroTimers")]
+        assert entry.consumed == 0 and entry.unconfirmed == -3
+        # La reversión se envía a SPACE como -3; al confirmarse no queda nada pendiente
+        ledger.confirm("u1", {"tomatometer": {"maxPomodoroTimers": -3}})
+        ledger.seed(Contract.model_validate(make_contract(consumed=0)),
+                    {"tomatometer": Pricing.model_validate(load_pricing())})
+        entry = ledger.get("u1").limits[("tomatometer", "maxPomodoroTimers")]
+        assert entry.consumed == 0 and entry.unconfirmed == 0
+
+    def test_hyphenated_service_names(self):
+        """Test de servicios con guiones en el nombre"""
+        contract = renamed_contract("tomato-meter", consumed=2)
+        ledger = QuotaLedger()
+        ledger.seed(Contract.model_validate(contract), {"tomato-meter": Pricing.model_validate(load_pricing())})
+        limit = "tomato-meter-maxPomodoroTimers"
+        result = ledger.try_consume("u1", "tomato-meter-pomodoroTimer", {limit: 1})
+        assert result.used == {limit: 3}
+        ledger.observe("u1", FeatureEvaluationResult(eval=True, used={limit: 5}))
+        assert ledger.get("u1").limits[("tomato-meter", "maxPomodoroTimers")].consumed == 6
+
+
+@pytest_asyncio.fixture
+async def quota_server():
+    state = {"contract_gets": 0, "evaluations": 0, "puts": [], "service": "tomatometer"}
+
+    async def get_contract(request):
+        state["contract_gets"] += 1
+        return web.json_response(renamed_contract(state["service"], consumed=1))
+
+    async def get_pricing(request):
+        return web.json_response(load_pricing())
+
+    async def put_usage(request):
+        state["puts"].append(await request.json())
+        return web.json_response(renamed_contract(state["service"], consumed=1))
+
+    async def evaluate(request):
+        state["evaluations"] += 1
+        return web.json_response({"eval": True, "used": {LIMIT: 10}, "limit": {LIMIT: 10}})
+
+    app = web.Application()
+    app.router.add_get("/api/v1/contracts/{user_id}", get_contract)
+    app.router.add_get("/api/v1/services/{service}/pricings/{version}", get_pricing)
+    app.router.add_put("/api/v1/contracts/{user_id}/usageLevels", put_usage)
+    app.router.add_post("/api/v1/features/{user_id}/{feature_id}", evaluate)
+    server = TestServer(app)
+    await server.start_server()
+    client = SpaceClient(str(server.make_url("")), "key")
+    yield client, state
+    await client.close()
+    await server.close()
+
+
+class TestQuotaLedgerEvaluation:
+
+    @pytest.mark.asyncio
+    async def test_consumption_is_granted_locally(self, quota_server):
+        """Test de que el consumo se concede sin ir a SPACE y se envía en segundo plano"""
+        client, state = quota_server
+        reporter = client.contracts.create_usage_reporter(UsageReporterOptions(flush_interval=60))
+        client.featureEvaluators.enable_quota_ledger(QuotaLedgerOptions(max_over_grant=5), reporter)
+        for _ in range(3):
+            result = await client.featureEvaluators.evaluate("u1", FEATURE, {LIMIT: 1})
+            assert result.eval is True
+        assert result.used == {LIMIT: 4}
+        assert await client.featureEvaluators.revert_evaluation("u1", FEATURE) is True
+        assert state["evaluations"] == 0 and state["contract_gets"] == 1
+
+        await reporter.flush()
+        assert state["puts"] == [{"tomatometer": {"maxPomodoroTimers": 2}}]
+        assert client.featureEvaluators.quota.get("u1").limits[("tomatometer", "maxPomodoroTimers")].unconfirmed == 0
+
+    @pytest.mark.asyncio
+    async def test_hyphenated_service_is_reported(self, quota_server):
+        """Test de que el consumo concedido de un servicio con guiones se envía a ese servicio"""
+        client, state = quota_server
+        state["service"] = "tomato-meter"
+        reporter = client.contracts.create_usage_reporter(UsageReporterOptions(flush_interval=60))
+        client.featureEvaluators.enable_quota_ledger(QuotaLedgerOptions(max_over_grant=5), reporter)
+        result = await client.featureEvaluators.evaluate(
+            "u1", "tomato-meter-pomodoroTimer", {"tomato-meter-maxPomodoroTimers": 2})
+        assert result.eval is True and state["evaluations"] == 0
+
+        await reporter.flush()
+        assert state["puts"] == [{"tomato-meter": {"maxPomodoroTimers": 2}}]
+        assert client.featureEvaluators.quota.get("u1").limits[("tomato-meter", "maxPomodoroTimers")].unconfirmed == 0
+
+    @pytest.mark.asyncio
+    async def test_direct_usage_update_reseeds(self, quota_server):
+        """Test de que un cambio de consumo hecho fuera del ledger vuelve a sembrar la cuota"""
+        client, state = quota_server
+        client.featureEvaluators.enable_quota_ledger()
+        await client.featureEvaluators.evaluate("u1", FEATURE, {LIMIT: 1})
+        await client.contracts.update_usage_levels("u1", {"tomatometer": {"maxPomodoroTimers": 5}})
+        assert client.featureEvaluators.quota.get("u1") is None
+        await client.featureEvaluators.evaluate("u1", FEATURE, {LIMIT: 1})
+        assert state["contract_gets"] == 2
+
+    @pytest.mark.asyncio
+    async def test_over_grant_bound_goes_to_server(self, quota_server):
+        """Test de que al agotar el exceso permitido se evalúa en SPACE"""
+        client, state = quota_server
+        client.featureEvaluators.enable_quota_ledger(QuotaLedgerOptions(max_over_grant=1))
+        await client.featureEvaluators.evaluate("u1", FEATURE, {LIMIT: 1})
+        result = await client.featureEvaluators.evaluate("u1", FEATURE, {LIMIT: 1})
+        assert state["evaluations"] == 1
+        assert result.used == {LIMIT: 10}
+        assert client.featureEvaluators.quota.get("u1").limits[("tomatometer", "maxPomodoroTimers")].consumed == 11
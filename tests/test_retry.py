@@ -0,0 +1,114 @@
+import asyncio
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.utils.errors import SpaceServerError
+from app_SpacePyCl.utils.retry import HedgePolicy, RetryBudget, RetryPolicy, parse_retry_after
+
+FAST_RETRIES = RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.01)
+
+
+@pytest_asyncio.fixture
+async def flaky_server():
+    state = {"failures": 2, "calls": 0, "retry_after": None, "slow_first": 0.0}
+
+    async def handler(request):
+        state["calls"] += 1
+        if state["slow_first"] and state["calls"] == 1:
+            await asyncio.sleep(state["slow_first"])
+        if state["calls"] <= state["failures"]:
+            headers = {"Retry-After": state["retry_after"]} if state["retry_after"] else None
+            return web.Response(status=503, headers=headers)
+        return web.json_response({"eval": True, "used": None, "limit": None})
+
+    app = web.Application()
+    app.router.add_post("/api/v1/features/{user_id}/{feature_id}", handler)
+    server = TestServer(app)
+    await server.start_server()
+    yield server, state
+    await server.close()
+
+
+class TestRetryPolicy:
+
+    def test_backoff_is_bounded(self):
+        """Test de que el backoff crece exponencialmente hasta max_delay"""
+        policy = RetryPolicy(base_delay=0.1, max_delay=0.5, jitter=False)
+        assert [policy.backoff(n) for n in (1, 2, 3, 4)] == [0.1, 0.2, 0.4, 0.5]
+        jittered = RetryPolicy(base_delay=0.1, max_delay=0.5)
+        assert all(0 <= jittered.backoff(3) <= 0.4 for _ in range(50))
+
+    def test_retry_budget(self):
+        """Test de que el presupuesto limita los reintentos"""
+        budget = RetryBudget(ratio=0.5, reserve=1)
+        assert budget.try_spend()
+        assert not budget.try_spend()
+        budget.record_request()
+        budget.record_request()
+        assert budget.try_spend()
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412470) == 10.0
+        assert parse_retry_after("no-es-una-fecha") is None
+
+
+class TestRetries:
+
+    @pytest.mark.asyncio
+    async def test_idempotent_read_is_retried(self, flaky_server):
+        """Test de que una evaluación sin consumo se reintenta ante 503"""
+        server, state = flaky_server
+        client = SpaceClient(str(server.make_url("/")), "api-key", retry_policy=FAST_RETRIES)
+        try:
+            result = await client.featureEvaluators.evaluate("user1", "svc-a")
+            assert result.eval is True
+            assert state["calls"] == 3
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_consumption_is_not_retried(self, flaky_server):
+        """Test de que una evaluación con consumo esperado no se reintenta"""
+        server, state = flaky_server
+        client = SpaceClient(str(server.make_url("/")), "api-key", retry_policy=FAST_RETRIES)
+        try:
+            with pytest.raises(SpaceServerError):
+                await client.featureEvaluators.evaluate("user1", "svc-a", {"svc-calls": 1})
+            assert state["calls"] == 1
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_long_retry_after_is_not_waited(self, flaky_server):
+        """Test de que no se reintenta si Retry-After supera el máximo configurado"""
+        server, state = flaky_server
+        state["retry_after"] = "120"
+        client = SpaceClient(str(server.make_url("/")), "api-key", retry_policy=FAST_RETRIES)
+        try:
+            response = client._request("POST", f"{client.http_url}/features/u/f", idempotent=True)
+            with pytest.raises(aiohttp.ClientResponseError) as e:
+                await response
+            assert e.value.status == 503
+            assert state["calls"] == 1
+        finally:
+            await client.close()
+
+    @pytest.mark.asyncio
+    async def test_hedged_request_beats_slow_request(self, flaky_server):
+        """Test de que la petición de cobertura responde antes que la primera, lenta"""
+        server, state = flaky_server
+        state.update(failures=0, slow_first=1.0)
+        client = SpaceClient(str(server.make_url("/")), "api-key",
+                             retry_policy=None, hedge_policy=HedgePolicy(delay=0.02))
+        try:
+            started = asyncio.get_running_loop().time()
+            result = await client.featureEvaluators.evaluate("user1", "svc-a")
+            assert result.eval is True
+            assert asyncio.get_running_loop().time() - started < 0.5
+            assert state["calls"] == 2
+        finally:
+            await client.close()
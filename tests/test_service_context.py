@@ -31,7 +31,7 @@ features:
             service = await space_client.service_context.get_service(service_name)
             
             assert service is not None
-            assert service["name"] == service_name
+            assert service.name == service_name
             
         finally:
             try:
@@ -75,7 +75,7 @@ features:
         try:
             result = await space_client.service_context.add_service(temp_path)
             assert result is not None
-            assert result["name"] == service_name
+            assert result.name == service_name
         finally:
             try:
                 os.unlink(temp_path)
@@ -120,8 +120,8 @@ features:
             pricing = await space_client.service_context.get_pricing(service_name,"1.0.0")
             
             assert pricing is not None
-            assert pricing["currency"] == "USD"
-            assert "basic" in pricing["features"]
+            assert pricing.currency == "USD"
+            assert "basic" in pricing.features
             
         finally:
             try:
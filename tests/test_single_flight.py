@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from app_SpacePyCl.utils.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test de que las llamadas concurrentes con la misma clave se ejecutan una sola vez"""
+        single_flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"name": "service"}
+
+        results = await asyncio.gather(*(single_flight.do("key", fetch) for _ in range(20)))
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        assert len(single_flight) == 0
+
+        await single_flight.do("key", fetch)
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_are_propagated_to_all_callers(self):
+        """Test de que un error se propaga a todas las llamadas que esperaban"""
+        single_flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(*(single_flight.do("key", failing) for _ in range(5)),
+                                       return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Test de que cancelar a quien inició la llamada no afecta al resto"""
+        single_flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return 42
+
+        leader = asyncio.create_task(single_flight.do("key", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(single_flight.do("key", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == 42
@@ -0,0 +1,142 @@
+import time
+from datetime import datetime
+import pytest
+import pytest_asyncio
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.testing import SpaceStandIn, StandInOptions
+from app_SpacePyCl.testing.state import _add_period
+from app_SpacePyCl.utils.cache import DocumentCacheOptions
+from app_SpacePyCl.utils.errors import SpaceAuthenticationError, SpaceNotFoundError, SpaceServerError
+from app_SpacePyCl.utils.pricing_token import LocalEvaluationOptions
+
+PRICING = "tests/resources/pricings/TomatoMeter.yml"
+TIMER = "tomatometer-pomodoroTimer"
+TIMERS_LIMIT = "tomatometer-maxPomodoroTimers"
+
+
+def contract(user_id: str, plan: str = "ADVANCED", addons: dict = None) -> dict:
+    return {
+        "userContact": {"userId": user_id, "username": f"user_{user_id}"},
+        "billingPeriod": {"autoRenew": True, "renewalDays": 30},
+        "contractedServices": {"TomatoMeter": "1.0.0"},
+        "subscriptionPlans": {"TomatoMeter": plan},
+        "subscriptionAddOns": {"TomatoMeter": addons or {}},
+    }
+
+
+@pytest_asyncio.fixture
+async def stand_in():
+    async with SpaceStandIn(StandInOptions(seed=1)) as server:
+        async with SpaceClient(server.url, "api-key", retry_policy=None) as client:
+            await client.service_context.add_service(PRICING)
+            await client.contracts.add_contract(contract("u1", addons={"extraTimers": 1}))
+            server.reset_stats()
+            yield server, client
+
+
+class TestSpaceStandIn:
+
+    @pytest.mark.asyncio
+    async def test_usage_limits_and_revert(self, stand_in):
+        """Test de que el consumo se limita según plan y add-ons, y de que se puede revertir"""
+        _, client = stand_in
+        evaluator = client.featureEvaluators
+        result = await evaluator.evaluate("u1", TIMER, {TIMERS_LIMIT: 10})
+        assert result.eval is True
+        assert result.used == {TIMERS_LIMIT: 10}
+        assert result.limit == {TIMERS_LIMIT: 15}
+        assert (await evaluator.evaluate("u1", TIMER, {TIMERS_LIMIT: 6})).eval is False
+
+        await evaluator.revert_evaluation("u1", TIMER, revert_to_latest=True)
+        updated = await client.contracts.update_usage_levels("u1", {"TomatoMeter": {"maxPomodoroTimers": 2}})
+        assert updated.usageLevels["tomatometer"]["maxPomodoroTimers"].consumed == 2
+
+        missing = await evaluator.evaluate("u1", "tomatometer-unknown")
+        assert missing.eval is False and missing.error.code == "FLAG_NOT_FOUND"
+
+    @pytest.mark.asyncio
+    async def test_pricing_token_is_signed(self, stand_in):
+        """Test de evaluación local con el pricing token firmado por el stand-in"""
+        server, client = stand_in
+        client.featureEvaluators.local_evaluation = LocalEvaluationOptions(secret=server.options.token_secret)
+        assert (await client.featureEvaluators.evaluate("u1", "tomatometer-darkMode")).eval is True
+        assert (await client.featureEvaluators.evaluate("u1", "tomatometer-exportDataToJson")).eval is False
+        assert server.stats().endpoints["POST /features/{userId}/pricing-token"].requests == 1
+        assert "POST /features/{userId}/{featureId}" not in server.stats().endpoints
+
+    @pytest.mark.asyncio
+    async def test_archive_moves_contracts_to_fallback(self, stand_in):
+        """Test de que archivar un pricing pasa sus contratos a la suscripción de respaldo"""
+        _, client = stand_in
+        with open(PRICING) as f:
+            await client.service_context.add_pricing("TomatoMeter", service_file=f.read().replace(
+                'version: "1.0.0"', 'version: "2.0.0"').encode(), filename="TomatoMeter.yml")
+        service = await client.service_context.change_pricing_availability(
+            "TomatoMeter", "1.0.0", "ARCHIVED", {"subscriptionPlan": "BASIC", "subscriptionAddOns": {}})
+        assert list(service.activePricings) == ["2.0.0"]
+        moved = await client.contracts.get_user_id_contract("u1")
+        assert moved.contractedServices == {"TomatoMeter": "2.0.0"}
+        assert moved.subscriptionPlans == {"TomatoMeter": "BASIC"}
+        assert len(moved.history) == 1
+
+    @pytest.mark.asyncio
+    async def test_document_revalidation(self, stand_in):
+        """Test de que el stand-in responde 304 a las revalidaciones por ETag"""
+        server, client = stand_in
+        client.service_context.enable_cache(DocumentCacheOptions(ttl=0))
+        first = await client.service_context.get_pricing("TomatoMeter", "1.0.0")
+        second = await client.service_context.get_pricing("TomatoMeter", "1.0.0")
+        assert second is first
+        assert server.stats().endpoints["GET /services/{serviceName}/pricings/{pricingVersion}"].requests == 2
+
+    @pytest.mark.asyncio
+    async def test_error_injection(self, stand_in):
+        """Test de errores inyectados por endpoint y contabilizados en las estadísticas"""
+        server, client = stand_in
+        server.inject_errors(times=2, status=503, endpoint="GET /contracts/{userId}")
+        for _ in range(2):
+            with pytest.raises(SpaceServerError):
+                await client.contracts.get_user_id_contract("u1")
+        assert (await client.contracts.get_user_id_contract("u1")).userContact.userId == "u1"
+        with pytest.raises(SpaceNotFoundError):
+            await client.contracts.get_user_id_contract("nobody")
+
+        stats = server.stats().endpoints["GET /contracts/{userId}"]
+        assert (stats.requests, stats.errors, stats.injected_errors) == (4, 3, 2)
+
+    @pytest.mark.asyncio
+    async def test_latency_and_throughput(self, stand_in):
+        """Test de latencia simulada y de throughput medido"""
+        server, client = stand_in
+        server.options = StandInOptions(latency=0.02)
+        started = time.perf_counter()
+        await client.contracts.get_user_id_contract("u1")
+        assert time.perf_counter() - started >= 0.02
+        stats = server.stats()
+        assert stats.requests == 1 and stats.throughput > 0
+        assert stats.to_dict()["endpoints"]["GET /contracts/{userId}"]["mean_ms"] >= 20
+
+    @pytest.mark.asyncio
+    async def test_api_key_is_checked(self):
+        """Test de que con api_key configurada se rechazan las peticiones con otra clave"""
+        async with SpaceStandIn(StandInOptions(api_key="secret")) as server:
+            async with SpaceClient(server.url, "other", retry_policy=None) as client:
+                assert await client.is_connected_to_space() is True
+                with pytest.raises(SpaceAuthenticationError):
+                    await client.service_context.get_service("TomatoMeter")
+
+    def test_invalid_options(self):
+        """Test de validación de las opciones"""
+        with pytest.raises(ValueError):
+            StandInOptions(error_rate=2).validate()
+        with pytest.raises(ValueError):
+            StandInOptions(latency=0.01, latency_jitter=0.02).validate()
+        with pytest.raises(ValueError):
+            StandInOptions(ping_interval=0).validate()
+
+    def test_period_arithmetic(self):
+        """Test de la renovación de periodos del stand-in, con meses y años según el calendario"""
+        start = datetime(2024, 1, 31, 12)
+        assert _add_period(start, {"value": 1, "unit": "MONTH"}) == datetime(2024, 2, 29, 12)
+        assert _add_period(start, {"value": 1, "unit": "YEAR"}, 3) == datetime(2027, 1, 31, 12)
+        assert _add_period(start, {"value": 2, "unit": "HOUR"}, 2) == datetime(2024, 1, 31, 16)
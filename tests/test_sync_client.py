@@ -0,0 +1,164 @@
+import gc
+import json
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from app_SpacePyCl.models.feature_eval_result import FeatureEvaluationResult
+from app_SpacePyCl.routes.sync_client import SyncSpaceClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.server.ports.add(self.client_address[1])
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({"eval": self.path.endswith("/svc-on"), "used": None, "limit": None}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        offset, limit = int(query["offset"][0]), int(query["limit"][0])
+        services = [{"name": f"svc{i}", "disabled": False, "activePricings": {}, "archivedPricings": {}}
+                    for i in range(offset, min(offset + limit, 5))]
+        body = json.dumps(services).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def space_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.ports = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", server
+    server.shutdown()
+    server.server_close()
+
+
+class TestSyncSpaceClient:
+
+    def test_evaluate_reuses_connections(self, space_url):
+        """Test de que las llamadas síncronas comparten sesión y conexiones keep-alive"""
+        url, server = space_url
+        with SyncSpaceClient(url, "key") as client:
+            results = [client.featureEvaluators.evaluate("u1", "svc-on") for _ in range(5)]
+        assert all(isinstance(r, FeatureEvaluationResult) and r.eval for r in results)
+        assert len(server.ports) == 1
+
+    def test_thread_safe(self, space_url):
+        """Test de uso concurrente desde varios hilos"""
+        url, _ = space_url
+        client = SyncSpaceClient(url, "key", coalesce_requests=False)
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda i: client.featureEvaluators.evaluate(f"u{i}", "svc-off"), range(40)))
+        assert [r.eval for r in results] == [False] * 40
+        client.featureEvaluators.enable_cache()
+        assert client.featureEvaluators.cache is not None
+        client.close()
+
+    def test_async_iterators(self, space_url):
+        """Test de que los iteradores asíncronos se recorren como generadores síncronos"""
+        url, _ = space_url
+        with SyncSpaceClient(url, "key") as client:
+            assert [s.name for s in client.service_context.iter_services(page_size=2)] == [f"svc{i}" for i in range(5)]
+            services = client.service_context.iter_services(page_size=2)
+            assert next(services).name == "svc0"
+            services.close()
+
+    def test_validates_arguments(self):
+        with pytest.raises(ValueError):
+            SyncSpaceClient("", "key")
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requiere os.fork")
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_fork_safe(self, space_url):
+        """Test de que tras un fork el hijo usa su propio loop y su propia sesión"""
+        url, _ = space_url
+        client = SyncSpaceClient(url, "key")
+        assert client.featureEvaluators.evaluate("u1", "svc-on").eval
+        pid = os.fork()
+        if pid == 0:
+            try:
+                ok = client.featureEvaluators.evaluate("u1", "svc-on").eval
+            except BaseException:
+                ok = False
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert client.featureEvaluators.evaluate("u1", "svc-on").eval
+        client.close()
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requiere os.fork")
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_nested_fork(self, space_url):
+        """Test de que un hijo puede volver a hacer fork y su hijo usar el cliente"""
+        url, _ = space_url
+        client = SyncSpaceClient(url, "key", timeout=2000)
+        assert client.featureEvaluators.evaluate("u1", "svc-on").eval
+        pid = os.fork()
+        if pid == 0:
+            try:
+                grandchild = os.fork()
+                if grandchild == 0:
+                    try:
+                        ok = client.featureEvaluators.evaluate("u1", "svc-on").eval
+                    except BaseException:
+                        ok = False
+                    os._exit(0 if ok else 1)
+                _, status = os.waitpid(grandchild, 0)
+                ok = os.waitstatus_to_exitcode(status) == 0 and client.featureEvaluators.evaluate("u1", "svc-on").eval
+            except BaseException:
+                ok = False
+            os._exit(0 if ok else 1)
+        deadline = time.monotonic() + 10
+        while True:
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if done:
+                break
+            if time.monotonic() > deadline:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                pytest.fail("El fork anidado se quedó bloqueado")
+            time.sleep(0.01)
+        assert os.waitstatus_to_exitcode(status) == 0
+        client.close()
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requiere os.fork")
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_fork_keeps_parent_connections(self, space_url):
+        """Test de que el hijo suelta el conector heredado sin cerrar las conexiones del padre"""
+        url, server = space_url
+        client = SyncSpaceClient(url, "key", timeout=2000)
+        assert client.featureEvaluators.evaluate("u1", "svc-on").eval
+        pid = os.fork()
+        if pid == 0:
+            try:
+                ok = client.featureEvaluators.evaluate("u1", "svc-on").eval
+                # El cliente heredado ya no está referenciado: que se recoja aquí, en el hijo
+                gc.collect()
+            except BaseException:
+                ok = False
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        # El padre sigue usando su conexión keep-alive; el hijo abrió la suya
+        assert client.featureEvaluators.evaluate("u2", "svc-on").eval
+        assert len(server.ports) == 2
+        client.close()
@@ -0,0 +1,93 @@
+import asyncio
+import io
+import os
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app_SpacePyCl.routes.config import SpaceClient
+
+PRICING_PATH = os.path.join(os.path.dirname(__file__), "resources", "pricings", "TomatoMeter.yml")
+
+
+@pytest_asyncio.fixture
+async def upload_server():
+    uploads = []
+
+    async def handler(request):
+        reader = await request.multipart()
+        part = await reader.next()
+        uploads.append((part.name, part.filename, await part.read(), request.headers.get("Transfer-Encoding")))
+        name = request.match_info.get("service_name", "TomatoMeter")
+        return web.json_response({"name": name, "activePricings": {"1.0.0": {"id": "p1"}}})
+
+    app = web.Application(client_max_size=16 * 1024 * 1024)
+    app.router.add_post("/api/v1/services", handler)
+    app.router.add_post("/api/v1/services/{service_name}/pricings", handler)
+    server = TestServer(app)
+    await server.start_server()
+    client = SpaceClient(str(server.make_url("")), "key")
+    yield client, uploads
+    await client.close()
+    await server.close()
+
+
+def expected_yaml() -> bytes:
+    with open(PRICING_PATH, "rb") as f:
+        return f.read()
+
+
+class TestUploads:
+
+    @pytest.mark.asyncio
+    async def test_add_service_streams_file(self, upload_server):
+        """Test de que add_service sube el fichero por trozos, sin cargarlo entero"""
+        client, uploads = upload_server
+        service = await client.service_context.add_service(PRICING_PATH)
+        assert service.name == "TomatoMeter"
+        assert uploads == [("pricing", "TomatoMeter.yml", expected_yaml(), "chunked")]
+
+    @pytest.mark.asyncio
+    async def test_add_service_missing_file(self, upload_server):
+        client, uploads = upload_server
+        with pytest.raises(FileNotFoundError):
+            await client.service_context.add_service("/no/existe.yml")
+        assert uploads == []
+
+    @pytest.mark.asyncio
+    async def test_add_pricing_sources(self, upload_server):
+        """Test de add_pricing con ruta, bytes, fichero abierto e iterable asíncrono"""
+        client, uploads = upload_server
+        content = expected_yaml()
+
+        async def chunks():
+            for start in range(0, len(content), 100):
+                await asyncio.sleep(0)
+                yield content[start:start + 100]
+
+        await client.service_context.add_pricing("svc", url=PRICING_PATH)
+        await client.service_context.add_pricing("svc", service_file=content)
+        await client.service_context.add_pricing("svc", service_file=io.BytesIO(content), filename="v2.yml")
+        await client.service_context.add_pricing("svc", service_file=chunks())
+        assert [upload[1:3] for upload in uploads] == [
+            ("TomatoMeter.yml", content), ("service.yml", content), ("v2.yml", content), ("service.yml", content)]
+
+    @pytest.mark.asyncio
+    async def test_upload_does_not_block_loop(self, upload_server, tmp_path):
+        """Test de que otras corrutinas siguen ejecutándose durante una subida grande"""
+        client, uploads = upload_server
+        big_file = tmp_path / "big.yml"
+        big_file.write_bytes(b"# relleno\n" * 400_000)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        await client.service_context.add_service(str(big_file))
+        task.cancel()
+        assert len(uploads[0][2]) == big_file.stat().st_size
+        assert ticks > 10
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import time
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app_SpacePyCl.routes.config import SpaceClient
+from app_SpacePyCl.utils.retry import RetryPolicy
+from app_SpacePyCl.utils import usage_reporter
+from app_SpacePyCl.utils.usage_reporter import UsageReporter, UsageReporterOptions
+
+CONTRACT = {
+    "userContact": {"userId": "u1", "username": "user_u1"},
+    "billingPeriod": {"startDate": "2025-01-01T00:00:00Z", "endDate": "2025-02-01T00:00:00Z",
+                      "autoRenew": True, "renewalDays": 30},
+    "contractedServices": {"tomatometer": "1.0.0"},
+    "subscriptionPlans": {"tomatometer": "BASIC"},
+}
+
+
+@pytest_asyncio.fixture
+async def usage_server():
+    state = {"puts": [], "fail": 0, "status": 500, "delay": 0.0}
+
+    async def handler(request):
+        await asyncio.sleep(state["delay"])
+        if state["fail"]:
+            state["fail"] -= 1
+            return web.json_response({"error": "rejected"}, status=state["status"])
+        state["puts"].append((request.match_info["user_id"], await request.json()))
+        return web.json_response(CONTRACT)
+
+    app = web.Application()
+    app.router.add_put("/api/v1/contracts/{user_id}/usageLevels", handler)
+    server = TestServer(app)
+    await server.start_server()
+    client = SpaceClient(str(server.make_url("")), "key", retry_policy=None)
+    yield client, state
+    await client.close()
+    await server.close()
+
+
+class TestUsageReporter:
+
+    @pytest.mark.asyncio
+    async def test_increments_are_aggregated(self, usage_server):
+        """Test de que los incrementos se suman y se envía un PUT por usuario"""
+        client, state = usage_server
+        reporter = UsageReporter(client.contracts, UsageReporterOptions(flush_interval=60))
+        for _ in range(5):
+            reporter.record("u1", "TomatoMeter", "tomatometer-maxPomodoroTimers", 1)
+        reporter.record("u1", "tomatometer", "tomatometer-maxExports", 2.5)
+        reporter.record("u2", "tomatometer", "tomatometer-maxPomodoroTimers")
+        assert reporter.pending == 3
+        await reporter.flush()
+        assert sorted(state["puts"]) == [
+            ("u1", {"tomatometer": {"tomatometer-maxPomodoroTimers": 5, "tomatometer-maxExports": 2.5}}),
+            ("u2", {"tomatometer": {"tomatometer-maxPomodoroTimers": 1}}),
+        ]
+        assert reporter.pending == 0
+        await reporter.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_is_retried(self, usage_server):
+        """Test de que un envío fallido se conserva y se reenvía en el siguiente flush"""
+        client, state = usage_server
+        state["fail"] = 1
+        reporter = UsageReporter(client.contracts, UsageReporterOptions(flush_interval=60))
+        reporter.record("u1", "tomatometer", "tomatometer-maxPomodoroTimers", 2)
+        await reporter.flush()
+        assert state["puts"] == [] and reporter.failed_requests == 1
+        reporter.record("u1", "tomatometer", "tomatometer-maxPomodoroTimers", 1)
+        await reporter.flush()
+        assert state["puts"] == [("u1", {"tomatometer": {"tomatometer-maxPomodoroTimers": 3}})]
+        await reporter.close()
+
+    @pytest.mark.asyncio
+    async def test_size_threshold_and_shutdown(self, usage_server):
+        """Test de flush anticipado por tamaño y de flush al cerrar el cliente"""
+        client, state = usage_server
+        reporter = client.contracts.create_usage_reporter(UsageReporterOptions(flush_interval=60, max_pending=2))
+        reporter.record("u1", "tomatometer", "a")
+        reporter.record("u2", "tomatometer", "a")
+        # Se espera al flush anticipado que ha lanzado el umbral, no un tiempo fijo
+        assert reporter._early_flush is not None
+        await reporter._early_flush
+        assert len(state["puts"]) == 2
+        reporter.record("u3", "tomatometer", "a")
+        await client.close()
+        assert len(state["puts"]) == 3
+        with pytest.raises(RuntimeError):
+            reporter.record("u3", "tomatometer", "a")
+
+    @pytest.mark.asyncio
+    async def test_journal_is_replayed(self, usage_server, tmp_path):
+        """Test de que lo no confirmado en el diario se reenvía al arrancar"""
+        client, state = usage_server
+        journal = tmp_path / "usage.jsonl"
+        journal.write_text(json.dumps(["u1", "tomatometer", "a", 4]) + "\n" + '["u1", "tomat')
+        reporter = UsageReporter(client.contracts, UsageReporterOptions(journal_path=str(journal)))
+        assert reporter.pending == 1
+        reporter.record("u1", "tomatometer", "a", 1)
+        await reporter.close()
+        assert state["puts"] == [("u1", {"tomatometer": {"a": 5}})]
+        assert journal.read_text() == ""
+
+    @pytest.mark.asyncio
+    async def test_permanent_rejections_are_dead_lettered(self, usage_server, tmp_path):
+        """Test de que un 4xx definitivo se descarta y se guarda aparte, y un 429 se reintenta"""
+        client, state = usage_server
+        dead_letters = tmp_path / "dead.jsonl"
+        reporter = UsageReporter(client.contracts, UsageReporterOptions(dead_letter_path=str(dead_letters)))
+        state["fail"], state["status"] = 1, 404
+        reporter.record("u1", "tomatometer", "a", 2)
+        await reporter.flush()
+        assert reporter.pending == 0 and reporter.dropped_requests == 1
+        assert json.loads(dead_letters.read_text()) == ["u1", {"tomatometer": {"a": 2}}, 404, "rejected"]
+
+        state["fail"], state["status"] = 1, 429
+        reporter.record("u1", "tomatometer", "a", 1)
+        await reporter.flush()
+        assert reporter.pending == 1 and reporter.failed_requests == 1
+        await reporter.close()
+        assert state["puts"] == [("u1", {"tomatometer": {"a": 1}})]
+
+    @pytest.mark.asyncio
+    async def test_journal_is_written_through_and_compacted(self, usage_server, tmp_path, monkeypatch):
+        """Test de que cada anotación llega al diario al momento y no se pierde al compactarlo"""
+        client, state = usage_server
+        journal = tmp_path / "usage.jsonl"
+        reporter = UsageReporter(client.contracts, UsageReporterOptions(journal_path=str(journal)))
+        reporter.record("u1", "tomatometer", "a", 1)
+        assert journal.read_text() == json.dumps(["u1", "tomatometer", "a", 1]) + "\n"
+
+        state["delay"] = 0.1
+        flushing = asyncio.ensure_future(reporter.flush())
+        await asyncio.sleep(0.05)
+        reporter.record("u2", "tomatometer", "a", 3)
+        await flushing
+        assert journal.read_text() == json.dumps(["u2", "tomatometer", "a", 3]) + "\n"
+        state["delay"] = 0.0
+
+        # Lo anotado mientras se escribe la copia compactada (en otro hilo) se conserva
+        write_synced = usage_reporter._write_synced
+        monkeypatch.setattr(usage_reporter, "_write_synced",
+                            lambda path, lines: (time.sleep(0.1), write_synced(path, lines)))
+        flushing = asyncio.ensure_future(reporter.flush())
+        await asyncio.sleep(0.05)
+        reporter.record("u3", "tomatometer", "a", 1)
+        await flushing
+        assert journal.read_text() == json.dumps(["u3", "tomatometer", "a", 1]) + "\n"
+        await reporter.close()
+        assert journal.read_text() == ""